@@ -0,0 +1,139 @@
+"""Compares authenticated GET latency, authorizing from the token or the user row.
+
+Requests go through the whole application, middleware and dependencies
+included, without a server in front. The legacy principal replays what the
+role checks did before: check the token again with the route's own bearer,
+then load the user by email to read the role.
+
+The app opens its own sessions, so the catalog is committed, then deleted at
+the end. The books are read from the detail cache, once it is warm, so the
+authorization is most of the work left.
+
+Usage: python -m benchmarks.authenticated_reads [clients] [repeat]
+"""
+
+from contextlib import redirect_stdout
+import asyncio
+import io
+import sys
+
+from fastapi import Depends
+from httpx import ASGITransport, AsyncClient
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .common import measure_concurrent, scratch_keys
+from src import VERSION, app
+from src.auth.dependencies import AccessTokenBearer, get_current_principal
+from src.auth.schemas import PrincipalModel
+from src.auth.service import UserService
+from src.auth.utils import create_access_token
+from src.db.main import async_session_maker, get_session
+from src.db.models import Book, Review, User
+from src.tests.conftest import seed
+
+user_service = UserService()
+legacy_bearer = AccessTokenBearer()
+
+
+async def legacy_principal(
+    token_details: dict = Depends(legacy_bearer),
+    session: AsyncSession = Depends(get_session),
+) -> PrincipalModel:
+    user = await user_service.get_user_by_email(token_details["user"]["email"], session)
+    return PrincipalModel(uid=user.uid, email=user.email, role=user.role)
+
+
+async def cleanup(user: User) -> None:
+    async with async_session_maker() as session:
+        await session.exec(delete(Review).where(Review.user_uid == user.uid))
+        await session.exec(delete(Book).where(Book.user_uid == user.uid))
+        await session.exec(delete(User).where(User.uid == user.uid))
+        await session.commit()
+
+
+async def main(clients: int, repeat: int):
+    # The test configuration mocks the sessions, these requests need real ones
+    app.dependency_overrides.pop(get_session, None)
+
+    async with scratch_keys():
+        async with async_session_maker() as session:
+            user = await seed(session, books=clients, reviews_per_book=5, tags=0)
+            result = await session.exec(
+                select(Book.uid, Review.uid)
+                .join(Review, Review.book_uid == Book.uid)
+                .where(Book.user_uid == user.uid)
+                .distinct(Book.uid)
+            )
+            rows = result.all()
+            await session.commit()
+
+        token = create_access_token(
+            user_data={
+                "email": user.email,
+                "user_uid": str(user.uid),
+                "role": user.role,
+            }
+        )
+
+        try:
+            async with AsyncClient(
+                transport=ASGITransport(app=app),
+                base_url=f"http://localhost/api/{VERSION}",
+                headers={"Authorization": f"Bearer {token}"},
+            ) as client:
+
+                async def get(path):
+                    response = await client.get(path)
+                    assert response.status_code == 200, response.text
+
+                # The request log of the middleware would drown the results
+                with redirect_stdout(io.StringIO()):
+                    for book_uid, _ in rows:
+                        await get(f"/books/{book_uid}")
+
+                print(f"{clients} concurrent clients, {repeat} requests each\n")
+
+                for endpoint, paths in (
+                    (
+                        "GET /books/{uid}",
+                        [f"/books/{book_uid}" for book_uid, _ in rows],
+                    ),
+                    (
+                        "GET /reviews/{uid}",
+                        [f"/reviews/{review_uid}" for _, review_uid in rows],
+                    ),
+                ):
+                    for label, principal in (
+                        ("user row", legacy_principal),
+                        ("token claims", None),
+                    ):
+                        if principal:
+                            app.dependency_overrides[get_current_principal] = principal
+
+                        with redirect_stdout(io.StringIO()):
+                            result = await measure_concurrent(
+                                label,
+                                [lambda path=path: get(path) for path in paths],
+                                repeat,
+                            )
+
+                        app.dependency_overrides.pop(get_current_principal, None)
+                        print(
+                            f"{endpoint + ' (' + label + ')':<40} "
+                            f"median {result['median_ms']:8.2f} ms   "
+                            f"p95 {result['p95_ms']:8.2f} ms   "
+                            f"{result['queries']:6.1f} queries   "
+                            f"{result['per_second']:8.1f} ops/s"
+                        )
+        finally:
+            await cleanup(user)
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+        )
+    )
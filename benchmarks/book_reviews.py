@@ -0,0 +1,88 @@
+"""Measures the book detail and its reviews pages as reviews pile up.
+
+Books with more and more reviews are seeded, then their details are loaded
+with every review, as before, and with the latest ones only. Their reviews
+are also paged through, by recency and by rating.
+
+Usage: python -m benchmarks.book_reviews [max_reviews]
+"""
+
+import asyncio
+import sys
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+
+from .common import measure
+from src.books.schemas import BookDetailModel
+from src.books.service import BookService
+from src.db.models import Book
+from src.reviews.service import ReviewService
+from src.serializers import compile_serializer, dumps
+from src.tests.conftest import rollback_session, seed
+
+book_service = BookService()
+review_service = ReviewService()
+serialize = compile_serializer(BookDetailModel)
+
+
+async def legacy_book_detail(book_uid, session):
+    statement = (
+        select(Book)
+        .where(Book.uid == book_uid)
+        .options(selectinload(Book.reviews), selectinload(Book.tags))
+    )
+    book = (await session.exec(statement)).first()
+    return dumps(serialize(book))
+
+
+async def book_detail(book_uid, session):
+    book = await book_service.get_book(book_uid, session)
+    return dumps(serialize(book))
+
+
+async def main(max_reviews: int):
+    async with rollback_session() as session:
+        reviews = 10
+
+        while reviews <= max_reviews:
+            user = await seed(
+                session, books=1, reviews_per_book=reviews, tags_per_book=3
+            )
+            book_uid = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).one()
+            session.expunge_all()
+
+            size = len(await legacy_book_detail(book_uid, session))
+            session.expunge_all()
+            print(f"\n{reviews} reviews, full detail of {size // 1024} KiB")
+
+            for label, load in (
+                ("all reviews", legacy_book_detail),
+                ("latest", book_detail),
+            ):
+
+                async def detail():
+                    await load(book_uid, session)
+                    session.expunge_all()
+
+                await measure(f"detail ({label})", detail)
+
+            for sort in ("created_at", "rating"):
+
+                async def pages():
+                    cursor = None
+                    for _ in range(5):
+                        _, cursor = await review_service.get_book_reviews(
+                            book_uid, session, 20, cursor, sort
+                        )
+                        session.expunge_all()
+
+                await measure(f"5 review pages by {sort}", pages)
+
+            reviews *= 10
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
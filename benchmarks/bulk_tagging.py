@@ -0,0 +1,58 @@
+"""Compares tagging many books with one bulk request or one request per book.
+
+Usage: python -m benchmarks.bulk_tagging [books]
+"""
+
+import asyncio
+import sys
+import uuid
+
+from sqlmodel import select
+
+from .common import measure, scratch_keys
+from src.db.models import Book
+from src.tags.schemas import TagAddModel, TagBulkModel, TagCreateModel
+from src.tags.service import TagService
+from src.tests.conftest import rollback_session, seed
+
+tag_service = TagService()
+
+
+def tags(count: int) -> list[TagCreateModel]:
+    return [TagCreateModel(name=f"bulk-{uuid.uuid4().hex}") for _ in range(count)]
+
+
+async def main(books: int):
+    async with scratch_keys(), rollback_session() as session:
+        user = await seed(session, books=books, reviews_per_book=0)
+        result = await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+        book_uids = result.all()
+        session.expunge_all()
+
+        print(f"{len(book_uids)} books, 3 tags\n")
+
+        async def per_book():
+            tag_data = TagAddModel(tags=tags(3))
+            for book_uid in book_uids:
+                await tag_service.add_tags_to_book(book_uid, tag_data, session)
+                session.expunge_all()
+
+        async def bulk_add():
+            bulk_data = TagBulkModel(book_uids=book_uids, add=tags(3))
+            await tag_service.bulk_tag_books(bulk_data, session)
+
+        added = tags(3)
+
+        async def bulk_add_remove():
+            nonlocal added
+            bulk_data = TagBulkModel(book_uids=book_uids, add=tags(3), remove=added)
+            added = bulk_data.add
+            await tag_service.bulk_tag_books(bulk_data, session)
+
+        await measure("add_tags_to_book per book", per_book, repeat=3)
+        await measure("bulk_tag_books add", bulk_add, repeat=10)
+        await measure("bulk_tag_books add and remove", bulk_add_remove, repeat=10)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,135 @@
+"""Shared helpers for the benchmark scripts.
+
+Every benchmark runs inside a transaction that is rolled back at the end, so
+the seeded rows never outlive the run, even when the services commit. The
+benchmarks that write through the services also use Redis keys of their own.
+The rollback session and the seeded catalog come from the test configuration.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import event
+
+from src.db.main import async_engine
+from src.db.redis import cache_client
+import src.books.cache as book_cache_module
+import src.books.leaderboards as leaderboards_module
+import src.tags.suggest as tag_suggest_module
+
+# The Redis keys and channels the services write to, by module
+REDIS_NAMES = {
+    leaderboards_module: ("TOP_RATED_KEY", "MOST_REVIEWED_KEY", "EPOCH_KEY"),
+    book_cache_module: ("KEY_PREFIX", "STATS_KEY", "READS_KEY", "FACETS_KEY_PREFIX"),
+    tag_suggest_module: ("CHANNEL",),
+}
+
+
+@asynccontextmanager
+async def scratch_keys():
+    """Points the services at Redis keys and channels of their own.
+
+    Only the SQL of a run is rolled back, so the leaderboards, the book cache
+    and the tag suggestions of the app would otherwise keep the seeded books
+    and tags. The keys are deleted at the end.
+    """
+    prefix = f"bench:{uuid.uuid4().hex}"
+    live = {
+        (module, name): getattr(module, name)
+        for module, names in REDIS_NAMES.items()
+        for name in names
+    }
+
+    for (module, name), value in live.items():
+        setattr(module, name, f"{prefix}:{value}")
+
+    try:
+        yield
+    finally:
+        for (module, name), value in live.items():
+            setattr(module, name, value)
+
+        keys = [key async for key in cache_client.scan_iter(match=f"{prefix}:*")]
+        if keys:
+            await cache_client.delete(*keys)
+
+
+@contextmanager
+def count_queries():
+    """Counts the statements sent to the database inside the block."""
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    try:
+        yield counter
+    finally:
+        event.remove(
+            async_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+
+
+async def measure(label: str, func, repeat: int = 20) -> dict:
+    """Runs an async callable several times, printing its median latency."""
+    timings = []
+
+    with count_queries() as counter:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "label": label,
+        "median_ms": statistics.median(timings),
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1],
+        "queries": counter["queries"] / repeat,
+    }
+    print(
+        f"{label:<40} median {result['median_ms']:8.2f} ms   "
+        f"p95 {result['p95_ms']:8.2f} ms   {result['queries']:6.1f} queries"
+    )
+
+    return result
+
+
+async def measure_concurrent(label: str, funcs: list, repeat: int = 20) -> dict:
+    """Runs one async callable per concurrent client, printing latency and throughput.
+
+    Each client awaits its callable 'repeat' times in a row, while all the
+    clients run at once, so the timings include waiting for locks and the pool.
+    """
+    timings = []
+
+    async def client(func):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    with count_queries() as counter:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(func) for func in funcs))
+        elapsed = time.perf_counter() - start
+
+    result = {
+        "label": label,
+        "median_ms": statistics.median(timings),
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1],
+        "queries": counter["queries"] / len(timings),
+        "per_second": len(timings) / elapsed,
+    }
+    print(
+        f"{label:<40} median {result['median_ms']:8.2f} ms   "
+        f"p95 {result['p95_ms']:8.2f} ms   {result['queries']:6.1f} queries   "
+        f"{result['per_second']:8.1f} ops/s"
+    )
+
+    return result
@@ -0,0 +1,99 @@
+"""Compares the list endpoint queries with and without relationship loading.
+
+Usage: python -m benchmarks.list_endpoints [books] [reviews_per_book]
+"""
+
+import asyncio
+import sys
+
+from sqlmodel import desc, select
+
+from .common import measure
+from src.books.service import BookService
+from src.db.models import Book, Review, Tag
+from src.reviews.filters import ReviewFilters
+from src.reviews.service import ReviewService
+from src.tags.service import TagService
+from src.tests.conftest import rollback_session, seed
+
+PAGE_SIZE = 100
+
+book_service = BookService()
+review_service = ReviewService()
+tag_service = TagService()
+
+
+async def main(books: int, reviews_per_book: int):
+    async with rollback_session() as session:
+        user = await seed(session, books=books, reviews_per_book=reviews_per_book)
+        print(f"Seeded {books} books with {reviews_per_book} reviews each\n")
+
+        async def run(statement):
+            # Expunging makes every run load from the database, as a new request would
+            result = await session.exec(statement)
+            result.all()
+            session.expunge_all()
+
+        async def books_eager():
+            await run(select(Book).order_by(desc(Book.created_at)).limit(PAGE_SIZE))
+
+        async def books_lean():
+            await book_service.get_all_books(session, PAGE_SIZE)
+            session.expunge_all()
+
+        async def user_books_eager():
+            await run(
+                select(Book)
+                .where(Book.user_uid == user.uid)
+                .order_by(desc(Book.created_at))
+                .limit(PAGE_SIZE)
+            )
+
+        async def user_books_lean():
+            await book_service.get_user_books(user.uid, session, PAGE_SIZE)
+            session.expunge_all()
+
+        async def tags_eager():
+            await run(select(Tag).order_by(desc(Tag.created_at)))
+
+        async def tags_lean():
+            await tag_service.get_tags(session)
+            session.expunge_all()
+
+        async def reviews_eager():
+            await run(select(Review).order_by(desc(Review.created_at)))
+
+        async def reviews_lean():
+            await review_service.get_all_reviews(session, PAGE_SIZE)
+            session.expunge_all()
+
+        async def reviews_filtered():
+            filters = ReviewFilters(
+                rating=[5],
+                user_uid=None,
+                book_uid=None,
+                created_from=None,
+                created_to=None,
+                order="desc",
+            )
+            await review_service.get_all_reviews(session, PAGE_SIZE, filters=filters)
+            session.expunge_all()
+
+        for label, func in (
+            ("GET /books/ (relationships)", books_eager),
+            ("GET /books/ (lean)", books_lean),
+            ("GET /books/user/{uid} (relationships)", user_books_eager),
+            ("GET /books/user/{uid} (lean)", user_books_lean),
+            ("GET /tags/ (relationships)", tags_eager),
+            ("GET /tags/ (lean)", tags_lean),
+            ("GET /reviews/ (all, relationships)", reviews_eager),
+            ("GET /reviews/ (page, lean)", reviews_lean),
+            ("GET /reviews/?rating=5 (page, lean)", reviews_filtered),
+        ):
+            await measure(label, func, repeat=5)
+
+
+if __name__ == "__main__":
+    books = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    reviews_per_book = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    asyncio.run(main(books, reviews_per_book))
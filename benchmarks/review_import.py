@@ -0,0 +1,87 @@
+"""Compares importing reviews in bulk with posting them one at a time.
+
+The reviews are spread over the books of a seeded catalog, and streamed to
+the importer as NDJSON lines, as the import endpoint would read them.
+
+Usage: python -m benchmarks.review_import [reviews] [books]
+"""
+
+import asyncio
+import json
+import random
+import sys
+
+from sqlmodel import select
+
+from .common import measure, scratch_keys
+from src.db.models import Book
+from src.reviews.importer import ReviewImporter
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import ReviewService
+from src.tests.conftest import rollback_session, seed
+
+review_importer = ReviewImporter()
+review_service = ReviewService()
+
+
+async def main(reviews: int, books: int):
+    async with scratch_keys(), rollback_session() as session:
+        user = await seed(session, books=books, reviews_per_book=0)
+        result = await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+        book_uids = result.all()
+        session.expunge_all()
+
+        lines = [
+            json.dumps(
+                {
+                    "book_uid": str(random.choice(book_uids)),
+                    "user_uid": str(user.uid),
+                    "rating": random.randint(1, 5),
+                    "review_text": "An imported review.",
+                }
+            )
+            for _ in range(reviews)
+        ]
+
+        print(f"{reviews} reviews over {books} books\n")
+
+        async def records():
+            for row, line in enumerate(lines, start=1):
+                yield row, line
+
+        async def bulk():
+            report = await review_importer.import_reviews(records(), session)
+            assert report.inserted == reviews
+
+        # Posting every review would take minutes, a sample gives the rate
+        sample = lines[: max(reviews // 20, 1)]
+
+        async def one_by_one():
+            for line in sample:
+                review = json.loads(line)
+                await review_service.add_review_to_book(
+                    user.uid,
+                    review["book_uid"],
+                    ReviewCreateModel(
+                        rating=review["rating"], review_text=review["review_text"]
+                    ),
+                    session,
+                )
+                session.expunge_all()
+
+        posted = await measure(f"post {len(sample)} reviews one by one", one_by_one, 1)
+        imported = await measure(f"import {reviews} reviews", bulk, 3)
+
+        print(
+            f"\n{len(sample) / posted['median_ms'] * 1000:10.0f} reviews/s posted"
+            f"\n{reviews / imported['median_ms'] * 1000:10.0f} reviews/s imported"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+        )
+    )
@@ -0,0 +1,69 @@
+"""Measures the book full-text search on a large generated catalog.
+
+Usage: python -m benchmarks.search [books]
+"""
+
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from .common import measure
+from src.books.service import BookService
+from src.tests.conftest import rollback_session
+
+PAGE_SIZE = 20
+
+book_service = BookService()
+
+# Words are drawn with a skewed distribution, so some terms match a large share
+# of the catalog while others only match a handful of books
+SEED_BOOKS = text(
+    """
+    INSERT INTO books (uid, created_at, updated_at, title, author, publisher,
+                       published_date, page_count, language)
+    SELECT gen_random_uuid(), now(), now(),
+           words[1 + floor(power(random(), 3) * array_length(words, 1))::int] || ' '
+               || words[1 + floor(random() * array_length(words, 1))::int] || ' '
+               || i::text,
+           'Author ' || (i % 5000)::text,
+           'Publisher ' || (i % 300)::text,
+           date '1950-01-01' + (i % 25000),
+           50 + i % 900,
+           'English'
+    FROM generate_series(1, :books) AS i,
+         (SELECT string_to_array(
+             'river night garden storm empire winter shadow ocean silence fire '
+             || 'crown glass machine forest letter island mountain kingdom '
+             || 'stranger summer dragon memory promise journey harbor', ' ')
+          AS words) AS vocabulary
+    """
+)
+
+
+async def main(books: int):
+    async with rollback_session() as session:
+        await session.execute(SEED_BOOKS, {"books": books})
+        await session.execute(text("ANALYZE books"))
+        print(f"Seeded {books} books\n")
+
+        for query in ("river", "harbor", "dragon kingdom", "Author 42", "123456"):
+
+            async def first_page():
+                await book_service.search_books(query, session, PAGE_SIZE)
+                session.expunge_all()
+
+            async def third_page():
+                cursor = None
+                for _ in range(3):
+                    _, cursor = await book_service.search_books(
+                        query, session, PAGE_SIZE, cursor
+                    )
+                    session.expunge_all()
+
+            await measure(f"q={query!r} first page", first_page, repeat=10)
+            await measure(f"q={query!r} three pages", third_page, repeat=5)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
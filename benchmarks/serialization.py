@@ -0,0 +1,114 @@
+"""Compares the default FastAPI response path with the orjson serializers.
+
+The default path validates the objects against the response model, converts
+them with 'jsonable_encoder' and encodes them with the stdlib json module, as
+FastAPI does for a route returning ORM objects. No database is needed.
+
+Usage: python -m benchmarks.serialization
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List
+import asyncio
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from .common import measure
+from src.books.schemas import Book as BookSchema, BookDetailModel
+from src.db.models import Book, Review, Tag
+from src.reviews.schemas import ReviewModel
+from src.serializers import fast_response
+from src.tags.schemas import TagModel
+
+SIZES = (10, 1000, 10000)
+
+
+def make_books(count: int) -> list[Book]:
+    """Builds books with reviews and tags, as loaded for the detail model."""
+    now = datetime.now()
+    tags = [Tag(uid=uuid.uuid4(), created_at=now, name=f"tag-{i}") for i in range(20)]
+    books = []
+
+    for i in range(count):
+        book = Book(
+            uid=uuid.uuid4(),
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+            title=f"Book {i}",
+            author=f"Author {i % 200}",
+            publisher=f"Publisher {i % 20}",
+            published_date=date(1950, 1, 1) + timedelta(days=i),
+            page_count=100 + i % 900,
+            language="English",
+            review_count=5,
+            rating_sum=20,
+            rating_histogram=[0, 0, 1, 3, 1],
+            rating_average=4.0,
+            user_uid=uuid.uuid4(),
+        )
+        book.reviews = [
+            Review(
+                uid=uuid.uuid4(),
+                created_at=now,
+                updated_at=now,
+                rating=4,
+                review_text="A benchmark review.",
+                user_uid=book.user_uid,
+                book_uid=book.uid,
+            )
+            for _ in range(5)
+        ]
+        book.tags = tags[i % 17 : i % 17 + 3]
+        books.append(book)
+
+    return books
+
+
+def default_path(schema, items) -> bytes:
+    validated = TypeAdapter(List[schema]).validate_python(items, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def fast_path(schema, items) -> bytes:
+    return fast_response(schema, items).body
+
+
+async def main():
+    for size in SIZES:
+        books = make_books(size)
+        reviews = [review for book in books for review in book.reviews][:size]
+        tags = [
+            Tag(uid=uuid.uuid4(), created_at=datetime.now(), name=f"t{i}")
+            for i in range(size)
+        ]
+        repeat = max(3, min(50, 20000 // size))
+
+        print(f"\n{size} items")
+
+        for name, schema, items in (
+            ("Book", BookSchema, books),
+            ("BookDetailModel", BookDetailModel, books),
+            ("ReviewModel", ReviewModel, reviews),
+            ("TagModel", TagModel, tags),
+        ):
+            results = []
+            for label, path in (("default", default_path), ("orjson", fast_path)):
+
+                async def run():
+                    path(schema, items)
+
+                results.append(await measure(f"{name} ({label})", run, repeat=repeat))
+
+            default, fast = results
+            print(
+                f"{'':<40} {size / default['median_ms'] * 1000:10.0f} -> "
+                f"{size / fast['median_ms'] * 1000:10.0f} items/s "
+                f"({default['median_ms'] / fast['median_ms']:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
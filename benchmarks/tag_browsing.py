@@ -0,0 +1,82 @@
+"""Measures browsing books by tag on a large catalog.
+
+One tag is attached to every book, one to a tenth of them and one to a
+thousandth, so the pages of popular and rare tags, and of their intersections,
+can be compared with loading 'Tag.books' as before.
+
+Usage: python -m benchmarks.tag_browsing [books]
+"""
+
+import asyncio
+import sys
+
+from sqlalchemy import text
+
+from .common import measure
+from src.books.service import BookService
+from src.tags.service import TagService
+from src.tests.conftest import rollback_session, seed
+
+book_service = BookService()
+tag_service = TagService()
+
+
+async def legacy_tag_books(tag_uid, session):
+    tag = await tag_service.get_tag_by_uid(tag_uid, session)
+    return tag.books[:20]
+
+
+async def main(books: int):
+    async with rollback_session() as session:
+        user = await seed(
+            session, books=books, reviews_per_book=0, tags_per_book=0, tags=3
+        )
+        result = await session.exec(
+            text("SELECT uid FROM tags WHERE name LIKE 'bench-tag-%' ORDER BY name")
+        )
+        popular, medium, rare = result.scalars().all()
+
+        for tag_uid, share in ((popular, 1), (medium, 10), (rare, 1000)):
+            await session.exec(
+                text(
+                    "INSERT INTO booktag (book_uid, tag_uid, book_created_at) "
+                    "SELECT uid, :tag_uid, created_at FROM books "
+                    "WHERE user_uid = :user_uid AND random() < :share"
+                ),
+                params={"tag_uid": tag_uid, "user_uid": user.uid, "share": 1 / share},
+            )
+        await session.exec(text("ANALYZE books, booktag, tags"))
+
+        print(f"{books} books\n")
+
+        async def pages(tag_uids, match="all", count=10):
+            cursor = None
+            for _ in range(count):
+                _, cursor = await book_service.get_tagged_books(
+                    tag_uids, session, 20, cursor, match
+                )
+                session.expunge_all()
+
+        for label, tag_uids, match in (
+            ("popular tag", [popular], "all"),
+            ("medium tag", [medium], "all"),
+            ("rare tag", [rare], "all"),
+            ("popular AND medium", [popular, medium], "all"),
+            ("medium AND rare", [medium, rare], "all"),
+            ("medium OR rare", [medium, rare], "any"),
+        ):
+
+            async def first_pages():
+                await pages(tag_uids, match)
+
+            await measure(f"{label} (10 pages)", first_pages, repeat=5)
+
+        async def legacy():
+            await legacy_tag_books(medium, session)
+            session.expunge_all()
+
+        await measure("medium tag (Tag.books)", legacy, repeat=3)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000))
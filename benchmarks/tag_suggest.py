@@ -0,0 +1,83 @@
+"""Measures tag suggestions from the in-process index, without the database.
+
+The index is filled with synthetic tags whose usage follows a long tail, then
+queried with random prefixes of every length, with and without usage updates
+from other workers applied between the lookups.
+
+Usage: python -m benchmarks.tag_suggest [tags] [lookups]
+"""
+
+import random
+import string
+import sys
+import time
+import uuid
+
+from src.tags.suggest import TagSuggestions
+
+WORDS = [
+    "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10)))
+    for _ in range(2000)
+]
+
+
+def percentiles(label: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p50 = timings[len(timings) // 2] * 1000
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1000
+    print(f"{label:<40} p50 {p50:8.4f} ms   p99 {p99:8.4f} ms")
+
+
+def main(tags: int, lookups: int):
+    index = TagSuggestions(limit=20)
+    rows = [
+        (uuid.uuid4(), f"{random.choice(WORDS)}-{i}", int(random.paretovariate(1.2)))
+        for i in range(tags)
+    ]
+    start = time.perf_counter()
+    index.replace(rows)
+    print(f"{tags} tags loaded in {(time.perf_counter() - start) * 1000:.1f} ms\n")
+
+    names = [name for _, name, _ in rows]
+
+    for length in (1, 2, 3, 5, 8):
+        prefixes = [random.choice(names)[:length] for _ in range(lookups)]
+        timings = []
+
+        for prefix in prefixes:
+            start = time.perf_counter()
+            index.suggest(prefix, 10)
+            timings.append(time.perf_counter() - start)
+
+        percentiles(f"prefix of {length}", timings)
+
+    timings = []
+
+    for _ in range(lookups):
+        tag_uid, name, _ = random.choice(rows)
+        index.apply({"type": "used", "tags": [[str(tag_uid), name, 1]]})
+
+        start = time.perf_counter()
+        index.suggest(random.choice(names)[: random.randint(1, 5)], 10)
+        timings.append(time.perf_counter() - start)
+
+    percentiles("mixed prefixes, usage updates between", timings)
+
+    timings = []
+
+    for _ in range(lookups // 10):
+        tag_uid, name, _ = random.choice(rows)
+        index.apply({"type": "renamed", "uid": str(tag_uid), "name": name})
+
+        start = time.perf_counter()
+        index.suggest(name[:2], 10)
+        timings.append(time.perf_counter() - start)
+
+    percentiles("short prefix just renamed", timings)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20000,
+    )
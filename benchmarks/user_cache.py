@@ -0,0 +1,74 @@
+"""Compares reading users from the in-process cache or from the database.
+
+Lookups pick users from a seeded population with a long tail, as requests
+do, so the cache keeps the most active users and evicts the others. The
+counters of the cache are printed at the end of each run.
+
+Usage: python -m benchmarks.user_cache [users] [cache_size] [lookups]
+"""
+
+from datetime import datetime
+import asyncio
+import random
+import sys
+import uuid
+
+from sqlalchemy import insert
+
+from .common import measure
+from src.auth.cache import user_cache
+from src.auth.service import UserService
+from src.db.models import User
+from src.tests.conftest import rollback_session
+
+user_service = UserService()
+
+
+async def main(users: int, cache_size: int, lookups: int):
+    async with rollback_session() as session:
+        now = datetime.now()
+        rows = [
+            {
+                "uid": uuid.uuid4(),
+                "created_at": now,
+                "updated_at": now,
+                "username": f"bench{i}",
+                "email": f"bench-{uuid.uuid4().hex}@bookly.test",
+                "first_name": "Bench",
+                "last_name": "Mark",
+                "role": "user",
+                "is_verified": True,
+                "password_hash": "",
+            }
+            for i in range(users)
+        ]
+        for start in range(0, len(rows), 5000):
+            await session.execute(insert(User), rows[start : start + 5000])
+
+        user_uids = [row["uid"] for row in rows]
+        # Zipf distributed, the n-th most active user making 1/n of the requests
+        weights = [1 / rank for rank in range(1, users + 1)]
+        picks = random.choices(user_uids, weights, k=lookups)
+        print(f"Seeded {users} users, {lookups} lookups per run\n")
+
+        async def lookup():
+            for user_uid in picks:
+                await user_service.get_user_record(user_uid, session)
+
+        for label, size in (("database", 0), (f"cache of {cache_size}", cache_size)):
+            user_cache.size = size
+            user_cache.clear()
+            user_cache.hits = user_cache.misses = user_cache.evictions = 0
+
+            await measure(f"{lookups} lookups ({label})", lookup, repeat=5)
+            print(f"{'':<40} {user_cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 10000,
+            int(sys.argv[3]) if len(sys.argv) > 3 else 2000,
+        )
+    )
@@ -0,0 +1,234 @@
+"""Compares the book and tag write paths, loading the rows first or not.
+
+The legacy functions replay what the services did before: load the book or
+tag with its relationships, then change or delete it through the ORM. Every
+client gets its own connection and seeded catalog, so they only compete for
+the database itself.
+
+Tagging a book sends 20 tags, half of them used by every write of a client,
+to compare the per-tag lookups with the cached uids and single upsert.
+
+Reviews are posted by the seeded user, whose books and reviews were all
+loaded along with the user and the reviewed book before.
+
+Usage: python -m benchmarks.write_paths [clients] [repeat]
+"""
+
+from contextlib import AsyncExitStack
+import asyncio
+import sys
+import uuid
+
+from sqlmodel import select
+
+from .common import measure_concurrent, scratch_keys
+from src.books.cache import book_cache
+from src.books.schemas import BookUpdateModel
+from src.books.service import BookService
+from src.db.models import Book, Review, Tag, User
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import ReviewService
+from src.books.leaderboards import leaderboards
+from src.tags.schemas import TagAddModel, TagCreateModel
+from src.tags.service import TagService
+from src.tests.conftest import rollback_session, seed
+
+book_service = BookService()
+review_service = ReviewService()
+tag_service = TagService()
+
+UPDATE = BookUpdateModel(
+    title="Updated", author="Author", publisher="Publisher", page_count=1, language="en"
+)
+REVIEW = ReviewCreateModel(rating=4, review_text="A benchmark review.")
+
+
+async def legacy_get_book(book_uid, session):
+    # The relationships of the models are loaded with 'selectin' by default
+    result = await session.exec(select(Book).where(Book.uid == book_uid))
+    return result.first()
+
+
+async def legacy_update_book(book_uid, session):
+    book = await legacy_get_book(book_uid, session)
+    for k, v in UPDATE.model_dump().items():
+        setattr(book, k, v)
+    await session.commit()
+    await book_cache.invalidate(book_uid)
+
+
+async def legacy_delete_book(book_uid, session):
+    book = await legacy_get_book(book_uid, session)
+    await session.delete(book)
+    await session.commit()
+    await book_cache.invalidate(book_uid)
+
+
+async def legacy_update_tag(tag_uid, name, session):
+    tag = await tag_service.get_tag_by_uid(tag_uid, session)
+    tag.name = name
+    await session.commit()
+    await session.refresh(tag)
+
+
+async def legacy_delete_tag(tag_uid, session):
+    tag = await tag_service.get_tag_by_uid(tag_uid, session)
+    await session.delete(tag)
+    await session.commit()
+
+
+async def legacy_add_tags_to_book(book_uid, tag_data, session):
+    book = await legacy_get_book(book_uid, session)
+    for tag_item in tag_data.tags:
+        result = await session.exec(select(Tag).where(Tag.name == tag_item.name))
+        tag = result.one_or_none()
+        if not tag:
+            tag = Tag(name=tag_item.name)
+        book.tags.append(tag)
+    session.add(book)
+    await session.commit()
+    await session.refresh(book)
+    await book_cache.invalidate(book_uid)
+
+
+async def legacy_add_review(book_uid, user, session):
+    book = await legacy_get_book(book_uid, session)
+    result = await session.exec(select(User).where(User.email == user.email))
+    user = result.first()
+
+    new_review = Review(**REVIEW.model_dump())
+    new_review.user = user
+    new_review.book = book
+    session.add(new_review)
+    review_count = await book_service.update_rating_aggregates(
+        book.uid, session, added=[new_review.rating]
+    )
+    await session.commit()
+
+    await book_cache.invalidate(book_uid)
+    await leaderboards.add_review(new_review, review_count)
+
+
+def tag_payload(session) -> TagAddModel:
+    # Concurrent clients must not insert the same names, as they never commit
+    names = [f"shared-{id(session)}-{i}" for i in range(10)]
+    names += [f"new-{uuid.uuid4().hex}" for _ in range(10)]
+
+    return TagAddModel(tags=[TagCreateModel(name=name) for name in names])
+
+
+class Client:
+    """A simulated client with its own session and seeded rows to write to."""
+
+    def __init__(self, session, user, books, tags):
+        self.session = session
+        self.user = user
+        self.books = books
+        self.tags = tags
+
+    def run(self, write, rows: str):
+        """Builds a callable that writes to the next seeded row on each call."""
+        pending = iter(getattr(self, rows))
+
+        async def func():
+            await write(next(pending), self.session)
+            # Like a new request, the next write starts from an empty session
+            self.session.expunge_all()
+
+        return func
+
+
+async def main(clients: int, repeat: int):
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(scratch_keys())
+        workers = []
+
+        for _ in range(clients):
+            session = await stack.enter_async_context(rollback_session())
+            user = await seed(
+                session, books=4 * repeat, reviews_per_book=10, tags=4 * repeat
+            )
+            books = (await session.exec(Book.__table__.select())).all()
+            tags = (await session.exec(Tag.__table__.select())).all()
+            workers.append(
+                Client(
+                    session,
+                    user,
+                    [book.uid for book in books if book.user_uid == user.uid],
+                    [tag.uid for tag in tags if tag.name.startswith("bench-tag-")],
+                )
+            )
+            session.expunge_all()
+
+        print(f"{clients} concurrent clients, {repeat} writes each\n")
+
+        def rename(update):
+            async def write(tag_uid, session):
+                await update(tag_uid, f"renamed-{tag_uid}", session)
+
+            return write
+
+        async def update_book(book_uid, session):
+            await book_service.update_book(book_uid, UPDATE, session)
+
+        async def update_tag(tag_uid, name, session):
+            await tag_service.update_tag(tag_uid, TagCreateModel(name=name), session)
+
+        # Each client reviews its own books as its own user
+        users = {worker.session: worker.user for worker in workers}
+
+        def add_review(add):
+            async def write(book_uid, session):
+                await add(book_uid, users[session], session)
+
+            return write
+
+        async def token_add_review(book_uid, user, session):
+            await review_service.add_review_to_book(user.uid, book_uid, REVIEW, session)
+
+        def add_tags(add):
+            async def write(book_uid, session):
+                await add(book_uid, tag_payload(session), session)
+
+            return write
+
+        for label, write, rows in (
+            ("update_book (load then update)", legacy_update_book, "books"),
+            ("update_book (RETURNING)", update_book, "books"),
+            ("update_tag (load then update)", rename(legacy_update_tag), "tags"),
+            ("update_tag (RETURNING)", rename(update_tag), "tags"),
+            (
+                "add_tags_to_book (per tag lookups)",
+                add_tags(legacy_add_tags_to_book),
+                "books",
+            ),
+            (
+                "add_tags_to_book (upsert)",
+                add_tags(tag_service.add_tags_to_book),
+                "books",
+            ),
+            (
+                "add_review_to_book (load book and user)",
+                add_review(legacy_add_review),
+                "books",
+            ),
+            ("add_review_to_book (token uid)", add_review(token_add_review), "books"),
+            ("delete_book (load then delete)", legacy_delete_book, "books"),
+            ("delete_book (RETURNING)", book_service.delete_book, "books"),
+            ("delete_tag (load then delete)", legacy_delete_tag, "tags"),
+            ("delete_tag (RETURNING)", tag_service.delete_tag, "tags"),
+        ):
+            await measure_concurrent(
+                label, [worker.run(write, rows) for worker in workers], repeat=repeat
+            )
+
+            # Deleted rows are gone, so the next pair of runs starts further along
+            if label.startswith("delete"):
+                for worker in workers:
+                    setattr(worker, rows, getattr(worker, rows)[repeat:])
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    asyncio.run(main(clients, repeat))
@@ -0,0 +1,40 @@
+"""add books keyset pagination indexes
+
+Revision ID: 47d55714c876
+Revises: 36d1a608bc17
+Create Date: 2026-10-18 02:38:43.855269
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "47d55714c876"
+down_revision: Union[str, None] = "36d1a608bc17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_books_created_at_uid",
+        "books",
+        ["created_at", "uid"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_books_user_uid_created_at_uid",
+        "books",
+        ["user_uid", "created_at", "uid"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_books_user_uid_created_at_uid", table_name="books")
+    op.drop_index("ix_books_created_at_uid", table_name="books")
@@ -0,0 +1,30 @@
+"""add updated at indexes for exports
+
+Revision ID: db75e2e961b2
+Revises: 5c7f3ccacab6
+Create Date: 2026-10-18 02:50:41.863470
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "db75e2e961b2"
+down_revision: Union[str, None] = "5c7f3ccacab6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_books_updated_at", "books", ["updated_at"], unique=False)
+    op.create_index("ix_reviews_updated_at", "reviews", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reviews_updated_at", table_name="reviews")
+    op.drop_index("ix_books_updated_at", table_name="books")
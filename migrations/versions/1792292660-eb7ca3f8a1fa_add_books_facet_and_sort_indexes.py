@@ -0,0 +1,57 @@
+"""add books facet and sort indexes
+
+Revision ID: eb7ca3f8a1fa
+Revises: db75e2e961b2
+Create Date: 2026-10-18 03:04:20.230934
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "eb7ca3f8a1fa"
+down_revision: Union[str, None] = "db75e2e961b2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_books_language_created_at_uid",
+        "books",
+        ["language", "created_at", "uid"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_books_publisher_created_at_uid",
+        "books",
+        ["publisher", "created_at", "uid"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_books_author_created_at_uid",
+        "books",
+        ["author", "created_at", "uid"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_books_published_date_uid", "books", ["published_date", "uid"], unique=False
+    )
+    op.create_index(
+        "ix_books_page_count_uid", "books", ["page_count", "uid"], unique=False
+    )
+    op.create_index("ix_books_title_uid", "books", ["title", "uid"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_books_title_uid", table_name="books")
+    op.drop_index("ix_books_page_count_uid", table_name="books")
+    op.drop_index("ix_books_published_date_uid", table_name="books")
+    op.drop_index("ix_books_author_created_at_uid", table_name="books")
+    op.drop_index("ix_books_publisher_created_at_uid", table_name="books")
+    op.drop_index("ix_books_language_created_at_uid", table_name="books")
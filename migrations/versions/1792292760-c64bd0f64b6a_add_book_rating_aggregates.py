@@ -0,0 +1,63 @@
+"""add book rating aggregates
+
+Revision ID: c64bd0f64b6a
+Revises: eb7ca3f8a1fa
+Create Date: 2026-10-18 03:06:00.476997
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c64bd0f64b6a"
+down_revision: Union[str, None] = "eb7ca3f8a1fa"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "books",
+        sa.Column("review_count", sa.INTEGER(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "books",
+        sa.Column("rating_sum", sa.INTEGER(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "books",
+        sa.Column(
+            "rating_histogram",
+            postgresql.ARRAY(sa.INTEGER()),
+            server_default="{0,0,0,0,0}",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "books",
+        sa.Column(
+            "rating_average",
+            sa.DOUBLE_PRECISION(),
+            sa.Computed(
+                "CASE WHEN review_count > 0 THEN rating_sum::double precision / review_count ELSE 0 END",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_books_rating_average_uid", "books", ["rating_average", "uid"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_books_rating_average_uid", table_name="books")
+    op.drop_column("books", "rating_average")
+    op.drop_column("books", "rating_histogram")
+    op.drop_column("books", "rating_sum")
+    op.drop_column("books", "review_count")
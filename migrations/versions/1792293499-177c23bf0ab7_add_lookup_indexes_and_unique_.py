@@ -0,0 +1,104 @@
+"""add lookup indexes and unique constraints
+
+Revision ID: 177c23bf0ab7
+Revises: c64bd0f64b6a
+Create Date: 2026-10-18 03:18:19.354791
+
+The indexes are built concurrently, outside of the migration transaction, so
+the tables keep taking writes while they are built. The unique constraints on
+users.email and tags.name are then attached to their prebuilt indexes.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "177c23bf0ab7"
+down_revision: Union[str, None] = "c64bd0f64b6a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_booktag_tag_uid", "booktag", ["tag_uid"], False),
+    (
+        "ix_reviews_book_uid_created_at_uid",
+        "reviews",
+        ["book_uid", "created_at", "uid"],
+        False,
+    ),
+    (
+        "ix_reviews_user_uid_created_at_uid",
+        "reviews",
+        ["user_uid", "created_at", "uid"],
+        False,
+    ),
+    ("users_email_key", "users", ["email"], True),
+    ("tags_name_key", "tags", ["name"], True),
+]
+
+UNIQUE_CONSTRAINTS = [
+    ("users_email_key", "users"),
+    ("tags_name_key", "tags"),
+]
+
+
+def upgrade() -> None:
+    # Tags with the same name are merged into the oldest one. Duplicated user
+    # emails can't be merged, so they make the unique index fail instead
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE duplicate_tags ON COMMIT DROP AS
+        SELECT uid, kept_uid
+        FROM (
+            SELECT
+                uid,
+                first_value(uid) OVER (PARTITION BY name ORDER BY created_at, uid)
+                    AS kept_uid
+            FROM tags
+        ) AS ranked
+        WHERE uid <> kept_uid
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO booktag (book_uid, tag_uid)
+        SELECT booktag.book_uid, duplicate_tags.kept_uid
+        FROM booktag JOIN duplicate_tags ON booktag.tag_uid = duplicate_tags.uid
+        ON CONFLICT DO NOTHING
+        """
+    )
+    op.execute(
+        "DELETE FROM booktag USING duplicate_tags "
+        "WHERE booktag.tag_uid = duplicate_tags.uid"
+    )
+    op.execute(
+        "DELETE FROM tags USING duplicate_tags WHERE tags.uid = duplicate_tags.uid"
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            # An interrupted concurrent build leaves an invalid index behind
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            op.create_index(
+                name, table, columns, unique=unique, postgresql_concurrently=True
+            )
+
+    for name, table in UNIQUE_CONSTRAINTS:
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE USING INDEX {name}"
+        )
+
+
+def downgrade() -> None:
+    for name, table in UNIQUE_CONSTRAINTS:
+        op.drop_constraint(name, table, type_="unique")
+
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            if not unique:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,68 @@
+"""add book creation time to book tags
+
+Revision ID: 044ab11f1a88
+Revises: 177c23bf0ab7
+Create Date: 2026-10-18 03:30:39.160935
+
+The books of a tag are paged newest first from an index on the links alone,
+which holds a copy of each book's creation time. It replaces the index on
+booktag.tag_uid, whose lookups it also covers.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "044ab11f1a88"
+down_revision: Union[str, None] = "177c23bf0ab7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "booktag", sa.Column("book_created_at", postgresql.TIMESTAMP(), nullable=True)
+    )
+    op.execute(
+        "UPDATE booktag SET book_created_at = books.created_at "
+        "FROM books WHERE books.uid = booktag.book_uid"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "DROP INDEX CONCURRENTLY IF EXISTS "
+            "ix_booktag_tag_uid_book_created_at_book_uid"
+        )
+        op.create_index(
+            "ix_booktag_tag_uid_book_created_at_book_uid",
+            "booktag",
+            ["tag_uid", "book_created_at", "book_uid"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_booktag_tag_uid", table_name="booktag", postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_booktag_tag_uid",
+            "booktag",
+            ["tag_uid"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_booktag_tag_uid_book_created_at_book_uid",
+            table_name="booktag",
+            postgresql_concurrently=True,
+        )
+
+    op.drop_column("booktag", "book_created_at")
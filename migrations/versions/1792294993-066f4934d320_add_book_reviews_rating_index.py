@@ -0,0 +1,44 @@
+"""add book reviews rating index
+
+Revision ID: 066f4934d320
+Revises: 044ab11f1a88
+Create Date: 2026-10-18 03:43:13.214577
+
+The reviews of a book are paged by rating from this index, as they are paged
+by recency from ix_reviews_book_uid_created_at_uid.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "066f4934d320"
+down_revision: Union[str, None] = "044ab11f1a88"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reviews_book_uid_rating_uid")
+        op.create_index(
+            "ix_reviews_book_uid_rating_uid",
+            "reviews",
+            ["book_uid", "rating", "uid"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_reviews_book_uid_rating_uid",
+            table_name="reviews",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,44 @@
+"""add reviews created_at index
+
+Revision ID: 0b1168fc0de8
+Revises: 066f4934d320
+Create Date: 2026-10-18 04:07:09.000000
+
+The admin listing pages all the reviews by recency from this index, and walks
+it for the rating and date range filters.
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0b1168fc0de8"
+down_revision: Union[str, None] = "066f4934d320"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reviews_created_at_uid")
+        op.create_index(
+            "ix_reviews_created_at_uid",
+            "reviews",
+            ["created_at", "uid"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_reviews_created_at_uid",
+            table_name="reviews",
+            postgresql_concurrently=True,
+        )
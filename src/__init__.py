@@ -7,11 +7,14 @@ from contextlib import asynccontextmanager
 from fastapi_limiter import FastAPILimiter
 import redis.asyncio as aioredis
 
-from src.db.main import init_db
+from src.db.main import init_db, async_session_maker
 from src.auth.routes import auth_router
 from src.books.routes import book_router
 from src.reviews.routes import review_router
 from src.tags.routes import tags_router
+from src.books.service import BookService
+from src.tags.suggest import tag_suggestions
+from src.auth.cache import user_cache
 from .errors import register_all_errors
 from .middleware import register_middlware
 from .config import Config
@@ -33,7 +36,21 @@ async def life_span(app: FastAPI):
     )
     await FastAPILimiter.init(redis)
 
+    # Warm up the book detail cache with the most read books
+    if Config.BOOK_CACHE_WARMUP:
+        async with async_session_maker() as session:
+            await BookService().warm_up_detail_cache(Config.BOOK_CACHE_WARMUP, session)
+
+    # Load the tag suggestions, and follow the changes made by other workers
+    await tag_suggestions.start()
+
+    # Follow the users changed by other workers, to drop them from the cache
+    await user_cache.start()
+
     yield
+
+    await tag_suggestions.stop()
+    await user_cache.stop()
     print("server has stopped")
 
 
@@ -0,0 +1,197 @@
+"""
+In-process cache of the users, by uid and by email.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+import asyncio
+import json
+import logging
+import time
+import uuid
+
+from redis.exceptions import RedisError
+
+from .schemas import UserRecordModel
+from src.config import Config
+from src.db.redis import cache_client
+
+CHANNEL = "user_cache"
+
+
+class UserCache:
+    """Keeps the most recently used users of a worker in memory.
+
+    Records are slim, without the password hash or any relationship, and are
+    found by uid or email. The cache holds up to 'size' users, dropping the
+    least recently used first, and each record expires 'ttl' seconds after
+    being read from the database.
+
+    Changes are invalidated locally and published on a Redis channel, which
+    the other workers listen to. A worker that loses the channel clears its
+    cache, as it may have missed some invalidations meanwhile.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self.origin = uuid.uuid4().hex
+        self._users: OrderedDict[uuid.UUID, tuple[float, UserRecordModel]] = (
+            OrderedDict()
+        )
+        self._emails: dict[str, uuid.UUID] = {}
+        # Bumped by every invalidation, so lookups racing one are not cached
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def _drop(self, user_uid: uuid.UUID) -> None:
+        _, user = self._users.pop(user_uid)
+        self._emails.pop(user.email, None)
+
+    def get(self, user_uid: uuid.UUID) -> Optional[UserRecordModel]:
+        """Returns the cached user with the uid, counting the hit or miss."""
+        entry = self._users.get(user_uid)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+
+        if expires_at <= time.monotonic():
+            self._drop(user_uid)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._users.move_to_end(user_uid)
+        self.hits += 1
+
+        return user
+
+    def get_by_email(self, email: str) -> Optional[UserRecordModel]:
+        """Returns the cached user with the email, counting the hit or miss."""
+        user_uid = self._emails.get(email)
+
+        if user_uid is None:
+            self.misses += 1
+            return None
+
+        return self.get(user_uid)
+
+    def set(self, user: UserRecordModel, version: int) -> None:
+        """Caches a user read from the database when the cache was at 'version'.
+
+        The user is not cached if it was invalidated since, as the record may
+        have been read before the change.
+        """
+        if version != self.version:
+            return
+
+        if user.uid in self._users:
+            self._drop(user.uid)
+
+        self._users[user.uid] = (time.monotonic() + self.ttl, user)
+        self._emails[user.email] = user.uid
+
+        while len(self._users) > self.size:
+            self._drop(next(iter(self._users)))
+            self.evictions += 1
+
+    def apply(self, event: dict) -> None:
+        """Drops the users changed by this worker or another one."""
+        self.version += 1
+
+        for email in event["emails"]:
+            user_uid = self._emails.get(email)
+            if user_uid is not None:
+                self._drop(user_uid)
+                self.invalidations += 1
+
+        for user_uid in event["uids"]:
+            if uuid.UUID(user_uid) in self._users:
+                self._drop(uuid.UUID(user_uid))
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.version += 1
+        self._users.clear()
+        self._emails.clear()
+
+    async def invalidate(self, *users: tuple[uuid.UUID, str]) -> None:
+        """Drops users that have just been changed, in every worker.
+
+        Users are given as (uid, email), any of which may be None.
+        """
+        event = {
+            "uids": [str(user_uid) for user_uid, _ in users if user_uid],
+            "emails": [email for _, email in users if email],
+        }
+        self.apply(event)
+
+        try:
+            await cache_client.publish(
+                CHANNEL, json.dumps({**event, "origin": self.origin})
+            )
+        except RedisError as e:
+            logging.exception(e)
+
+    def stats(self) -> dict:
+        """Returns the counters of this worker's cache."""
+        lookups = self.hits + self.misses
+
+        return {
+            "size": len(self._users),
+            "max_size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    async def _listen(self) -> None:
+        """Applies the invalidations published by the other workers."""
+        while True:
+            pubsub = cache_client.pubsub(ignore_subscribe_messages=True)
+
+            try:
+                # Anything cached before subscribing may have missed a change
+                await pubsub.subscribe(CHANNEL)
+                self.clear()
+
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+
+                    if message is not None:
+                        event = json.loads(message["data"])
+                        if event["origin"] != self.origin:
+                            self.apply(event)
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logging.exception(e)
+                self.clear()
+                await asyncio.sleep(1)
+
+            finally:
+                await pubsub.aclose()
+
+    async def start(self) -> None:
+        """Starts following the invalidations of the other workers."""
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+
+
+user_cache = UserCache(Config.USER_CACHE_SIZE, Config.USER_CACHE_TTL)
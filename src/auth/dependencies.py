@@ -1,15 +1,16 @@
 """Dependencies for the authentication module."""
 
 from typing import List
+import uuid
 
 from fastapi import Request, Depends
 from fastapi.security import HTTPBearer
 from fastapi.security.http import HTTPAuthorizationCredentials
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from .schemas import PrincipalModel
 from .utils import decode_token
 from .service import UserService
-from src.db.models import User
 from src.db.redis import token_in_blocklist
 from src.db.main import get_session
 from src.errors import (
@@ -31,13 +32,11 @@ class TokenBearer(HTTPBearer):
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials:
         creds = await super().__call__(request)
 
-        token = creds.credentials
+        token_data = decode_token(creds.credentials)
 
-        if not self.is_token_valid(token):
+        if token_data is None:
             raise InvalidToken()
 
-        token_data = decode_token(token)
-
         if await token_in_blocklist(token_data["jti"]):
             raise RevokedToken()
 
@@ -45,11 +44,6 @@ class TokenBearer(HTTPBearer):
 
         return token_data
 
-    def is_token_valid(self, token: str) -> bool:
-        token_data = decode_token(token)
-
-        return token_data is not None
-
     def verify_token_data(self, token_data: dict) -> None:
         raise NotImplementedError("Please override this method in child classes.")
 
@@ -68,17 +62,33 @@ class RefreshTokenBearer(TokenBearer):
             raise RefreshTokenRequired()
 
 
-async def get_current_user(
-    token_details: dict = Depends(AccessTokenBearer()),
-    session: AsyncSession = Depends(get_session),
-):
-    """Get data for the current user."""
-    user_email = token_details["user"]["email"]
+# Shared by the routes, so the token is only checked once per request
+access_token_bearer = AccessTokenBearer()
 
-    # NOTE: we should try to implement cache for this
-    user = await user_service.get_user_by_email(user_email, session)
 
-    return user
+async def get_current_principal(
+    token_details: dict = Depends(access_token_bearer),
+    session: AsyncSession = Depends(get_session),
+) -> PrincipalModel:
+    """Get the current user from the claims of their access token.
+
+    No query is made, so a role change applies from the next access token,
+    which is issued with the role read again. Tokens issued without a role
+    have it looked up instead.
+    """
+    user_data = token_details["user"]
+    role = user_data.get("role")
+
+    if role is None:
+        role = await user_service.get_user_role(
+            uuid.UUID(user_data["user_uid"]), session
+        )
+        if role is None:
+            raise InvalidToken()
+
+    return PrincipalModel(
+        uid=user_data["user_uid"], email=user_data["email"], role=role
+    )
 
 
 class RoleChecker:
@@ -86,10 +96,10 @@ class RoleChecker:
     def __init__(self, allowed_roles: List[str]) -> None:
         self.allowed_roles = allowed_roles
 
-    def __call__(self, current_user: User = Depends(get_current_user)) -> bool:
-        # NOTE: we might not even need to query the user, since the 'role' is now included in the token details
-        # TODO: check if we can access 'token_details' here
-        if current_user.role in self.allowed_roles:
+    def __call__(
+        self, principal: PrincipalModel = Depends(get_current_principal)
+    ) -> bool:
+        if principal.role in self.allowed_roles:
             return True
 
         raise InsufficientPermission()
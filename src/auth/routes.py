@@ -3,6 +3,7 @@ Routes for the authentication module.
 """
 
 from datetime import datetime
+import uuid
 
 from fastapi import APIRouter, status, Depends, BackgroundTasks
 from fastapi.exceptions import HTTPException
@@ -11,6 +12,8 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi_limiter.depends import RateLimiter
 
 from .schemas import (
+    PrincipalModel,
+    UserCacheStatsModel,
     UserModel,
     UserCreateModel,
     UserCreateResponseModel,
@@ -23,6 +26,7 @@ from .schemas import (
     PasswordResetRequestModel,
     PasswordResetConfirmModel,
 )
+from .cache import user_cache
 from .service import UserService
 from .utils import (
     create_access_token,
@@ -33,12 +37,13 @@ from .utils import (
 )
 from .dependencies import (
     RefreshTokenBearer,
-    AccessTokenBearer,
     RoleChecker,
-    get_current_user,
+    access_token_bearer,
+    get_current_principal,
 )
 from src.db.main import get_session
 from src.db.redis import add_jti_to_blocklist
+from src.fieldsets import FieldSet, fields_query
 from src.errors import (
     UserAlreadyExists,
     InvalidCredentials,
@@ -52,9 +57,9 @@ from src.celery_tasks import send_email
 auth_router = APIRouter()
 user_service = UserService()
 refresh_token_bearer = RefreshTokenBearer()
-access_token_bearer = AccessTokenBearer()
 # This will define routes allowed only for specified user roles
 role_checker = RoleChecker(["admin", "user"])
+admin_role_checker = RoleChecker(["admin"])
 
 
 @auth_router.post("/send-mail")
@@ -195,14 +200,26 @@ async def login_users(
     response_model=RefreshTokenResponseModel,
     status_code=status.HTTP_200_OK,
 )
-async def get_new_access_token(token_details: dict = Depends(refresh_token_bearer)):
-    """Gets a new access token from a refresh token."""
+async def get_new_access_token(
+    token_details: dict = Depends(refresh_token_bearer),
+    session: AsyncSession = Depends(get_session),
+):
+    """Gets a new access token from a refresh token.
+
+    The role is read again, as the access token is trusted with it.
+    """
     expiry_timestamp = token_details["exp"]
 
     if datetime.fromtimestamp(expiry_timestamp) <= datetime.now():
         raise InvalidToken()
 
-    new_access_token = create_access_token(user_data=token_details["user"])
+    user_data = token_details["user"]
+    role = await user_service.get_user_role(uuid.UUID(user_data["user_uid"]), session)
+
+    if role is None:
+        raise InvalidToken()
+
+    new_access_token = create_access_token(user_data={**user_data, "role": role})
 
     return JSONResponse(
         content={
@@ -213,11 +230,35 @@ async def get_new_access_token(token_details: dict = Depends(refresh_token_beare
 
 @auth_router.get("/me", response_model=UserBooksModel, status_code=status.HTTP_200_OK)
 async def get_current_logged_user(
-    user=Depends(get_current_user),
+    principal: PrincipalModel = Depends(get_current_principal),
     _: bool = Depends(role_checker),  # This restricts the endpoint for authorized users
+    fields: FieldSet = Depends(fields_query(UserBooksModel)),
+    session: AsyncSession = Depends(get_session),
 ):
-    """Returns info about the current logged in user."""
-    return user
+    """Returns info about the current logged in user.
+
+    The user's books and reviews are only loaded when their fields are returned.
+    Without them, the user is read from the worker's cache.
+    """
+    if fields and not fields.names & {"books", "reviews"}:
+        user = await user_service.get_user_record(principal.uid, session)
+    else:
+        user = await user_service.get_user_profile(principal.uid, session, fields)
+
+    if not user:
+        raise UserNotFound()
+
+    return fields.response(user)
+
+
+@auth_router.get(
+    "/cache/stats",
+    response_model=UserCacheStatsModel,
+    dependencies=[Depends(admin_role_checker)],
+)
+async def get_user_cache_stats():
+    """Returns the counters of the user cache of the worker answering."""
+    return user_cache.stats()
 
 
 @auth_router.get(
@@ -54,6 +54,41 @@ class UserLoginModel(BaseModel):
     password: str = Field(min_length=6)
 
 
+class UserRecordModel(BaseModel):
+    """The columns of a user kept in memory, without the password hash."""
+
+    uid: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    role: str
+    is_verified: bool
+
+    model_config = {"frozen": True}
+
+
+class UserCacheStatsModel(BaseModel):
+    size: int
+    max_size: int
+    hits: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class PrincipalModel(BaseModel):
+    """The user making a request, as told by their access token."""
+
+    uid: uuid.UUID
+    email: str
+    role: str
+
+
 class UserLoginSimplifiedModel(BaseModel):
     email: str
     uid: uuid.UUID
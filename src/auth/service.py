@@ -2,24 +2,102 @@
 Service for authentication methods.
 """
 
+from typing import Optional
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import raiseload
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel import select
 
-from .schemas import UserCreateModel
+from .cache import user_cache
+from .schemas import UserCreateModel, UserBooksModel, UserRecordModel
 from src.db.models import User
+from src.db.projections import sparse
+from src.errors import UserAlreadyExists
+from src.fieldsets import FieldSet
 from .utils import generate_passwd_hash
 
 
+# Columns read for the cached user records
+RECORD_COLUMNS = [getattr(User, name) for name in UserRecordModel.model_fields]
+
+
 class UserService:
     async def get_user_by_email(self, email: str, session: AsyncSession) -> User:
-        statement = select(User).where(User.email == email)
+        # The user's books and reviews are only loaded by 'get_user_profile'
+        statement = select(User).where(User.email == email).options(raiseload("*"))
 
         result = await session.exec(statement)
 
         return result.first()
 
+    async def get_user_profile(
+        self,
+        user_uid: uuid.UUID,
+        session: AsyncSession,
+        fields: Optional[FieldSet] = None,
+    ) -> User:
+        """Loads a user with the requested fields of the profile, books included."""
+        statement = (
+            select(User)
+            .where(User.uid == user_uid)
+            .options(*sparse(User, UserBooksModel, fields))
+            .execution_options(populate_existing=True)
+        )
+
+        result = await session.exec(statement)
+
+        return result.first()
+
+    async def _load_user_record(
+        self, condition, version: int, session: AsyncSession
+    ) -> Optional[UserRecordModel]:
+        result = await session.exec(select(*RECORD_COLUMNS).where(condition))
+        row = result.first()
+
+        if row is None:
+            return None
+
+        user = UserRecordModel.model_validate(dict(row._mapping))
+        user_cache.set(user, version)
+
+        return user
+
+    async def get_user_record(
+        self, user_uid: uuid.UUID, session: AsyncSession
+    ) -> Optional[UserRecordModel]:
+        """Returns the slim record of a user, from the worker's cache if there."""
+        user = user_cache.get(user_uid)
+
+        if user is None:
+            version = user_cache.version
+            user = await self._load_user_record(User.uid == user_uid, version, session)
+
+        return user
+
+    async def get_user_record_by_email(
+        self, email: str, session: AsyncSession
+    ) -> Optional[UserRecordModel]:
+        """Returns the slim record of a user, from the worker's cache if there."""
+        user = user_cache.get_by_email(email)
+
+        if user is None:
+            version = user_cache.version
+            user = await self._load_user_record(User.email == email, version, session)
+
+        return user
+
+    async def get_user_role(
+        self, user_uid: uuid.UUID, session: AsyncSession
+    ) -> Optional[str]:
+        """Returns the role of a user, or None if the user doesn't exist."""
+        user = await self.get_user_record(user_uid, session)
+
+        return user.role if user else None
+
     async def user_exists(self, email: str, session: AsyncSession) -> bool:
-        user = await self.get_user_by_email(email, session)
+        user = await self.get_user_record_by_email(email, session)
 
         return user is not None
 
@@ -37,16 +115,28 @@ class UserService:
 
         session.add(new_user)
 
-        await session.commit()
+        try:
+            await session.commit()
+        except IntegrityError:
+            # Another signup with the same email committed since it was checked
+            await session.rollback()
+            raise UserAlreadyExists()
+
+        await user_cache.invalidate((new_user.uid, new_user.email))
 
         return new_user
 
     async def update_user(
         self, user: User, user_data: dict, session: AsyncSession
     ) -> User:
+        # The previous email may be cached for this user
+        cached = (user.uid, user.email)
+
         for k, v in user_data.items():
             setattr(user, k, v)
 
         await session.commit()
 
+        await user_cache.invalidate(cached, (user.uid, user.email))
+
         return user
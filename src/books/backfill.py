@@ -0,0 +1,30 @@
+"""
+Command to recompute the rating aggregates of every book from its reviews.
+
+Usage: python -m src.books.backfill
+"""
+
+import asyncio
+
+from src.books.cache import book_cache
+from src.books.service import BookService
+from src.db.main import async_session_maker
+
+BATCH_SIZE = 1000
+
+book_service = BookService()
+
+
+async def main():
+    async with async_session_maker() as session:
+        book_uids = await book_service.backfill_rating_aggregates(session)
+
+    # The cached details of the updated books show the old aggregates
+    for start in range(0, len(book_uids), BATCH_SIZE):
+        await book_cache.invalidate(*book_uids[start : start + BATCH_SIZE])
+
+    print(f"Updated the rating aggregates of {len(book_uids)} books")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+Redis caches for the book detail responses and the listing facet counts.
+"""
+
+from typing import Optional
+import json
+import logging
+
+from redis.exceptions import RedisError
+
+from src.config import Config
+from src.db.redis import cache_client
+
+KEY_PREFIX = "book_detail"
+STATS_KEY = f"{KEY_PREFIX}:stats"
+READS_KEY = f"{KEY_PREFIX}:reads"
+FACETS_KEY_PREFIX = "book_facets"
+
+# Reads a cached detail, counting the hit or miss and the read in one round trip.
+# Read counts are kept for the most read books only: once twice as many are
+# counted, the least read ones are dropped, so new books get a chance to climb.
+READ_SCRIPT = cache_client.register_script(
+    """
+    local cached = redis.call('HMGET', KEYS[1], 'etag', 'body')
+    redis.call('HINCRBY', KEYS[2], cached[2] and 'hits' or 'misses', 1)
+    redis.call('ZINCRBY', KEYS[3], 1, ARGV[1])
+    local size = tonumber(ARGV[2])
+    if redis.call('ZCARD', KEYS[3]) > 2 * size then
+        redis.call('ZREMRANGEBYRANK', KEYS[3], 0, -size - 1)
+    end
+    return cached
+    """
+)
+
+
+class BookCache:
+    """Caches the serialized detail of each book along with its ETag.
+
+    Redis errors are logged and handled as cache misses, so the API keeps
+    serving from the database when Redis is unavailable.
+    """
+
+    def _key(self, book_uid) -> str:
+        return f"{KEY_PREFIX}:{book_uid}"
+
+    async def get(self, book_uid) -> Optional[tuple[str, bytes]]:
+        """Returns the cached ETag and JSON body of a book detail."""
+        try:
+            etag, body = await READ_SCRIPT(
+                keys=[self._key(book_uid), STATS_KEY, READS_KEY],
+                args=[str(book_uid), Config.BOOK_CACHE_READS_SIZE],
+            )
+        except RedisError as e:
+            logging.exception(e)
+            return None
+
+        if body is None:
+            return None
+
+        return etag.decode(), body
+
+    async def set(self, book_uid, etag: str, body: bytes) -> None:
+        try:
+            async with cache_client.pipeline(transaction=True) as pipeline:
+                pipeline.hset(self._key(book_uid), mapping={"etag": etag, "body": body})
+                pipeline.expire(self._key(book_uid), Config.BOOK_CACHE_TTL)
+                await pipeline.execute()
+        except RedisError as e:
+            logging.exception(e)
+
+    async def invalidate(self, *book_uids) -> None:
+        """Drops the cached details of books that have just been changed."""
+        try:
+            await cache_client.delete(*[self._key(book_uid) for book_uid in book_uids])
+        except RedisError as e:
+            logging.exception(e)
+
+    async def most_read(self, count: int) -> list[str]:
+        """Returns the uids of the books whose details are read the most."""
+        try:
+            book_uids = await cache_client.zrevrange(READS_KEY, 0, count - 1)
+        except RedisError as e:
+            logging.exception(e)
+            return []
+
+        return [book_uid.decode() for book_uid in book_uids]
+
+    async def stats(self) -> dict:
+        try:
+            counters = await cache_client.hgetall(STATS_KEY)
+        except RedisError as e:
+            logging.exception(e)
+            counters = {}
+
+        hits = int(counters.get(b"hits", 0))
+        misses = int(counters.get(b"misses", 0))
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+
+class FacetCache:
+    """Caches the facet counts of each filtered set of books for a short while.
+
+    Counts are not invalidated on writes, they are only as stale as the TTL.
+    """
+
+    def _key(self, filters_key: str) -> str:
+        return f"{FACETS_KEY_PREFIX}:{filters_key}"
+
+    async def get(self, filters_key: str) -> Optional[dict]:
+        try:
+            facets = await cache_client.get(self._key(filters_key))
+        except RedisError as e:
+            logging.exception(e)
+            return None
+
+        return json.loads(facets) if facets else None
+
+    async def set(self, filters_key: str, facets: dict) -> None:
+        try:
+            await cache_client.set(
+                self._key(filters_key), json.dumps(facets), ex=Config.FACET_CACHE_TTL
+            )
+        except RedisError as e:
+            logging.exception(e)
+
+
+book_cache = BookCache()
+facet_cache = FacetCache()
@@ -0,0 +1,89 @@
+"""
+Filters and sort orders for the books listing.
+"""
+
+from datetime import date, datetime
+from typing import Any, Callable, List, Literal, Optional
+import hashlib
+import json
+
+from fastapi import Query
+
+from src.db.models import Book
+
+BookSort = Literal["created_at", "published_date", "page_count", "title", "rating"]
+SortOrder = Literal["asc", "desc"]
+TagMatch = Literal["all", "any"]
+
+# Column and cursor value parser of each sort key
+SORT_KEYS: dict[str, tuple[Any, Callable[[Any], Any]]] = {
+    "created_at": (Book.created_at, datetime.fromisoformat),
+    "published_date": (Book.published_date, date.fromisoformat),
+    "page_count": (Book.page_count, int),
+    "title": (Book.title, str),
+    "rating": (Book.rating_average, float),
+}
+
+FACETS = ("language", "publisher", "author")
+
+
+class BookFilters:
+    """Dependency with the filters and sort order of the books listing.
+
+    Each facet accepts several values, matching books with any of them.
+    """
+
+    def __init__(
+        self,
+        language: List[str] = Query(default=[]),
+        publisher: List[str] = Query(default=[]),
+        author: List[str] = Query(default=[]),
+        published_from: Optional[date] = Query(default=None),
+        published_to: Optional[date] = Query(default=None),
+        min_pages: Optional[int] = Query(default=None, ge=0),
+        max_pages: Optional[int] = Query(default=None, ge=0),
+        sort: BookSort = Query(default="created_at"),
+        order: SortOrder = Query(default="desc"),
+    ):
+        self.language = language
+        self.publisher = publisher
+        self.author = author
+        self.published_from = published_from
+        self.published_to = published_to
+        self.min_pages = min_pages
+        self.max_pages = max_pages
+        self.sort = sort
+        self.order = order
+
+    def conditions(self) -> list:
+        """Returns the WHERE clauses matching the filters."""
+        conditions = [
+            getattr(Book, facet).in_(values)
+            for facet in FACETS
+            if (values := getattr(self, facet))
+        ]
+
+        if self.published_from:
+            conditions.append(Book.published_date >= self.published_from)
+        if self.published_to:
+            conditions.append(Book.published_date <= self.published_to)
+        if self.min_pages is not None:
+            conditions.append(Book.page_count >= self.min_pages)
+        if self.max_pages is not None:
+            conditions.append(Book.page_count <= self.max_pages)
+
+        return conditions
+
+    def cache_key(self) -> str:
+        """Identifies the filtered set of books, whatever the sort order."""
+        filters = {
+            "language": sorted(self.language),
+            "publisher": sorted(self.publisher),
+            "author": sorted(self.author),
+            "published_from": str(self.published_from),
+            "published_to": str(self.published_to),
+            "min_pages": self.min_pages,
+            "max_pages": self.max_pages,
+        }
+
+        return hashlib.sha1(json.dumps(filters, sort_keys=True).encode()).hexdigest()
@@ -0,0 +1,129 @@
+"""
+Bulk import of books from streamed NDJSON or CSV request bodies.
+"""
+
+from collections import Counter
+from datetime import datetime
+from typing import AsyncIterator, Union
+import uuid
+
+from pydantic import ValidationError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .schemas import BookImportModel
+from src.config import Config
+from src.db.models import Book, BookTag
+from src.importing import ImportResultModel, report_error, validation_message
+from src.tags.service import TagService
+from src.tags.suggest import tag_suggestions
+
+tag_service = TagService()
+
+BOOK_COLUMNS = [
+    "uid",
+    "created_at",
+    "updated_at",
+    "title",
+    "author",
+    "publisher",
+    "published_date",
+    "page_count",
+    "language",
+    "user_uid",
+]
+
+
+class BookImporter:
+    async def import_books(
+        self,
+        records: AsyncIterator[tuple[int, Union[str, dict]]],
+        user_uid: str,
+        session: AsyncSession,
+    ) -> ImportResultModel:
+        """Validates records as they arrive and inserts them in batches.
+
+        Each batch is committed on its own, so a long import keeps only one
+        batch in memory and the rows already reported as inserted are kept
+        even if a later batch fails.
+        """
+        report = ImportResultModel()
+        batch = []
+
+        async for row, record in records:
+            try:
+                if isinstance(record, str):
+                    book = BookImportModel.model_validate_json(record)
+                else:
+                    book = BookImportModel.model_validate(record)
+
+            except ValidationError as e:
+                report_error(report, row, validation_message(e))
+                continue
+
+            batch.append(book)
+
+            if len(batch) >= Config.IMPORT_BATCH_SIZE:
+                report.inserted += await self._insert_batch(batch, user_uid, session)
+                batch = []
+
+        if batch:
+            report.inserted += await self._insert_batch(batch, user_uid, session)
+
+        return report
+
+    async def _insert_batch(
+        self, batch: list[BookImportModel], user_uid: str, session: AsyncSession
+    ) -> int:
+        """Copies a batch of books and their tag links into the database."""
+        tag_uids = await tag_service.get_or_create_tags(
+            (name for book in batch for name in book.tags), session
+        )
+
+        now = datetime.now()
+        user_uid = uuid.UUID(user_uid) if user_uid else None
+        books = []
+        links = []
+        usage = Counter()
+
+        for book in batch:
+            book_uid = uuid.uuid4()
+            books.append(
+                (
+                    book_uid,
+                    now,
+                    now,
+                    book.title,
+                    book.author,
+                    book.publisher,
+                    book.published_date,
+                    book.page_count,
+                    book.language,
+                    user_uid,
+                )
+            )
+            links.extend((book_uid, tag_uids[name], now) for name in set(book.tags))
+            usage.update(set(book.tags))
+
+        # COPY runs on the session's own connection, so it joins its transaction
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+
+        await driver_connection.copy_records_to_table(
+            Book.__tablename__, records=books, columns=BOOK_COLUMNS
+        )
+
+        if links:
+            await driver_connection.copy_records_to_table(
+                BookTag.__tablename__,
+                records=links,
+                columns=["book_uid", "tag_uid", "book_created_at"],
+            )
+
+        await session.commit()
+
+        await tag_suggestions.tags_used(
+            (tag_uids[name], name, count) for name, count in usage.items()
+        )
+
+        return len(books)
@@ -0,0 +1,214 @@
+"""
+Book leaderboards kept in Redis sorted sets.
+
+The top rated leaderboard uses forward decay: each review adds its weight
+scaled by 2 ** ((created_at - epoch) / half life), so newer reviews count more
+without ever rewriting older scores. The reconciliation job rebuilds both
+leaderboards from Postgres and moves the epoch forward, which keeps the
+scaling factors small.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+import logging
+
+from redis.exceptions import RedisError
+from sqlmodel import desc, func, select, extract
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.config import Config
+from src.db.models import Book, Review
+from src.db.redis import cache_client
+
+KEY_PREFIX = "leaderboard"
+TOP_RATED_KEY = f"{KEY_PREFIX}:top_rated"
+MOST_REVIEWED_KEY = f"{KEY_PREFIX}:most_reviewed"
+EPOCH_KEY = f"{KEY_PREFIX}:epoch"
+
+# Reviews rated above this lift a book in the top rated leaderboard, below it sink it
+NEUTRAL_RATING = 3
+
+
+class Leaderboards:
+    """Keeps the 'top rated this week' and 'most reviewed' leaderboards.
+
+    Redis errors are logged and ignored when updating, the next
+    reconciliation fixes any update that was missed.
+    """
+
+    def _decay(self, created_at: datetime, epoch: datetime) -> float:
+        return 2 ** (
+            (created_at - epoch).total_seconds() / Config.LEADERBOARD_HALF_LIFE
+        )
+
+    async def _get_epoch(self) -> datetime:
+        """Returns the decay epoch, starting it now if there is none yet.
+
+        Scores left from a lost epoch can't be compared with new ones, so the
+        top rated leaderboard starts over until the next reconciliation.
+        """
+        async with cache_client.pipeline(transaction=True) as pipeline:
+            pipeline.set(EPOCH_KEY, datetime.now().isoformat(), nx=True)
+            pipeline.get(EPOCH_KEY)
+            started, epoch = await pipeline.execute()
+
+        if started:
+            await cache_client.delete(TOP_RATED_KEY)
+
+        return datetime.fromisoformat(epoch.decode())
+
+    async def _update(
+        self, reviews: Iterable[tuple], sign: int, review_counts: dict
+    ) -> None:
+        """Adds or removes (book uid, rating, creation time) reviews at once.
+
+        The review counts are those of the books after the change, as updated
+        in their aggregates. They are set as they are rather than incremented,
+        so books that weren't in the most reviewed leaderboard yet, or had
+        been cut from it, enter it with their whole count.
+        """
+        try:
+            epoch = await self._get_epoch()
+            # Reviews from before the window already left the leaderboard
+            window_start = datetime.now() - timedelta(seconds=Config.LEADERBOARD_WINDOW)
+            scores = Counter()
+
+            for book_uid, rating, created_at in reviews:
+                if created_at >= window_start:
+                    score = (rating - NEUTRAL_RATING) * self._decay(created_at, epoch)
+                    scores[str(book_uid)] += sign * score
+
+            async with cache_client.pipeline(transaction=True) as pipeline:
+                for book_uid, count in review_counts.items():
+                    if count > 0:
+                        pipeline.zadd(MOST_REVIEWED_KEY, {str(book_uid): count})
+                    else:
+                        pipeline.zrem(MOST_REVIEWED_KEY, str(book_uid))
+                for book_uid, score in scores.items():
+                    pipeline.zincrby(TOP_RATED_KEY, score, book_uid)
+
+                await pipeline.execute()
+
+        except RedisError as e:
+            logging.exception(e)
+
+    async def add_review(self, review: Review, review_count: int) -> None:
+        await self._update(
+            [(review.book_uid, review.rating, review.created_at)],
+            1,
+            {review.book_uid: review_count},
+        )
+
+    async def add_reviews(self, reviews: Iterable[tuple], review_counts: dict) -> None:
+        """Adds many (book uid, rating, creation time) reviews in one pipeline.
+
+        'review_counts' has the new review count of each of their books.
+        """
+        await self._update(reviews, 1, review_counts)
+
+    async def remove_review(self, review: Review, review_count: int) -> None:
+        await self._update(
+            [(review.book_uid, review.rating, review.created_at)],
+            -1,
+            {review.book_uid: review_count},
+        )
+
+    async def remove_books(self, *book_uids) -> None:
+        try:
+            async with cache_client.pipeline(transaction=True) as pipeline:
+                pipeline.zrem(TOP_RATED_KEY, *map(str, book_uids))
+                pipeline.zrem(MOST_REVIEWED_KEY, *map(str, book_uids))
+                await pipeline.execute()
+        except RedisError as e:
+            logging.exception(e)
+
+    async def top_rated(self, limit: int, start: int = 0) -> list[tuple[str, float]]:
+        """Returns the best rated books of the window, with their current scores.
+
+        'start' skips that many books, to read the leaderboard page by page.
+        """
+        try:
+            async with cache_client.pipeline(transaction=False) as pipeline:
+                pipeline.zrevrangebyscore(
+                    TOP_RATED_KEY, "+inf", "(0", start=start, num=limit, withscores=True
+                )
+                pipeline.get(EPOCH_KEY)
+                entries, epoch = await pipeline.execute()
+        except RedisError as e:
+            logging.exception(e)
+            return []
+
+        if not entries or epoch is None:
+            # Without their epoch the scores can't be scaled, until reconciled
+            return []
+
+        # Scores are relative to the epoch, scaling them back gives their value now
+        scale = self._decay(datetime.now(), datetime.fromisoformat(epoch.decode()))
+
+        return [(book_uid.decode(), score / scale) for book_uid, score in entries]
+
+    async def most_reviewed(
+        self, limit: int, start: int = 0
+    ) -> list[tuple[str, float]]:
+        """Returns the books with the most reviews, with their review counts.
+
+        'start' skips that many books, to read the leaderboard page by page.
+        """
+        try:
+            entries = await cache_client.zrevrange(
+                MOST_REVIEWED_KEY, start, start + limit - 1, withscores=True
+            )
+        except RedisError as e:
+            logging.exception(e)
+            return []
+
+        return [(book_uid.decode(), score) for book_uid, score in entries]
+
+    async def reconcile(self, session: AsyncSession) -> dict:
+        """Rebuilds both leaderboards from Postgres, moving the epoch to now.
+
+        Each leaderboard is written to a temporary key and renamed over the
+        live one, so readers never see it half built.
+        """
+        epoch = datetime.now()
+        window_start = epoch - timedelta(seconds=Config.LEADERBOARD_WINDOW)
+
+        weight = (Review.rating - NEUTRAL_RATING) * func.power(
+            2,
+            extract("epoch", Review.created_at - epoch) / Config.LEADERBOARD_HALF_LIFE,
+        )
+        top_rated = await session.exec(
+            select(Review.book_uid, func.sum(weight).label("score"))
+            .where(Review.created_at >= window_start, Review.book_uid.is_not(None))
+            .group_by(Review.book_uid)
+            .order_by(desc("score"))
+            .limit(Config.LEADERBOARD_SIZE)
+        )
+        most_reviewed = await session.exec(
+            select(Book.uid, Book.review_count)
+            .where(Book.review_count > 0)
+            .order_by(desc(Book.review_count))
+            .limit(Config.LEADERBOARD_SIZE)
+        )
+
+        leaderboards = {
+            TOP_RATED_KEY: {str(uid): float(score) for uid, score in top_rated.all()},
+            MOST_REVIEWED_KEY: {str(uid): count for uid, count in most_reviewed.all()},
+        }
+
+        async with cache_client.pipeline(transaction=True) as pipeline:
+            for key, scores in leaderboards.items():
+                pipeline.delete(f"{key}:next")
+                if scores:
+                    pipeline.zadd(f"{key}:next", scores)
+                    pipeline.rename(f"{key}:next", key)
+                else:
+                    pipeline.delete(key)
+            pipeline.set(EPOCH_KEY, epoch.isoformat())
+            await pipeline.execute()
+
+        return {key: len(scores) for key, scores in leaderboards.items()}
+
+
+leaderboards = Leaderboards()
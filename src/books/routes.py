@@ -2,45 +2,111 @@
 Routes for the books module.
 """
 
-from typing import List
-
+from datetime import datetime
+from typing import List, Optional, Union
 import uuid
-from fastapi import APIRouter, status, Depends
+
+from fastapi import APIRouter, status, Depends, Query, Request, Response
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .schemas import Book, BookDetailModel, BookCreateModel, BookUpdateModel
+from .schemas import (
+    Book,
+    BookDetailModel,
+    BookCreateModel,
+    BookUpdateModel,
+    BookCacheStatsModel,
+    BookPageModel,
+    LeaderboardEntryModel,
+    BookBatchGetModel,
+    BookBatchModel,
+    BookDetailBatchModel,
+)
+from src.config import Config
 from src.db.main import get_session
 from src.books.service import BookService
-from src.auth.dependencies import AccessTokenBearer, RoleChecker
+from src.books.importer import BookImporter
+from src.books.cache import book_cache
+from src.books.filters import BookFilters
+from src.books.leaderboards import leaderboards
+from src.auth.dependencies import RoleChecker, access_token_bearer
 from src.errors import BookNotFound
+from src.fieldsets import FieldSet, fields_query
+from src.importing import ImportResultModel
+from src.pagination import Page, PageParams
+from src.etags import make_etag, etag_matches, not_modified
+from src.streaming import (
+    NDJSON_MEDIA_TYPE,
+    CSV_MEDIA_TYPE,
+    ExportFormat,
+    export_response,
+    iter_records,
+    record_media_type,
+)
 
 book_router = APIRouter()
 book_service = BookService()
-access_token_bearer = AccessTokenBearer()
+book_importer = BookImporter()
 role_checker = RoleChecker(["admin", "user"])
+admin_role_checker = RoleChecker(["admin"])
 
 
-@book_router.get("/", response_model=List[Book], dependencies=[Depends(role_checker)])
+@book_router.get(
+    "/", response_model=BookPageModel, dependencies=[Depends(role_checker)]
+)
 async def get_all_books(
+    page: PageParams = Depends(),
+    filters: BookFilters = Depends(),
+    fields: FieldSet = Depends(fields_query(Book)),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    """Lists existing books, newest first unless another order is requested.
+
+    The facet counts describe all the books matching the filters, not just
+    the returned page.
+    """
+    books, next_cursor = await book_service.get_all_books(
+        session, page.limit, page.cursor, filters, fields
+    )
+    facets = await book_service.get_book_facets(filters, session)
+    content = {"items": books, "next_cursor": next_cursor, "facets": facets}
+    return fields.response(content)
+
+
+@book_router.get(
+    "/search", response_model=Page[Book], dependencies=[Depends(role_checker)]
+)
+async def search_books(
+    q: str = Query(min_length=1, max_length=200, description="Search terms."),
+    page: PageParams = Depends(),
+    fields: FieldSet = Depends(fields_query(Book)),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    """Lists existing books."""
-    books = await book_service.get_all_books(session)
-    return books
+    """Searches books by title, author and publisher, best matches first."""
+    books, next_cursor = await book_service.search_books(
+        q, session, page.limit, page.cursor, fields
+    )
+    content = {"items": books, "next_cursor": next_cursor}
+    return fields.response(content)
 
 
 @book_router.get(
-    "/user/{user_uid}", response_model=List[Book], dependencies=[Depends(role_checker)]
+    "/user/{user_uid}", response_model=Page[Book], dependencies=[Depends(role_checker)]
 )
 async def get_user_book_submissions(
     user_uid: uuid.UUID,
+    page: PageParams = Depends(),
+    fields: FieldSet = Depends(fields_query(Book)),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
 ):
-    """Lists books submitted by a specific user."""
-    books = await book_service.get_user_books(user_uid, session)
-    return books
+    """Lists books submitted by a specific user, newest first."""
+    books, next_cursor = await book_service.get_user_books(
+        user_uid, session, page.limit, page.cursor, fields
+    )
+    content = {"items": books, "next_cursor": next_cursor}
+    return fields.response(content)
 
 
 @book_router.post(
@@ -60,19 +126,166 @@ async def create_a_book(
     return new_book
 
 
+@book_router.get("/export", dependencies=[Depends(admin_role_checker)])
+async def export_books(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    since: Optional[datetime] = Query(
+        default=None, description="Only export books updated at or after this time."
+    ),
+):
+    """Streams every book as NDJSON or CSV."""
+    statement = book_service.get_export_statement(since)
+    return export_response(statement, export_format, "books")
+
+
+@book_router.get(
+    "/leaderboards/top-rated",
+    response_model=List[LeaderboardEntryModel],
+    dependencies=[Depends(role_checker)],
+)
+async def get_top_rated_books(
+    limit: int = Query(default=10, ge=1, le=Config.PAGE_SIZE_MAX),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    """Lists the best rated books of the week, recent reviews weighing more."""
+    return await book_service.get_leaderboard(leaderboards.top_rated, limit, session)
+
+
+@book_router.get(
+    "/leaderboards/most-reviewed",
+    response_model=List[LeaderboardEntryModel],
+    dependencies=[Depends(role_checker)],
+)
+async def get_most_reviewed_books(
+    limit: int = Query(default=10, ge=1, le=Config.PAGE_SIZE_MAX),
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    """Lists the books with the most reviews, scored by their review count."""
+    return await book_service.get_leaderboard(
+        leaderboards.most_reviewed, limit, session
+    )
+
+
+@book_router.get(
+    "/cache/stats",
+    response_model=BookCacheStatsModel,
+    dependencies=[Depends(admin_role_checker)],
+)
+async def get_book_cache_stats():
+    """Returns the hit and miss counters of the book detail cache."""
+    return await book_cache.stats()
+
+
+@book_router.post(
+    "/batch-get",
+    response_model=Union[BookDetailBatchModel, BookBatchModel],
+    dependencies=[Depends(role_checker)],
+)
+async def batch_get_books(
+    batch_data: BookBatchGetModel,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    """Returns several books by their IDs, in the order requested.
+
+    IDs without a book are listed as missing instead of failing the request.
+    """
+    books, missing = await book_service.get_books_batch(
+        batch_data.uids, session, batch_data.detail
+    )
+
+    model = BookDetailBatchModel if batch_data.detail else BookBatchModel
+    return model.model_validate(
+        {"items": books, "missing": missing}, from_attributes=True
+    )
+
+
+@book_router.post(
+    "/import",
+    response_model=ImportResultModel,
+    dependencies=[Depends(admin_role_checker)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+                CSV_MEDIA_TYPE: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_books(
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    token_details: dict = Depends(access_token_bearer),
+):
+    """Imports books from an NDJSON or CSV body, reporting the rows that failed.
+
+    CSV bodies need a header row and take the tags as a '|' separated column.
+    """
+    user_uid = token_details["user"]["user_uid"]
+    media_type = record_media_type(request.headers.get("content-type", ""))
+
+    report = await book_importer.import_books(
+        iter_records(request.stream(), media_type), user_uid, session
+    )
+    return report
+
+
 @book_router.get(
     "/{book_uid}", response_model=BookDetailModel, dependencies=[Depends(role_checker)]
 )
 async def get_book(
     book_uid: uuid.UUID,
+    request: Request,
+    fields: FieldSet = Depends(fields_query(BookDetailModel)),
     session: AsyncSession = Depends(get_session),
     token_details: dict = Depends(access_token_bearer),
-) -> dict:
-    """Returns a specific book by its ID."""
-    book = await book_service.get_book(book_uid, session)
-    if not book:
-        raise BookNotFound()
-    return book
+) -> Response:
+    """Returns a specific book by its ID.
+
+    Answers with 304 when the 'If-None-Match' header has the current ETag.
+    Only full details are cached, requests for some fields read the database.
+    """
+    if_none_match = request.headers.get("if-none-match")
+
+    if fields:
+        version = await book_service.get_book_version(book_uid, session)
+        if not version:
+            raise BookNotFound()
+
+        etag = make_etag(book_uid, *version, *sorted(fields.names))
+        if etag_matches(etag, if_none_match):
+            return not_modified(etag)
+
+        book = await book_service.get_book(book_uid, session, fields)
+        if not book:
+            raise BookNotFound()
+        return fields.response(book, headers={"ETag": etag})
+
+    detail = await book_cache.get(book_uid)
+
+    if not detail:
+        # A cheap version lookup avoids loading the book if the client is current
+        version = await book_service.get_book_version(book_uid, session)
+        if not version:
+            raise BookNotFound()
+
+        etag = make_etag(book_uid, *version)
+        if etag_matches(etag, if_none_match):
+            return not_modified(etag)
+
+        detail = await book_service.load_book_detail(book_uid, session)
+        if not detail:
+            raise BookNotFound()
+
+    etag, body = detail
+    if etag_matches(etag, if_none_match):
+        return not_modified(etag)
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 @book_router.patch(
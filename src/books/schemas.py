@@ -3,11 +3,13 @@ Model schemas for the application.
 """
 
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Dict, Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 import uuid
 
+from src.config import Config
+from src.pagination import Page
 from src.reviews.schemas import ReviewModel
 from src.tags.schemas import TagModel
 
@@ -22,14 +24,57 @@ class Book(BaseModel):
     published_date: date
     page_count: int
     language: str
+    review_count: int
+    rating_sum: int
+    rating_histogram: List[int] = Field(
+        description="Number of reviews with each rating, from 1 to 5."
+    )
+    rating_average: float
     user_uid: Optional[uuid.UUID]
 
 
 class BookDetailModel(Book):
-    reviews: List[ReviewModel]
+    reviews: List[ReviewModel] = Field(
+        description="The latest reviews, newest first. 'review_count' has the "
+        "total, and '/reviews/book/{book_uid}' pages through all of them."
+    )
     tags: List[TagModel]
 
 
+class BookFacetsModel(BaseModel):
+    """Number of filtered books per value of each facet, most frequent first."""
+
+    language: Dict[str, int]
+    publisher: Dict[str, int]
+    author: Dict[str, int]
+
+
+class BookPageModel(Page[Book]):
+    facets: BookFacetsModel
+
+
+class BookBatchGetModel(BaseModel):
+    uids: List[uuid.UUID] = Field(min_length=1, max_length=Config.BATCH_GET_MAX)
+    detail: bool = Field(
+        default=False, description="Include the reviews and tags of each book."
+    )
+
+
+class BookBatchModel(BaseModel):
+    items: List[Book]
+    missing: List[uuid.UUID]
+
+
+class BookDetailBatchModel(BaseModel):
+    items: List[BookDetailModel]
+    missing: List[uuid.UUID]
+
+
+class LeaderboardEntryModel(BaseModel):
+    book: Book
+    score: float
+
+
 class BookCreateModel(BaseModel):
     title: str
     author: str
@@ -45,3 +90,35 @@ class BookUpdateModel(BaseModel):
     publisher: str
     page_count: int
     language: str
+
+
+class BookImportModel(BaseModel):
+    title: str
+    author: str
+    publisher: str
+    published_date: date
+    page_count: int
+    language: str
+    tags: List[str] = []
+
+    @field_validator("tags", mode="before")
+    @classmethod
+    def split_tags(cls, value):
+        """CSV rows provide the tag names as a single '|' separated value."""
+        if isinstance(value, str):
+            return value.split("|") if value.strip() else []
+        return value
+
+    @field_validator("tags")
+    @classmethod
+    def check_tags(cls, value):
+        names = [name.strip() for name in value]
+        if not all(names):
+            raise ValueError("Tag names can't be empty")
+        return names
+
+
+class BookCacheStatsModel(BaseModel):
+    hits: int
+    misses: int
+    hit_ratio: float
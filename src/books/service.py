@@ -2,44 +2,712 @@
 Service for books CRUD.
 """
 
+from collections import Counter
 from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional
+import hashlib
 import uuid
 
+
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select, desc
+from sqlmodel import (
+    select,
+    update,
+    delete,
+    desc,
+    asc,
+    func,
+    tuple_,
+    cast,
+    String,
+    literal,
+    true,
+)
+from sqlmodel.sql.expression import Select, SelectOfScalar
+from sqlalchemy import Integer, any_, bindparam, exists, union
+from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+import sqlalchemy.dialects.postgresql as pg
+
+from .cache import book_cache, facet_cache
+from .leaderboards import leaderboards
+from .filters import BookFilters, BookSort, SortOrder, TagMatch, FACETS, SORT_KEYS
+from .schemas import (
+    Book as BookSchema,
+    BookDetailModel,
+    BookCreateModel,
+    BookUpdateModel,
+)
+from src.config import Config
+from src.db.models import Book, BookTag, Review, Tag
+from src.db.projections import lean, sparse, schema_columns
+from src.errors import InvalidCursor
+from src.etags import make_etag
+from src.fieldsets import FieldSet
+from src.serializers import compile_serializer, dumps
+from src.pagination import decode_cursor, page_of
+from src.reviews.schemas import ReviewModel
+from src.tags.suggest import tag_suggestions
 
-from .schemas import BookCreateModel, BookUpdateModel
-from src.db.models import Book
+# Enough links to tell a rare tag from a popular one
+TAG_COUNT_CAP = 1000
 
 
 class BookService:
-    async def get_all_books(self, session: AsyncSession) -> list[Book]:
-        statement = select(Book).order_by(desc(Book.created_at))
+    async def get_all_books(
+        self,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[BookFilters] = None,
+        fields: Optional[FieldSet] = None,
+    ) -> tuple[list[Book], Optional[str]]:
+        """Returns a page of the filtered books, newest first by default."""
+        if filters is None:
+            conditions, sort, order = [], "created_at", "desc"
+        else:
+            conditions, sort, order = filters.conditions(), filters.sort, filters.order
+
+        sort_column, _ = SORT_KEYS[sort]
+        statement = (
+            select(Book)
+            .where(*conditions)
+            .options(*lean(Book, BookSchema, fields, required=(sort_column,)))
+        )
+
+        return await self._get_books_page(
+            statement, limit, cursor, session, sort, order
+        )
+
+    async def get_book_facets(
+        self, filters: BookFilters, session: AsyncSession
+    ) -> dict:
+        """Counts the filtered books per language, publisher and author.
+
+        A single GROUPING SETS query counts all the facets, keeping the most
+        frequent values of each. Counts are cached briefly per set of filters.
+        """
+        filters_key = filters.cache_key()
+        facets = await facet_cache.get(filters_key)
+
+        if facets is not None:
+            return facets
+
+        columns = [getattr(Book, facet) for facet in FACETS]
+        statement = (
+            select(*columns, func.count())
+            .where(*filters.conditions())
+            .group_by(func.grouping_sets(*columns))
+            .order_by(desc(func.count()))
+        )
 
         result = await session.exec(statement)
+        facets = {facet: {} for facet in FACETS}
+
+        for *values, count in result.all():
+            # Each row counts one facet value, the other facet columns are null
+            for facet, value in zip(FACETS, values):
+                if value is not None and len(facets[facet]) < Config.FACET_SIZE:
+                    facets[facet][value] = count
+
+        await facet_cache.set(filters_key, facets)
 
-        return result.all()
+        return facets
 
     async def get_user_books(
-        self, user_uid: uuid.UUID, session: AsyncSession
-    ) -> list[Book]:
+        self,
+        user_uid: uuid.UUID,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[FieldSet] = None,
+    ) -> tuple[list[Book], Optional[str]]:
         statement = (
             select(Book)
             .where(Book.user_uid == user_uid)
-            .order_by(desc(Book.created_at))
+            .options(*lean(Book, BookSchema, fields, required=(Book.created_at,)))
+        )
+
+        return await self._get_books_page(statement, limit, cursor, session)
+
+    async def get_tagged_books(
+        self,
+        tag_uids: list[uuid.UUID],
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        match: TagMatch = "all",
+        fields: Optional[FieldSet] = None,
+    ) -> tuple[list[Book], Optional[str]]:
+        """Lists the books with all or any of the given tags, newest first.
+
+        Pages are read from the links of a tag in the order of their
+        (tag_uid, book_created_at, book_uid) index, so they cost the same
+        whatever the number of books with the tag. To match all the tags, the
+        links of the rarest one are walked and the others are checked on the
+        primary key; to match any, each tag adds its next page to a union.
+        """
+        tag_uids = list(dict.fromkeys(tag_uids))
+        last_key = None
+
+        if cursor:
+            _, parse_value = SORT_KEYS["created_at"]
+            cursor_sort, cursor_order, value, uid = decode_cursor(
+                cursor, str, str, parse_value, uuid.UUID
+            )
+            if (cursor_sort, cursor_order) != ("created_at", "desc"):
+                raise InvalidCursor()
+
+            last_key = tuple_(value, uid)
+
+        def tag_links(tag_uid: uuid.UUID, *other_tag_uids: uuid.UUID):
+            link = aliased(BookTag)
+            statement = select(link.book_uid, link.book_created_at).where(
+                link.tag_uid == tag_uid,
+                *[
+                    exists().where(
+                        BookTag.book_uid == link.book_uid, BookTag.tag_uid == other
+                    )
+                    for other in other_tag_uids
+                ],
+            )
+
+            if last_key is not None:
+                statement = statement.where(
+                    tuple_(link.book_created_at, link.book_uid) < last_key
+                )
+
+            return statement.order_by(
+                desc(link.book_created_at), desc(link.book_uid)
+            ).limit(limit + 1)
+
+        if match == "any" and len(tag_uids) > 1:
+            links = union(*[tag_links(tag_uid) for tag_uid in tag_uids])
+        else:
+            if len(tag_uids) > 1:
+                tag_uids = await self._rarest_tags_first(tag_uids, session)
+            links = tag_links(*tag_uids)
+
+        links = links.subquery("links")
+        statement = (
+            select(Book)
+            .join(links, links.c.book_uid == Book.uid)
+            .options(*lean(Book, BookSchema, fields, required=(Book.created_at,)))
+            .order_by(desc(links.c.book_created_at), desc(links.c.book_uid))
+            .limit(limit + 1)
         )
 
         result = await session.exec(statement)
 
-        return result.all()
+        return page_of(
+            result.all(),
+            limit,
+            key=lambda book: ("created_at", "desc", book.created_at, book.uid),
+        )
+
+    async def _rarest_tags_first(
+        self, tag_uids: list[uuid.UUID], session: AsyncSession
+    ) -> list[uuid.UUID]:
+        """Orders tags by their number of books, only counted up to a cap."""
+        counts = [
+            select(func.count())
+            .select_from(
+                select(BookTag.book_uid)
+                .where(BookTag.tag_uid == tag_uid)
+                .limit(TAG_COUNT_CAP)
+                .subquery()
+            )
+            .scalar_subquery()
+            for tag_uid in tag_uids
+        ]
 
-    async def get_book(self, book_uid: str, session: AsyncSession) -> Book:
-        statement = select(Book).where(Book.uid == book_uid)
+        result = await session.exec(select(*counts))
+        counts = result.one()
+
+        return [tag_uid for _, tag_uid in sorted(zip(counts, tag_uids))]
+
+    async def search_books(
+        self,
+        query: str,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[FieldSet] = None,
+    ) -> tuple[list[Book], Optional[str]]:
+        """Full-text search over title, author and publisher, best matches first."""
+        ts_query = func.websearch_to_tsquery("english", query)
+        rank = func.ts_rank(Book.search_vector, ts_query)
+
+        statement = (
+            select(Book, rank)
+            .where(Book.search_vector.op("@@")(ts_query))
+            .options(*lean(Book, BookSchema, fields))
+        )
+
+        if cursor:
+            last_rank, uid = decode_cursor(cursor, float, uuid.UUID)
+            statement = statement.where(tuple_(rank, Book.uid) < tuple_(last_rank, uid))
+
+        statement = statement.order_by(desc(rank), desc(Book.uid)).limit(limit + 1)
+
+        result = await session.exec(statement)
+
+        rows, next_cursor = page_of(
+            result.all(), limit, key=lambda row: (row[1], row[0].uid)
+        )
+
+        return [book for book, _ in rows], next_cursor
+
+    def get_export_statement(self, since: Optional[datetime] = None) -> Select:
+        """Query for the books export, optionally only rows updated since a time."""
+        statement = select(*schema_columns(Book, BookSchema))
+
+        if since:
+            statement = statement.where(Book.updated_at >= since)
+
+        return statement
+
+    async def _get_books_page(
+        self,
+        statement: SelectOfScalar[Book],
+        limit: int,
+        cursor: Optional[str],
+        session: AsyncSession,
+        sort: BookSort = "created_at",
+        order: SortOrder = "desc",
+    ) -> tuple[list[Book], Optional[str]]:
+        """Returns a page of books in the given order, newest first by default.
+
+        The uid breaks ties, so the cursor points at a single book. The cursor
+        also records the order it was made for, and is rejected in another one.
+        """
+        column, parse_value = SORT_KEYS[sort]
+        direction = desc if order == "desc" else asc
+
+        if cursor:
+            cursor_sort, cursor_order, value, uid = decode_cursor(
+                cursor, str, str, parse_value, uuid.UUID
+            )
+            if (cursor_sort, cursor_order) != (sort, order):
+                raise InvalidCursor()
+
+            # Row comparison lets Postgres seek straight into the (column, uid) index
+            key, last_key = tuple_(column, Book.uid), tuple_(value, uid)
+            statement = statement.where(
+                key < last_key if order == "desc" else key > last_key
+            )
+
+        statement = statement.order_by(direction(column), direction(Book.uid)).limit(
+            limit + 1
+        )
+
+        result = await session.exec(statement)
+
+        return page_of(
+            result.all(),
+            limit,
+            key=lambda book: (sort, order, getattr(book, column.key), book.uid),
+        )
+
+    async def get_books_by_uids(
+        self, book_uids: list, session: AsyncSession, detail: bool = False
+    ) -> dict[uuid.UUID, Book]:
+        """Loads several books at once, keyed by their uids.
+
+        The uids are sent as a single array parameter, so the statement is the
+        same whatever their number. Only the listing columns are loaded, unless
+        the detail is requested, whose latest reviews and tags take one query
+        each.
+        """
+        uids = bindparam("book_uids", list(set(book_uids)), type_=pg.ARRAY(pg.UUID))
+        statement = select(Book).where(Book.uid == any_(uids))
+
+        if detail:
+            statement = statement.options(
+                *sparse(Book, BookDetailModel, skip=("reviews",))
+            )
+        else:
+            statement = statement.options(*lean(Book, BookSchema))
+
+        result = await session.exec(statement)
+        books = {book.uid: book for book in result.all()}
+
+        if detail:
+            await self._load_latest_reviews(books.values(), session)
+
+        return books
+
+    async def get_books_batch(
+        self, book_uids: list[uuid.UUID], session: AsyncSession, detail: bool = False
+    ) -> tuple[list[Book], list[uuid.UUID]]:
+        """Returns the books found in the order requested, and the missing uids."""
+        books = await self.get_books_by_uids(book_uids, session, detail)
+
+        return (
+            [books[book_uid] for book_uid in book_uids if book_uid in books],
+            [book_uid for book_uid in book_uids if book_uid not in books],
+        )
+
+    async def get_leaderboard(
+        self,
+        read: Callable[[int, int], Awaitable[list[tuple[str, float]]]],
+        limit: int,
+        session: AsyncSession,
+    ) -> list[dict]:
+        """Pairs the first 'limit' books of a leaderboard with their scores.
+
+        'read' returns a page of (book uid, score) entries from a position of
+        the leaderboard. Entries of deleted books are skipped, and further
+        pages read in their place, then removed from the leaderboard so they
+        aren't read again.
+        """
+        entries = []
+        deleted = []
+        start = 0
+
+        while len(entries) < limit:
+            page = await read(limit, start)
+            if not page:
+                break
+
+            books = await self.get_books_by_uids(
+                [uuid.UUID(book_uid) for book_uid, _ in page], session
+            )
+            for book_uid, score in page:
+                if uuid.UUID(book_uid) in books:
+                    entries.append({"book": books[uuid.UUID(book_uid)], "score": score})
+                else:
+                    deleted.append(book_uid)
+
+            if len(page) < limit:
+                break
+            start += limit
+
+        if deleted:
+            await leaderboards.remove_books(*deleted)
+
+        return entries[:limit]
+
+    async def get_book(
+        self, book_uid: str, session: AsyncSession, fields: Optional[FieldSet] = None
+    ) -> Book:
+        # Reviews and tags are rendered by the detail model, but not what they link to
+        statement = (
+            select(Book)
+            .where(Book.uid == book_uid)
+            .options(*sparse(Book, BookDetailModel, fields, skip=("reviews",)))
+        )
+
+        result = await session.exec(statement)
+        book = result.first()
+
+        if book and (fields is None or "reviews" in fields):
+            await self._load_latest_reviews([book], session)
+
+        return book
+
+    async def _load_latest_reviews(
+        self, books: Iterable[Book], session: AsyncSession
+    ) -> None:
+        """Sets the reviews of each book to its latest BOOK_DETAIL_REVIEWS only.
+
+        A lateral subquery reads the newest entries of the (book_uid,
+        created_at, uid) index for each book, so the query stays as cheap
+        however many reviews the books have. Their total is in 'review_count'.
+        """
+        books = {book.uid: book for book in books}
+
+        if not books:
+            return
+
+        latest = (
+            select(Review.uid)
+            .where(Review.book_uid == Book.uid)
+            .order_by(desc(Review.created_at), desc(Review.uid))
+            .limit(Config.BOOK_DETAIL_REVIEWS)
+            .correlate(Book)
+            .lateral("latest_reviews")
+        )
+        uids = bindparam("book_uids", list(books), type_=pg.ARRAY(pg.UUID))
+        statement = (
+            select(Review)
+            .select_from(Book)
+            .join(latest, true())
+            .join(Review, Review.uid == latest.c.uid)
+            .where(Book.uid == any_(uids))
+            .order_by(desc(Review.created_at), desc(Review.uid))
+            .options(*lean(Review, ReviewModel))
+        )
+
+        result = await session.exec(statement)
+        reviews = {book_uid: [] for book_uid in books}
+
+        for review in result.all():
+            reviews[review.book_uid].append(review)
+
+        for book_uid, book in books.items():
+            set_committed_value(book, "reviews", reviews[book_uid])
+
+    async def book_exists(self, book_uid: uuid.UUID, session: AsyncSession) -> bool:
+        """Checks a book exists, without loading it or its relationships."""
+
+        result = await session.exec(select(Book.uid).where(Book.uid == book_uid))
+
+        return result.first() is not None
+
+    async def get_book_version(
+        self, book_uid: str, session: AsyncSession
+    ) -> Optional[tuple]:
+        """Returns what identifies the current version of a book detail.
+
+        That is the book's own update time and review count, plus a summary of
+        its latest reviews and of its tags, read in a single query without
+        loading any of them.
+        """
+        latest = (
+            select(Review.updated_at)
+            .where(Review.book_uid == Book.uid)
+            .order_by(desc(Review.created_at), desc(Review.uid))
+            .limit(Config.BOOK_DETAIL_REVIEWS)
+            .lateral("latest_reviews")
+        )
+        tags = (
+            select(
+                func.md5(
+                    func.string_agg(
+                        cast(Tag.uid, String) + Tag.name,
+                        aggregate_order_by(literal(","), Tag.uid),
+                    )
+                )
+            )
+            .join(BookTag, BookTag.tag_uid == Tag.uid)
+            .where(BookTag.book_uid == Book.uid)
+            .scalar_subquery()
+        )
+
+        statement = (
+            select(
+                Book.updated_at,
+                Book.review_count,
+                func.max(latest.c.updated_at),
+                tags,
+            )
+            .outerjoin(latest, true())
+            .where(Book.uid == book_uid)
+            .group_by(Book.uid)
+        )
 
         result = await session.exec(statement)
 
         return result.first()
 
+    def get_loaded_book_version(self, book: Book) -> tuple:
+        """Same version as 'get_book_version', computed from a loaded book."""
+        tags = sorted(book.tags, key=lambda tag: tag.uid)
+        tags_digest = (
+            hashlib.md5(
+                ",".join(f"{tag.uid}{tag.name}" for tag in tags).encode()
+            ).hexdigest()
+            if tags
+            else None
+        )
+
+        return (
+            book.updated_at,
+            book.review_count,
+            max((review.updated_at for review in book.reviews), default=None),
+            tags_digest,
+        )
+
+    async def load_book_detail(
+        self, book_uid: str, session: AsyncSession
+    ) -> Optional[tuple[str, bytes]]:
+        """Loads a book detail from the database, serializing and caching it.
+
+        The ETag is computed from the loaded book itself, so the cached body
+        and its ETag always describe the same version.
+        """
+        book = await self.get_book(book_uid, session)
+
+        if not book:
+            return None
+
+        etag = make_etag(book_uid, *self.get_loaded_book_version(book))
+        if Config.FAST_RESPONSES:
+            body = dumps(compile_serializer(BookDetailModel)(book))
+        else:
+            body = BookDetailModel.model_validate(book, from_attributes=True)
+            body = body.model_dump_json().encode()
+
+        await book_cache.set(book_uid, etag, body)
+
+        return etag, body
+
+    async def warm_up_detail_cache(self, count: int, session: AsyncSession) -> None:
+        """Caches the details of the most read books."""
+        for book_uid in await book_cache.most_read(count):
+            await self.load_book_detail(book_uid, session)
+            session.expunge_all()
+
+    async def update_rating_aggregates(
+        self,
+        book_uid: uuid.UUID,
+        session: AsyncSession,
+        added: Iterable[int] = (),
+        removed: Iterable[int] = (),
+    ) -> Optional[int]:
+        """Adds and removes review ratings from the aggregates of a book.
+
+        The update runs in the caller's transaction, so the aggregates are
+        committed along with the reviews. Each column is incremented in place,
+        which keeps concurrent reviews of the same book from losing updates.
+        Returns the new review count of the book, or None if it doesn't exist.
+        """
+        counts = Counter(added)
+        counts.subtract(removed)
+
+        statement = (
+            update(Book)
+            .where(Book.uid == book_uid)
+            .values(
+                review_count=Book.review_count + sum(counts.values()),
+                rating_sum=Book.rating_sum
+                + sum(rating * count for rating, count in counts.items()),
+                rating_histogram=pg.array(
+                    [
+                        Book.rating_histogram[rating] + counts[rating]
+                        for rating in range(1, 6)
+                    ]
+                ),
+            )
+            .returning(Book.review_count)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await session.exec(statement)
+
+        return result.scalar_one_or_none()
+
+    async def add_ratings_to_aggregates(
+        self, ratings: dict[uuid.UUID, Iterable[int]], session: AsyncSession
+    ) -> dict[uuid.UUID, int]:
+        """Adds the ratings of new reviews to the aggregates of many books at once.
+
+        The changes of each book are sent as parallel arrays, unnested into
+        rows that a single UPDATE joins on, whatever the number of books.
+        Returns the new review count of each book.
+        """
+        counts = {book_uid: Counter(values) for book_uid, values in ratings.items()}
+
+        if not counts:
+            return {}
+
+        def array(name: str, values: list, item_type=Integer):
+            return bindparam(name, values, type_=pg.ARRAY(item_type))
+
+        book_uids = sorted(counts)
+        changes = (
+            func.unnest(
+                array("book_uids", book_uids, pg.UUID),
+                array(
+                    "review_counts", [sum(counts[uid].values()) for uid in book_uids]
+                ),
+                array(
+                    "rating_sums",
+                    [
+                        sum(rating * count for rating, count in counts[uid].items())
+                        for uid in book_uids
+                    ],
+                ),
+                *(
+                    array(
+                        f"ratings_{rating}", [counts[uid][rating] for uid in book_uids]
+                    )
+                    for rating in range(1, 6)
+                ),
+            )
+            .table_valued(
+                "uid",
+                "review_count",
+                "rating_sum",
+                *(f"ratings_{rating}" for rating in range(1, 6)),
+            )
+            .render_derived("changes")
+        )
+        statement = (
+            update(Book)
+            .where(Book.uid == changes.c.uid)
+            .values(
+                review_count=Book.review_count + changes.c.review_count,
+                rating_sum=Book.rating_sum + changes.c.rating_sum,
+                rating_histogram=pg.array(
+                    [
+                        Book.rating_histogram[rating] + changes.c[f"ratings_{rating}"]
+                        for rating in range(1, 6)
+                    ]
+                ),
+            )
+            .returning(Book.uid, Book.review_count)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await session.exec(statement)
+
+        return dict(result.all())
+
+    async def backfill_rating_aggregates(self, session: AsyncSession) -> list:
+        """Recomputes the rating aggregates of every book from its reviews.
+
+        Only books whose aggregates are off are updated, keeping their update
+        time. Returns the uids of the updated books.
+        """
+        histogram = [
+            func.count(Review.uid).filter(Review.rating == rating)
+            for rating in range(1, 6)
+        ]
+        aggregates = (
+            select(
+                Book.uid,
+                func.count(Review.uid).label("review_count"),
+                func.coalesce(func.sum(Review.rating), 0).label("rating_sum"),
+                cast(pg.array(histogram), pg.ARRAY(pg.INTEGER)).label(
+                    "rating_histogram"
+                ),
+            )
+            .outerjoin(Review, Review.book_uid == Book.uid)
+            .group_by(Book.uid)
+            .subquery()
+        )
+
+        statement = (
+            update(Book)
+            .where(Book.uid == aggregates.c.uid)
+            .where(
+                tuple_(Book.review_count, Book.rating_sum, Book.rating_histogram)
+                != tuple_(
+                    aggregates.c.review_count,
+                    aggregates.c.rating_sum,
+                    aggregates.c.rating_histogram,
+                )
+            )
+            .values(
+                review_count=aggregates.c.review_count,
+                rating_sum=aggregates.c.rating_sum,
+                rating_histogram=aggregates.c.rating_histogram,
+                updated_at=Book.updated_at,
+            )
+            .returning(Book.uid)
+            .execution_options(synchronize_session=False)
+        )
+
+        result = await session.exec(statement)
+        book_uids = result.scalars().all()
+
+        await session.commit()
+
+        return book_uids
+
     async def create_book(
         self, create_data: BookCreateModel, user_uid: str, session: AsyncSession
     ):
@@ -64,28 +732,69 @@ class BookService:
     async def update_book(
         self, book_uid: str, update_data: BookUpdateModel, session: AsyncSession
     ):
-        book_to_update = await self.get_book(book_uid, session)
+        """Updates a book in a single 'UPDATE ... RETURNING' statement."""
+        statement = (
+            update(Book)
+            .where(Book.uid == book_uid)
+            .values(**update_data.model_dump())
+            .returning(*schema_columns(Book, BookSchema))
+            .execution_options(synchronize_session=False)
+        )
 
-        if not book_to_update:
-            return None
+        result = await session.exec(statement)
+        updated_book = result.first()
 
-        update_data_dict = update_data.model_dump()
+        await session.commit()
 
-        for k, v in update_data_dict.items():
-            setattr(book_to_update, k, v)
+        if not updated_book:
+            return None
 
-        await session.commit()
+        await book_cache.invalidate(book_uid)
 
-        return book_to_update
+        return updated_book
 
     async def delete_book(self, book_uid: str, session: AsyncSession):
-        book_to_delete = await self.get_book(book_uid, session)
+        """Deletes a book in a single statement.
 
-        if not book_to_delete:
-            return None
+        Its tag links are deleted and its reviews unlinked in data-modifying
+        CTEs, the same changes the ORM cascade made on the loaded book.
+        """
+        deleted_links = (
+            delete(BookTag)
+            .where(BookTag.book_uid == book_uid)
+            .returning(BookTag.tag_uid)
+            .cte("deleted_links")
+        )
+        unlinked_tags = (
+            select(func.json_agg(func.json_build_array(Tag.uid, Tag.name)))
+            .join(deleted_links, deleted_links.c.tag_uid == Tag.uid)
+            .scalar_subquery()
+        )
+        statement = (
+            delete(Book)
+            .where(Book.uid == book_uid)
+            .returning(Book.uid, unlinked_tags)
+            .add_cte(
+                update(Review)
+                .where(Review.book_uid == book_uid)
+                .values(book_uid=None)
+                .cte("unlinked_reviews")
+            )
+            .execution_options(synchronize_session=False)
+        )
 
-        await session.delete(book_to_delete)
+        result = await session.exec(statement)
+        deleted = result.first()
 
         await session.commit()
 
+        if not deleted:
+            return None
+
+        await book_cache.invalidate(book_uid)
+        await leaderboards.remove_books(book_uid)
+        await tag_suggestions.tags_used(
+            (tag_uid, name, -1) for tag_uid, name in deleted[1] or []
+        )
+
         return {}
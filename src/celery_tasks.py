@@ -3,6 +3,9 @@
 from celery import Celery
 from asgiref.sync import async_to_sync
 
+from src.books.leaderboards import leaderboards
+from src.db.main import async_engine, async_session_maker
+from src.db.redis import cache_client
 from src.mail import mail, create_message
 
 c_app = Celery()
@@ -20,3 +23,19 @@ def send_email(recipients: list[str], subject: str, body: str):
 
     async_to_sync(mail.send_message)(message)
     print("Email sent!")
+
+
+@c_app.task()
+def reconcile_leaderboards():
+    async def reconcile():
+        async with async_session_maker() as session:
+            sizes = await leaderboards.reconcile(session)
+
+        # Each task runs in a new event loop, so its connections can't be reused
+        await async_engine.dispose()
+        await cache_client.aclose()
+
+        return sizes
+
+    sizes = async_to_sync(reconcile)()
+    print(f"Leaderboards reconciled: {sizes}")
@@ -24,6 +24,31 @@ class Settings(BaseSettings):
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
     DOMAIN: str
+    PAGE_SIZE_DEFAULT: int = 20
+    PAGE_SIZE_MAX: int = 100
+    BATCH_GET_MAX: int = 100  # Books resolved by a single batch get
+    IMPORT_BATCH_SIZE: int = 2000
+    IMPORT_MAX_ERRORS: int = 1000
+    EXPORT_CHUNK_SIZE: int = 5000
+    FAST_RESPONSES: bool = False  # Skip validating read responses, encode with orjson
+    BOOK_CACHE_TTL: int = 300  # In seconds
+    BOOK_CACHE_WARMUP: int = 0  # Most read books to cache at startup
+    BOOK_CACHE_READS_SIZE: int = 10000  # Most read books whose reads are counted
+    BOOK_DETAIL_REVIEWS: int = 10  # Latest reviews embedded in a book detail
+    FACET_CACHE_TTL: int = 60  # In seconds
+    FACET_SIZE: int = 20  # Most frequent values counted per facet
+    LEADERBOARD_SIZE: int = 1000  # Books kept by each reconciliation
+    LEADERBOARD_WINDOW: int = 7 * 24 * 3600  # In seconds
+    LEADERBOARD_HALF_LIFE: int = 2 * 24 * 3600  # In seconds
+    LEADERBOARD_RECONCILE_INTERVAL: int = 3600  # In seconds
+    TAG_CACHE_SIZE: int = 10000  # Tag uids kept in memory by name
+    TAG_FILTER_MAX: int = 10  # Tags matched by a single books query
+    TAG_SUGGEST_LIMIT: int = 20  # Most suggestions returned for a prefix
+    TAG_SUGGEST_RELOAD: int = 600  # In seconds
+    TAG_BULK_BOOKS_MAX: int = 5000  # Books changed by a single bulk tagging
+    TAG_BULK_TAGS_MAX: int = 50  # Tags added or removed by a single bulk tagging
+    USER_CACHE_SIZE: int = 10000  # Users kept in memory by each worker
+    USER_CACHE_TTL: int = 60  # In seconds
 
     @property
     def database_url(self) -> str:
@@ -47,3 +72,9 @@ Config = Settings()
 broker_url = Config.redis_url
 result_backend = Config.redis_url
 broker_connection_retry_on_startup = True
+beat_schedule = {
+    "reconcile-leaderboards": {
+        "task": "src.celery_tasks.reconcile_leaderboards",
+        "schedule": Config.LEADERBOARD_RECONCILE_INTERVAL,
+    },
+}
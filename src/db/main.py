@@ -23,13 +23,14 @@ async def init_db():
         await conn.run_sync(SQLModel.metadata.create_all)
 
 
+async_session_maker = sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+
 async def get_session() -> AsyncSession:  # type: ignore
     """Dependency to provide the session object."""
-    Session = sessionmaker(
-        bind=async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False,
-    )
-
-    async with Session() as session:
+    async with async_session_maker() as session:
         yield session
@@ -4,7 +4,7 @@ from datetime import datetime, date
 from typing import List, Optional
 import uuid
 
-from sqlmodel import SQLModel, Field, Column, Relationship
+from sqlmodel import SQLModel, Field, Column, Relationship, Index, Computed
 import sqlalchemy.dialects.postgresql as pg
 
 
@@ -33,7 +33,7 @@ class User(SQLModel, table=True):
         )
     )
     username: str
-    email: str
+    email: str = Field(unique=True)
     first_name: str
     last_name: str
     role: str = Field(
@@ -53,8 +53,23 @@ class User(SQLModel, table=True):
 
 
 class BookTag(SQLModel, table=True):
+    __table_args__ = (
+        # The primary key only covers lookups by book. This one pages through
+        # the books of a tag, newest first, without reading the books table
+        Index(
+            "ix_booktag_tag_uid_book_created_at_book_uid",
+            "tag_uid",
+            "book_created_at",
+            "book_uid",
+        ),
+    )
+
     book_uid: uuid.UUID = Field(default=None, foreign_key="books.uid", primary_key=True)
     tag_uid: uuid.UUID = Field(default=None, foreign_key="tags.uid", primary_key=True)
+    # Copy of the book's creation time, which never changes
+    book_created_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(pg.TIMESTAMP)
+    )
 
 
 class Tag(SQLModel, table=True):
@@ -73,7 +88,7 @@ class Tag(SQLModel, table=True):
             default=datetime.now,
         )
     )
-    name: str = Field(sa_column=Column(pg.VARCHAR, nullable=False))
+    name: str = Field(sa_column=Column(pg.VARCHAR, nullable=False, unique=True))
     books: List["Book"] = Relationship(
         link_model=BookTag,
         back_populates="tags",
@@ -86,6 +101,23 @@ class Tag(SQLModel, table=True):
 
 class Book(SQLModel, table=True):
     __tablename__ = "books"
+    __table_args__ = (
+        # Keyset pagination indexes for the book listings
+        Index("ix_books_created_at_uid", "created_at", "uid"),
+        Index("ix_books_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+        Index("ix_books_search_vector", "search_vector", postgresql_using="gin"),
+        # Incremental exports
+        Index("ix_books_updated_at", "updated_at"),
+        # Facet filters on the books listing, newest first
+        Index("ix_books_language_created_at_uid", "language", "created_at", "uid"),
+        Index("ix_books_publisher_created_at_uid", "publisher", "created_at", "uid"),
+        Index("ix_books_author_created_at_uid", "author", "created_at", "uid"),
+        # Other sort orders, which also serve the range filters
+        Index("ix_books_published_date_uid", "published_date", "uid"),
+        Index("ix_books_page_count_uid", "page_count", "uid"),
+        Index("ix_books_title_uid", "title", "uid"),
+        Index("ix_books_rating_average_uid", "rating_average", "uid"),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(
@@ -114,6 +146,48 @@ class Book(SQLModel, table=True):
     published_date: date
     page_count: int
     language: str
+    # Full-text search document, kept up to date by Postgres itself
+    search_vector: Optional[str] = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(
+            pg.TSVECTOR,
+            Computed(
+                "to_tsvector('english', title || ' ' || author || ' ' || publisher)",
+                persisted=True,
+            ),
+        ),
+    )
+    # Rating aggregates, kept up to date as reviews are added and deleted
+    review_count: int = Field(
+        default=0,
+        sa_column=Column(pg.INTEGER, nullable=False, default=0, server_default="0"),
+    )
+    rating_sum: int = Field(
+        default=0,
+        sa_column=Column(pg.INTEGER, nullable=False, default=0, server_default="0"),
+    )
+    # Number of reviews with each rating, from 1 to 5
+    rating_histogram: List[int] = Field(
+        default_factory=lambda: [0] * 5,
+        sa_column=Column(
+            pg.ARRAY(pg.INTEGER),
+            nullable=False,
+            default=lambda: [0] * 5,
+            server_default="{0,0,0,0,0}",
+        ),
+    )
+    rating_average: Optional[float] = Field(
+        default=None,
+        sa_column=Column(
+            pg.DOUBLE_PRECISION,
+            Computed(
+                "CASE WHEN review_count > 0 "
+                "THEN rating_sum::double precision / review_count ELSE 0 END",
+                persisted=True,
+            ),
+        ),
+    )
     user_uid: Optional[uuid.UUID] = Field(default=None, foreign_key="users.uid")
     user: Optional[User] = Relationship(back_populates="books")
     reviews: List["Review"] = Relationship(
@@ -131,6 +205,16 @@ class Book(SQLModel, table=True):
 
 class Review(SQLModel, table=True):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Incremental exports
+        Index("ix_reviews_updated_at", "updated_at"),
+        # All reviews, most recent first
+        Index("ix_reviews_created_at_uid", "created_at", "uid"),
+        # Reviews of a book and of a user, most recent first
+        Index("ix_reviews_book_uid_created_at_uid", "book_uid", "created_at", "uid"),
+        Index("ix_reviews_book_uid_rating_uid", "book_uid", "rating", "uid"),
+        Index("ix_reviews_user_uid_created_at_uid", "user_uid", "created_at", "uid"),
+    )
 
     uid: uuid.UUID = Field(
         sa_column=Column(
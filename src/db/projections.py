@@ -0,0 +1,79 @@
+"""Helpers to load only what a response schema renders."""
+
+from typing import Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, raiseload, selectinload
+from sqlmodel import SQLModel
+
+from src.fieldsets import FieldSet
+
+
+def schema_columns(
+    model: Type[SQLModel], schema: Type[BaseModel], fields: Optional[FieldSet] = None
+) -> list:
+    """Returns the mapped columns of the model that are fields of the schema.
+
+    With a fieldset, only the requested fields are returned.
+    """
+    column_names = inspect(model).column_attrs.keys()
+
+    return [
+        getattr(model, name)
+        for name in schema.model_fields
+        if name in column_names and (fields is None or name in fields)
+    ]
+
+
+def lean(
+    model: Type[SQLModel],
+    schema: Type[BaseModel],
+    fields: Optional[FieldSet] = None,
+    required: tuple = (),
+) -> tuple:
+    """Loader options for list queries: schema columns only and no relationships.
+
+    Relationships are set to raise instead of being lazy loaded, so a response
+    model that starts rendering one fails loudly rather than going back to N+1.
+    Columns needed besides the rendered ones, like sort keys, go in 'required'.
+    The primary key is always loaded, as fieldsets may select no column at all.
+    """
+    primary_key = [getattr(model, column.key) for column in inspect(model).primary_key]
+
+    return (
+        load_only(*primary_key, *schema_columns(model, schema, fields), *required),
+        raiseload("*"),
+    )
+
+
+def sparse(
+    model: Type[SQLModel],
+    schema: Type[BaseModel],
+    fields: Optional[FieldSet] = None,
+    required: tuple = (),
+    skip: tuple = (),
+) -> tuple:
+    """Loader options for a detail query, narrowed to the requested fields.
+
+    Requested relationships are loaded with one query each, with the columns
+    of their own schema; the others are never loaded. Relationships in 'skip'
+    are left for the caller to load its own way.
+    """
+    relationships = inspect(model).relationships
+    options = []
+
+    for name, field in schema.model_fields.items():
+        if name not in relationships or name in skip:
+            continue
+        if fields is not None and name not in fields:
+            continue
+
+        related = relationships[name].mapper.class_
+        # List[Schema] annotations hold the related schema as their only argument
+        related_schema = field.annotation.__args__[0]
+        options.append(
+            selectinload(getattr(model, name)).options(*lean(related, related_schema))
+        )
+
+    return (*lean(model, schema, fields, required), *options)
@@ -9,6 +9,9 @@ JTI_EXPIRY = 3600  # 1 hour
 # Defining the blocked token list
 token_blocklist = aioredis.from_url(Config.redis_url)
 
+# Client for the application caches
+cache_client = aioredis.from_url(Config.redis_url)
+
 
 async def add_jti_to_blocklist(jti: str) -> None:
     """Adds a JTI to the Redis blocklist."""
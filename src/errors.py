@@ -87,6 +87,18 @@ class AccountNotVerified(BooklyException):
     pass
 
 
+class InvalidCursor(BooklyException):
+    """User has provided a malformed pagination cursor."""
+
+    pass
+
+
+class InvalidFields(BooklyException):
+    """User has requested fields that the resource does not have."""
+
+    pass
+
+
 def create_exception_handler(
     status_code: int, initial_detail: Any
 ) -> Callable[[Request, Exception], JSONResponse]:
@@ -237,6 +249,29 @@ def register_all_errors(app: FastAPI):
             },
         ),
     )
+    app.add_exception_handler(
+        InvalidCursor,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid pagination cursor",
+                "resolution": "Please use the 'next_cursor' value from a previous page",
+                "error_code": "invalid_cursor",
+            },
+        ),
+    )
+
+    app.add_exception_handler(
+        InvalidFields,
+        create_exception_handler(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            initial_detail={
+                "message": "Invalid fields requested",
+                "resolution": "Please only request fields listed in the 'fields' parameter description",
+                "error_code": "invalid_fields",
+            },
+        ),
+    )
 
     @app.exception_handler(500)
     async def internal_server_error(request, exc):
@@ -0,0 +1,29 @@
+"""Helpers for conditional GET requests based on ETags."""
+
+from typing import Any, Optional
+import hashlib
+
+from fastapi import Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Builds a strong ETag from the values that identify a resource version."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+
+    return f'"{digest}"'
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Checks an ETag against an If-None-Match header (weak comparison)."""
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+
+def not_modified(etag: str) -> Response:
+    """Response telling the client its cached copy is still current."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,98 @@
+"""Sparse fieldsets, letting clients choose the fields they read."""
+
+from functools import lru_cache
+from typing import Any, Callable, FrozenSet, Optional, Type
+
+from fastapi import Query
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, create_model
+
+from src.config import Config
+from src.errors import InvalidFields
+from src.serializers import (
+    SERIALIZER_CACHE_SIZE,
+    compile_serializer,
+    fast_response,
+    serialize,
+)
+
+
+@lru_cache(maxsize=SERIALIZER_CACHE_SIZE)
+def _partial_schema(schema: Type[BaseModel], names: FrozenSet[str]) -> Type[BaseModel]:
+    """Builds a copy of the schema with only the given fields, in their order."""
+    fields = {
+        name: (field.annotation, field)
+        for name, field in schema.model_fields.items()
+        if name in names
+    }
+
+    return create_model(f"{schema.__name__}Fields", **fields)
+
+
+def selectable_fields(schema: Type[BaseModel]) -> list[str]:
+    """Returns the fields of a schema that clients can request."""
+    return [name for name, field in schema.model_fields.items() if not field.exclude]
+
+
+class FieldSet:
+    """Fields requested for a resource, or all of them when 'names' is None."""
+
+    def __init__(self, schema: Type[BaseModel], names: Optional[FrozenSet[str]]):
+        self.schema = schema
+        self.names = names
+
+    def __bool__(self) -> bool:
+        return self.names is not None
+
+    def __contains__(self, name: str) -> bool:
+        return self.names is None or name in self.names
+
+    def dump(self, item: Any) -> dict:
+        """Serializes an item with the requested fields only."""
+        if Config.FAST_RESPONSES:
+            return compile_serializer(self.schema, self.names)(item)
+
+        schema = (
+            self.schema
+            if self.names is None
+            else _partial_schema(self.schema, self.names)
+        )
+
+        return schema.model_validate(item, from_attributes=True).model_dump(mode="json")
+
+    def response(self, content: Any, headers: Optional[dict] = None) -> JSONResponse:
+        """Builds the response directly, with the requested fields only.
+
+        The content may be a single item, a list of items or a page of them.
+        Items are validated against the schema, unless FAST_RESPONSES is set:
+        they are then read straight off the objects and encoded with orjson.
+        """
+        if Config.FAST_RESPONSES:
+            return fast_response(self.schema, content, self.names, headers)
+
+        return JSONResponse(content=serialize(self.dump, content), headers=headers)
+
+
+def fields_query(schema: Type[BaseModel]) -> Callable[..., FieldSet]:
+    """Dependency reading the 'fields' query parameter for a response schema."""
+    choices = selectable_fields(schema)
+
+    def dependency(
+        fields: Optional[str] = Query(
+            default=None,
+            description=(
+                "Comma separated fields to return, out of: " + ", ".join(choices) + "."
+            ),
+        )
+    ) -> FieldSet:
+        if fields is None:
+            return FieldSet(schema, None)
+
+        names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+
+        if not names or not names.issubset(choices):
+            raise InvalidFields()
+
+        return FieldSet(schema, names)
+
+    return dependency
@@ -0,0 +1,37 @@
+"""
+Reports of the bulk imports, shared by the book and review importers.
+"""
+
+from typing import List
+
+from pydantic import BaseModel, Field, ValidationError
+
+from src.config import Config
+
+
+class ImportErrorModel(BaseModel):
+    row: int
+    message: str
+
+
+class ImportResultModel(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportErrorModel] = Field(
+        default=[], description="The first rows that could not be imported."
+    )
+
+
+def validation_message(error: ValidationError) -> str:
+    """Flattens a validation error into a single line for the import report."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+        for item in error.errors(include_url=False)
+    )
+
+
+def report_error(report: ImportResultModel, row: int, message: str) -> None:
+    """Counts a failed row, keeping its error while the report has room for it."""
+    report.failed += 1
+    if len(report.errors) < Config.IMPORT_MAX_ERRORS:
+        report.errors.append(ImportErrorModel(row=row, message=message))
@@ -0,0 +1,85 @@
+"""Cursor (keyset) pagination helpers for the application."""
+
+from datetime import date
+from typing import Any, Callable, Generic, List, Optional, Sequence, TypeVar
+import base64
+import binascii
+import json
+import uuid
+
+from fastapi import Query
+from pydantic import BaseModel
+
+from src.config import Config
+from src.errors import InvalidCursor
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class PageParams:
+    """Dependency with the page size and cursor provided by the client."""
+
+    def __init__(
+        self,
+        limit: int = Query(
+            default=Config.PAGE_SIZE_DEFAULT,
+            ge=1,
+            le=Config.PAGE_SIZE_MAX,
+            description="Maximum number of items to return.",
+        ),
+        cursor: Optional[str] = Query(
+            default=None,
+            description="The 'next_cursor' value returned with the previous page.",
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encodes the sort key of the last item of a page into an opaque cursor."""
+    payload = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple:
+    """Decodes a cursor, converting each value with the matching type."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+
+        if len(values) != len(types):
+            raise ValueError("Unexpected number of cursor values")
+
+        return tuple(cast(value) for cast, value in zip(types, values))
+
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursor()
+
+
+def page_of(
+    items: Sequence[T], limit: int, key: Callable[[T], tuple]
+) -> tuple[list[T], Optional[str]]:
+    """Trims a 'limit + 1' result to a page and builds the cursor for the next one."""
+    items = list(items)
+
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+
+    return items, encode_cursor(*key(items[-1]))
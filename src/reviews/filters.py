@@ -0,0 +1,63 @@
+"""
+Filters and sort orders for the reviews listings.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, List, Literal, Optional
+import uuid
+
+from fastapi import Query
+
+from src.books.filters import SortOrder
+from src.db.models import Review
+
+ReviewSort = Literal["created_at", "rating"]
+
+# Column and cursor value parser of each sort key
+SORT_KEYS: dict[str, tuple[Any, Callable[[Any], Any]]] = {
+    "created_at": (Review.created_at, datetime.fromisoformat),
+    "rating": (Review.rating, int),
+}
+
+
+class ReviewFilters:
+    """Dependency with the filters and order of the admin reviews listing.
+
+    Reviews are listed by creation time. Filters by user or book read the
+    index of that column, the others walk the creation time index.
+    """
+
+    def __init__(
+        self,
+        rating: List[int] = Query(
+            default=[], description="Ratings to match, repeated for each rating."
+        ),
+        user_uid: Optional[uuid.UUID] = Query(default=None),
+        book_uid: Optional[uuid.UUID] = Query(default=None),
+        created_from: Optional[datetime] = Query(default=None),
+        created_to: Optional[datetime] = Query(default=None),
+        order: SortOrder = Query(default="desc"),
+    ):
+        self.rating = rating
+        self.user_uid = user_uid
+        self.book_uid = book_uid
+        self.created_from = created_from
+        self.created_to = created_to
+        self.order = order
+
+    def conditions(self) -> list:
+        """Returns the WHERE clauses matching the filters."""
+        conditions = []
+
+        if self.rating:
+            conditions.append(Review.rating.in_(self.rating))
+        if self.user_uid:
+            conditions.append(Review.user_uid == self.user_uid)
+        if self.book_uid:
+            conditions.append(Review.book_uid == self.book_uid)
+        if self.created_from:
+            conditions.append(Review.created_at >= self.created_from)
+        if self.created_to:
+            conditions.append(Review.created_at <= self.created_to)
+
+        return conditions
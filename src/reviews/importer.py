@@ -0,0 +1,165 @@
+"""
+Bulk import of reviews from streamed NDJSON request bodies.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Union
+import uuid
+
+from asyncpg.exceptions import IntegrityConstraintViolationError
+from pydantic import ValidationError
+from sqlalchemy import any_, bindparam
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+import sqlalchemy.dialects.postgresql as pg
+
+from .schemas import ReviewImportModel
+from src.books.cache import book_cache
+from src.books.leaderboards import leaderboards
+from src.books.service import BookService
+from src.config import Config
+from src.db.models import Book, Review, User
+from src.importing import ImportResultModel, report_error, validation_message
+
+book_service = BookService()
+
+REVIEW_COLUMNS = [
+    "uid",
+    "created_at",
+    "updated_at",
+    "rating",
+    "review_text",
+    "user_uid",
+    "book_uid",
+]
+
+
+class ReviewImporter:
+    async def import_reviews(
+        self,
+        records: AsyncIterator[tuple[int, Union[str, dict]]],
+        session: AsyncSession,
+    ) -> ImportResultModel:
+        """Validates records as they arrive and inserts them in batches.
+
+        Each batch is committed on its own, along with the rating aggregates
+        of its books, so a long import keeps only one batch in memory and the
+        rows already reported as inserted are kept even if a later batch fails.
+        """
+        report = ImportResultModel()
+        batch = []
+
+        async for row, record in records:
+            try:
+                if isinstance(record, str):
+                    review = ReviewImportModel.model_validate_json(record)
+                else:
+                    review = ReviewImportModel.model_validate(record)
+
+            except ValidationError as e:
+                report_error(report, row, validation_message(e))
+                continue
+
+            batch.append((row, review))
+
+            if len(batch) >= Config.IMPORT_BATCH_SIZE:
+                await self._insert_batch(batch, report, session)
+                batch = []
+
+        if batch:
+            await self._insert_batch(batch, report, session)
+
+        # Rows with a missing book or user are only found when their batch is inserted
+        report.errors.sort(key=lambda error: error.row)
+
+        return report
+
+    async def _existing(self, model, uids: set, session: AsyncSession) -> set:
+        """Returns which of the uids belong to existing rows, in one query."""
+        if not uids:
+            return set()
+
+        uids = bindparam("uids", list(uids), type_=pg.ARRAY(pg.UUID))
+        result = await session.exec(select(model.uid).where(model.uid == any_(uids)))
+
+        return set(result.all())
+
+    async def _insert_batch(
+        self,
+        batch: list[tuple[int, ReviewImportModel]],
+        report: ImportResultModel,
+        session: AsyncSession,
+    ) -> None:
+        """Copies a batch of reviews and updates the aggregates of their books.
+
+        A book or user deleted after being checked fails the whole batch,
+        whose rows are then reported as failed.
+        """
+        book_uids = await self._existing(
+            Book, {review.book_uid for _, review in batch}, session
+        )
+        user_uids = await self._existing(
+            User, {review.user_uid for _, review in batch if review.user_uid}, session
+        )
+
+        now = datetime.now()
+        rows = []
+        reviews = []
+        ratings = defaultdict(list)
+
+        for row, review in batch:
+            if review.book_uid not in book_uids:
+                report_error(report, row, "book_uid: Book not found")
+                continue
+            if review.user_uid and review.user_uid not in user_uids:
+                report_error(report, row, "user_uid: User not found")
+                continue
+
+            rows.append(row)
+
+            created_at = review.created_at or now
+            reviews.append(
+                (
+                    uuid.uuid4(),
+                    created_at,
+                    now,
+                    review.rating,
+                    review.review_text,
+                    review.user_uid,
+                    review.book_uid,
+                )
+            )
+            ratings[review.book_uid].append(review.rating)
+
+        if not reviews:
+            return
+
+        # COPY runs on the session's own connection, so it joins its transaction
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        try:
+            await raw_connection.driver_connection.copy_records_to_table(
+                Review.__tablename__, records=reviews, columns=REVIEW_COLUMNS
+            )
+        except IntegrityConstraintViolationError:
+            await session.rollback()
+            for row in rows:
+                report_error(report, row, "Book or user deleted during the import")
+            return
+
+        review_counts = await book_service.add_ratings_to_aggregates(ratings, session)
+
+        await session.commit()
+
+        report.inserted += len(reviews)
+
+        await book_cache.invalidate(*ratings)
+        await leaderboards.add_reviews(
+            [
+                (book_uid, rating, created_at)
+                for _, created_at, _, rating, _, _, book_uid in reviews
+            ],
+            review_counts,
+        )
@@ -2,50 +2,159 @@
 Routes for the reviews module.
 """
 
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 import uuid
 
-from fastapi import APIRouter, status, Depends
+from fastapi import APIRouter, status, Depends, Query, Request
 from fastapi.exceptions import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from .filters import ReviewFilters, ReviewSort
+from .importer import ReviewImporter
 from .schemas import ReviewModel, ReviewCreateModel
 from .service import ReviewService
+from src.books.filters import SortOrder
+from src.books.service import BookService
 from src.db.main import get_session
-from src.db.models import User
-from src.auth.dependencies import RoleChecker, get_current_user
+from src.auth.dependencies import (
+    RoleChecker,
+    access_token_bearer,
+    get_current_principal,
+)
+from src.auth.schemas import PrincipalModel
+from src.streaming import (
+    NDJSON_MEDIA_TYPE,
+    ExportFormat,
+    export_response,
+    iter_records,
+)
+from src.etags import make_etag, etag_matches, not_modified
+from src.errors import BookNotFound
+from src.fieldsets import FieldSet, fields_query
+from src.importing import ImportResultModel
+from src.pagination import Page, PageParams
 
 review_router = APIRouter()
 review_service = ReviewService()
+review_importer = ReviewImporter()
+book_service = BookService()
 admin_role_checker = Depends(RoleChecker(["admin"]))
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
 
 
 @review_router.get(
     "/",
-    response_model=List[ReviewModel],
+    response_model=Page[ReviewModel],
+    dependencies=[admin_role_checker],
+)
+async def get_all_reviews(
+    page: PageParams = Depends(),
+    filters: ReviewFilters = Depends(),
+    fields: FieldSet = Depends(fields_query(ReviewModel)),
+    session: AsyncSession = Depends(get_session),
+):
+    """Lists the reviews matching the filters, newest first by default."""
+    reviews, next_cursor = await review_service.get_all_reviews(
+        session, page.limit, page.cursor, filters, fields
+    )
+
+    content = {"items": reviews, "next_cursor": next_cursor}
+    return fields.response(content)
+
+
+@review_router.get("/export", dependencies=[admin_role_checker])
+async def export_reviews(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+    since: Optional[datetime] = Query(
+        default=None, description="Only export reviews updated at or after this time."
+    ),
+):
+    """Streams every review as NDJSON or CSV."""
+    statement = review_service.get_export_statement(since)
+    return export_response(statement, export_format, "reviews")
+
+
+@review_router.post(
+    "/import",
+    response_model=ImportResultModel,
     dependencies=[admin_role_checker],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}}},
+        }
+    },
 )
-async def get_all_reviews(session: AsyncSession = Depends(get_session)):
-    """Lists existing reviews."""
-    reviews = await review_service.get_all_reviews(session)
+async def import_reviews(
+    request: Request, session: AsyncSession = Depends(get_session)
+):
+    """Imports reviews of many books from NDJSON, reporting the rows that failed.
+
+    Each line holds a review with its 'book_uid', and optionally the 'user_uid'
+    of a local user and the time it was first posted at.
+    """
+    records = iter_records(request.stream(), NDJSON_MEDIA_TYPE)
 
-    return reviews
+    return await review_importer.import_reviews(records, session)
 
 
 @review_router.get(
     "/{review_uid}", response_model=ReviewModel, dependencies=[user_role_checker]
 )
 async def get_review(
-    review_uid: uuid.UUID, session: AsyncSession = Depends(get_session)
+    review_uid: uuid.UUID,
+    request: Request,
+    fields: FieldSet = Depends(fields_query(ReviewModel)),
+    session: AsyncSession = Depends(get_session),
 ):
-    """Returns a specific review by its ID."""
-    review = await review_service.get_review(review_uid, session)
+    """Returns a specific review by its ID.
+
+    Answers with 304 when the 'If-None-Match' header has the current ETag.
+    """
+    updated_at = await review_service.get_review_version(review_uid, session)
+    if not updated_at:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Review not found."
+        )
+
+    etag = make_etag(review_uid, updated_at, *sorted(fields.names or []))
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        return not_modified(etag)
+
+    review = await review_service.get_review(review_uid, session, fields)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Review not found."
         )
-    return review
+    return fields.response(review, headers={"ETag": etag})
+
+
+@review_router.get(
+    "/book/{book_uid}",
+    response_model=Page[ReviewModel],
+    dependencies=[user_role_checker],
+)
+async def get_book_reviews(
+    book_uid: uuid.UUID,
+    page: PageParams = Depends(),
+    sort: ReviewSort = Query(default="created_at"),
+    order: SortOrder = Query(default="desc"),
+    fields: FieldSet = Depends(fields_query(ReviewModel)),
+    session: AsyncSession = Depends(get_session),
+):
+    """Lists the reviews of a book, newest first or by rating."""
+    reviews, next_cursor = await review_service.get_book_reviews(
+        book_uid, session, page.limit, page.cursor, sort, order, fields
+    )
+
+    # Only an empty first page needs telling a missing book from an unreviewed one
+    if not reviews and not page.cursor:
+        if not await book_service.book_exists(book_uid, session):
+            raise BookNotFound()
+
+    content = {"items": reviews, "next_cursor": next_cursor}
+    return fields.response(content)
 
 
 @review_router.post(
@@ -56,12 +165,12 @@ async def get_review(
 async def add_review_to_books(
     book_uid: uuid.UUID,
     review_data: ReviewCreateModel,
-    current_user: User = Depends(get_current_user),
+    token_details: dict = Depends(access_token_bearer),
     session: AsyncSession = Depends(get_session),
 ):
-    """Creates a new review for a book."""
+    """Creates a new review for a book, by the user of the access token."""
     new_review = await review_service.add_review_to_book(
-        user_email=current_user.email,
+        user_uid=uuid.UUID(token_details["user"]["user_uid"]),
         book_uid=book_uid,
         review_data=review_data,
         session=session,
@@ -77,12 +186,12 @@ async def add_review_to_books(
 )
 async def delete_review(
     review_uid: uuid.UUID,
-    current_user: User = Depends(get_current_user),
+    principal: PrincipalModel = Depends(get_current_principal),
     session: AsyncSession = Depends(get_session),
 ):
     await review_service.delete_review_from_book(
         review_uid=review_uid,
-        user_email=current_user.email,
+        user_uid=principal.uid,
         session=session,
     )
 
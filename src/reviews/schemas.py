@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional
 import uuid
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class ReviewModel(BaseModel):
@@ -20,5 +20,25 @@ class ReviewModel(BaseModel):
 
 
 class ReviewCreateModel(BaseModel):
-    rating: int = Field(le=5)
+    rating: int = Field(ge=1, le=5)
     review_text: str
+
+
+class ReviewImportModel(BaseModel):
+    book_uid: uuid.UUID
+    user_uid: Optional[uuid.UUID] = Field(
+        default=None, description="Left empty for reviews from other sites."
+    )
+    rating: int = Field(ge=1, le=5)
+    review_text: str
+    created_at: Optional[datetime] = Field(
+        default=None, description="When the review was first posted, now by default."
+    )
+
+    @field_validator("created_at")
+    @classmethod
+    def to_local_time(cls, value):
+        """Review times are stored as naive local times."""
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone().replace(tzinfo=None)
+        return value
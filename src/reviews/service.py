@@ -2,93 +2,222 @@
 Service for reviews CRUD.
 """
 
+from datetime import datetime
+from typing import Optional
 import uuid
-import logging
 
 from fastapi import status
 from fastapi.exceptions import HTTPException
-from sqlmodel import desc, select
+from sqlmodel import asc, desc, select, tuple_
 from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select, SelectOfScalar
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import raiseload
 
-from .schemas import ReviewCreateModel
+from .filters import ReviewFilters, ReviewSort, SORT_KEYS
+from .schemas import ReviewCreateModel, ReviewModel
 from src.db.models import Review
-from src.auth.service import UserService
+from src.db.projections import lean, schema_columns
+from src.errors import BookNotFound, InvalidCursor, UserNotFound
+from src.fieldsets import FieldSet
 from src.books.service import BookService
+from src.books.cache import book_cache
+from src.books.filters import SortOrder
+from src.books.leaderboards import leaderboards
+from src.pagination import decode_cursor, page_of
 
-user_service = UserService()
 book_service = BookService()
 
 
 class ReviewService:
     async def add_review_to_book(
         self,
-        user_email: str,
+        user_uid: uuid.UUID,
         book_uid: uuid.UUID,
         review_data: ReviewCreateModel,
         session: AsyncSession,
     ) -> Review:
+        """Creates a review of a book by the user of the access token.
+
+        Neither the book nor the user is loaded: the rating aggregates update
+        tells whether the book exists, and the user's uid comes from the token.
+        """
+        review_count = await book_service.update_rating_aggregates(
+            book_uid, session, added=[review_data.rating]
+        )
+        if review_count is None:
+            raise BookNotFound()
+
+        new_review = Review(
+            **review_data.model_dump(), user_uid=user_uid, book_uid=book_uid
+        )
+        session.add(new_review)
+
         try:
-            book = await book_service.get_book(book_uid, session)
-            if not book:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Book not found",
-                )
-            user = await user_service.get_user_by_email(user_email, session)
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found",
-                )
-
-            review_data_dict = review_data.model_dump()
-            new_review = Review(**review_data_dict)
-
-            new_review.user = user
-            new_review.book = book
-
-            session.add(new_review)
             await session.commit()
+        except IntegrityError:
+            # The user of a still valid token may have been deleted since
+            await session.rollback()
+            raise UserNotFound()
 
-            return new_review
+        await book_cache.invalidate(book_uid)
+        await leaderboards.add_review(new_review, review_count)
 
-        except Exception as e:
-            logging.exception(e)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Something went wrong while adding the review.",
-            )
+        return new_review
 
-    async def get_review(self, review_uid: str, session: AsyncSession):
+    async def get_review(
+        self,
+        review_uid: str,
+        session: AsyncSession,
+        fields: Optional[FieldSet] = None,
+    ):
         statement = select(Review).where(Review.uid == review_uid)
 
+        if fields:
+            statement = statement.options(*lean(Review, ReviewModel, fields))
+
         result = await session.exec(statement)
 
         return result.first()
 
-    async def get_all_reviews(self, session: AsyncSession):
-        statement = select(Review).order_by(desc(Review.created_at))
+    async def get_book_reviews(
+        self,
+        book_uid: uuid.UUID,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: ReviewSort = "created_at",
+        order: SortOrder = "desc",
+        fields: Optional[FieldSet] = None,
+    ) -> tuple[list[Review], Optional[str]]:
+        """Returns a page of the reviews of a book, newest first by default.
+
+        The page is read from the (book_uid, column, uid) index of the sort key.
+        """
+        column, _ = SORT_KEYS[sort]
+        statement = (
+            select(Review)
+            .where(Review.book_uid == book_uid)
+            .options(*lean(Review, ReviewModel, fields, required=(column,)))
+        )
+
+        return await self._get_reviews_page(
+            statement, limit, cursor, session, sort, order
+        )
+
+    async def _get_reviews_page(
+        self,
+        statement: SelectOfScalar[Review],
+        limit: int,
+        cursor: Optional[str],
+        session: AsyncSession,
+        sort: ReviewSort = "created_at",
+        order: SortOrder = "desc",
+    ) -> tuple[list[Review], Optional[str]]:
+        """Returns a page of reviews in the given order, newest first by default.
+
+        The uid breaks ties, so the cursor points at a single review. The cursor
+        also records the order it was made for, and is rejected in another one.
+        """
+        column, parse_value = SORT_KEYS[sort]
+        direction = desc if order == "desc" else asc
+
+        if cursor:
+            cursor_sort, cursor_order, value, uid = decode_cursor(
+                cursor, str, str, parse_value, uuid.UUID
+            )
+            if (cursor_sort, cursor_order) != (sort, order):
+                raise InvalidCursor()
+
+            key, last_key = tuple_(column, Review.uid), tuple_(value, uid)
+            statement = statement.where(
+                key < last_key if order == "desc" else key > last_key
+            )
+
+        statement = statement.order_by(direction(column), direction(Review.uid)).limit(
+            limit + 1
+        )
+
+        result = await session.exec(statement)
+
+        return page_of(
+            result.all(),
+            limit,
+            key=lambda review: (sort, order, getattr(review, column.key), review.uid),
+        )
+
+    async def get_review_version(self, review_uid: str, session: AsyncSession):
+        """Returns the update time of a review, without loading the review."""
+        statement = select(Review.updated_at).where(Review.uid == review_uid)
 
         result = await session.exec(statement)
 
-        return result.all()
+        return result.first()
+
+    async def get_all_reviews(
+        self,
+        session: AsyncSession,
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[ReviewFilters] = None,
+        fields: Optional[FieldSet] = None,
+    ) -> tuple[list[Review], Optional[str]]:
+        """Returns a page of all the reviews matching the filters, newest first.
+
+        Only the columns rendered by the review schema are loaded, and none
+        of the relationships.
+        """
+        if filters is None:
+            conditions, order = [], "desc"
+        else:
+            conditions, order = filters.conditions(), filters.order
+
+        statement = (
+            select(Review)
+            .where(*conditions)
+            .options(*lean(Review, ReviewModel, fields, required=(Review.created_at,)))
+        )
+
+        return await self._get_reviews_page(
+            statement, limit, cursor, session, order=order
+        )
+
+    def get_export_statement(self, since: Optional[datetime] = None) -> Select:
+        """Query for the reviews export, optionally only rows updated since a time."""
+        statement = select(*schema_columns(Review, ReviewModel))
+
+        if since:
+            statement = statement.where(Review.updated_at >= since)
+
+        return statement
 
     async def delete_review_from_book(
         self,
         review_uid: str,
-        user_email: str,
+        user_uid: uuid.UUID,
         session: AsyncSession,
     ):
-        user = await user_service.get_user_by_email(user_email, session)
-
-        review = await self.get_review(review_uid, session)
+        statement = (
+            select(Review).where(Review.uid == review_uid).options(raiseload("*"))
+        )
+        result = await session.exec(statement)
+        review = result.first()
 
-        if not review or (review.user is not user):
+        if not review or review.user_uid != user_uid:
             raise HTTPException(
                 detail="Cannot delete this review.",
                 status_code=status.HTTP_403_FORBIDDEN,
             )
 
-        session.add(review)
+        await session.delete(review)
+
+        if review.book_uid:
+            review_count = await book_service.update_rating_aggregates(
+                review.book_uid, session, removed=[review.rating]
+            )
 
         await session.commit()
+
+        if review.book_uid:
+            await book_cache.invalidate(review.book_uid)
+            await leaderboards.remove_review(review, review_count)
@@ -0,0 +1,136 @@
+"""Helpers to read and write NDJSON and CSV bodies as they stream."""
+
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Literal, Union
+import codecs
+import csv
+import io
+import json
+import uuid
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from src.config import Config
+from src.db.main import async_engine
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+ExportFormat = Literal["ndjson", "csv"]
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a stream of UTF-8 bytes into lines, without reading it whole."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+
+        for line in lines:
+            yield line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(
+    stream: AsyncIterator[bytes], media_type: str
+) -> AsyncIterator[tuple[int, Union[str, dict]]]:
+    """Yields (row number, record) pairs from an NDJSON or CSV body.
+
+    NDJSON records are the raw lines, left for the caller to validate as JSON;
+    CSV records are dicts keyed by the header row. Blank lines are skipped and
+    CSV values may not contain line breaks.
+    """
+    header = None
+    row = 0
+
+    async for line in iter_lines(stream):
+        if not line.strip():
+            continue
+
+        if media_type != CSV_MEDIA_TYPE:
+            row += 1
+            yield row, line
+            continue
+
+        values = next(csv.reader([line]))
+
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        yield row, dict(zip(header, values))
+
+
+def record_media_type(content_type: str) -> str:
+    """Picks how to read a request body from its Content-Type header."""
+    if content_type.split(";")[0].strip().lower() == CSV_MEDIA_TYPE:
+        return CSV_MEDIA_TYPE
+
+    return NDJSON_MEDIA_TYPE
+
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+async def stream_export(statement: Select, media_type: str) -> AsyncIterator[str]:
+    """Streams the rows of a query as NDJSON or CSV from a server-side cursor.
+
+    It uses its own connection, as the request session is closed before a
+    streaming response body is sent. Only one chunk of rows is held at a time.
+    """
+    async with async_engine.connect() as connection:
+        result = await connection.stream(
+            statement.execution_options(yield_per=Config.EXPORT_CHUNK_SIZE)
+        )
+
+        if media_type == CSV_MEDIA_TYPE:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(result.keys())
+
+            async for rows in result.partitions():
+                writer.writerows(
+                    [_export_value(value) for value in row] for row in rows
+                )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+            yield buffer.getvalue()
+            return
+
+        keys = list(result.keys())
+
+        async for rows in result.partitions():
+            yield "".join(
+                json.dumps(dict(zip(keys, map(_export_value, row)))) + "\n"
+                for row in rows
+            )
+
+
+def export_response(
+    statement: Select, export_format: ExportFormat, name: str
+) -> StreamingResponse:
+    """Builds the streaming response for an export endpoint."""
+    media_type = CSV_MEDIA_TYPE if export_format == "csv" else NDJSON_MEDIA_TYPE
+
+    return StreamingResponse(
+        stream_export(statement, media_type),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+        },
+    )
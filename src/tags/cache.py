@@ -0,0 +1,59 @@
+"""
+In-process cache of tag uids by name.
+"""
+
+from collections import OrderedDict
+from typing import Iterable
+import uuid
+
+from src.config import Config
+
+
+class TagUidCache:
+    """Keeps the uids of the most recently used tag names in memory.
+
+    Tag names are unique and their uids never change, but a tag may be renamed
+    or deleted by another worker, so callers must check that the cached uids
+    still hold the cached names when they use them.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._uids: OrderedDict[str, uuid.UUID] = OrderedDict()
+
+    def get_many(self, names: Iterable[str]) -> dict[str, uuid.UUID]:
+        tag_uids = {}
+
+        for name in names:
+            tag_uid = self._uids.get(name)
+            if tag_uid is not None:
+                self._uids.move_to_end(name)
+                tag_uids[name] = tag_uid
+
+        return tag_uids
+
+    def set_many(self, tag_uids: dict[str, uuid.UUID]) -> None:
+        for name, tag_uid in tag_uids.items():
+            self._uids[name] = tag_uid
+            self._uids.move_to_end(name)
+
+        while len(self._uids) > self.size:
+            self._uids.popitem(last=False)
+
+    def discard(self, *names: str) -> None:
+        for name in names:
+            self._uids.pop(name, None)
+
+    def discard_uids(self, *tag_uids: uuid.UUID) -> None:
+        """Drops renamed or deleted tags, whose previous names are not known."""
+        tag_uids = {str(tag_uid) for tag_uid in tag_uids}
+
+        names = [
+            name for name, tag_uid in self._uids.items() if str(tag_uid) in tag_uids
+        ]
+
+        for name in names:
+            del self._uids[name]
+
+
+tag_uid_cache = TagUidCache(Config.TAG_CACHE_SIZE)
@@ -5,18 +5,36 @@ Routes for the tags module.
 import uuid
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .schemas import TagAddModel, TagCreateModel, TagModel
+from .schemas import (
+    TagAddModel,
+    TagBulkModel,
+    TagBulkResultModel,
+    TagCreateModel,
+    TagModel,
+    TagSuggestionModel,
+)
 from .service import TagService
+from .suggest import tag_suggestions
 from src.auth.dependencies import RoleChecker
+from src.books.filters import TagMatch
 from src.books.schemas import Book
+from src.books.service import BookService
+from src.config import Config
 from src.db.main import get_session
+from src.errors import TagNotFound
+from src.fieldsets import FieldSet, fields_query
+from src.serializers import FastJSONResponse
+from src.pagination import Page, PageParams
+from src.streaming import ExportFormat, export_response
 
 tags_router = APIRouter()
 tag_service = TagService()
+book_service = BookService()
 user_role_checker = Depends(RoleChecker(["user", "admin"]))
+admin_role_checker = Depends(RoleChecker(["admin"]))
 
 
 @tags_router.get(
@@ -25,11 +43,84 @@ user_role_checker = Depends(RoleChecker(["user", "admin"]))
     dependencies=[user_role_checker],
     status_code=status.HTTP_200_OK,
 )
-async def get_all_tags(session: AsyncSession = Depends(get_session)):
+async def get_all_tags(
+    fields: FieldSet = Depends(fields_query(TagModel)),
+    session: AsyncSession = Depends(get_session),
+):
     """Get all existing tags."""
-    tags = await tag_service.get_tags(session)
+    tags = await tag_service.get_tags(session, fields)
+
+    return fields.response(tags)
+
+
+@tags_router.get(
+    "/suggest",
+    response_model=List[TagSuggestionModel],
+    dependencies=[user_role_checker],
+)
+async def suggest_tags(
+    prefix: str = Query(min_length=1, description="Start of the tag names."),
+    limit: int = Query(default=10, ge=1, le=Config.TAG_SUGGEST_LIMIT),
+):
+    """Suggests the most used tags whose names start with a prefix.
+
+    Served from the in-process tag index, without querying the database.
+    """
+    return FastJSONResponse(tag_suggestions.suggest(prefix, limit))
+
+
+@tags_router.get("/books", response_model=Page[Book], dependencies=[user_role_checker])
+async def get_books_by_tags(
+    tag: List[uuid.UUID] = Query(
+        min_length=1,
+        max_length=Config.TAG_FILTER_MAX,
+        description="Uids of the tags to match, repeated for each tag.",
+    ),
+    match: TagMatch = Query(
+        default="all", description="Match books with all the tags, or any of them."
+    ),
+    page: PageParams = Depends(),
+    fields: FieldSet = Depends(fields_query(Book)),
+    session: AsyncSession = Depends(get_session),
+):
+    """Lists the books with all or any of the given tags, newest first."""
+    books, next_cursor = await book_service.get_tagged_books(
+        tag, session, page.limit, page.cursor, match, fields
+    )
+    content = {"items": books, "next_cursor": next_cursor}
+    return fields.response(content)
+
+
+@tags_router.get(
+    "/{tag_uid}/books", response_model=Page[Book], dependencies=[user_role_checker]
+)
+async def get_tag_books(
+    tag_uid: uuid.UUID,
+    page: PageParams = Depends(),
+    fields: FieldSet = Depends(fields_query(Book)),
+    session: AsyncSession = Depends(get_session),
+):
+    """Lists the books with a tag, newest first."""
+    books, next_cursor = await book_service.get_tagged_books(
+        [tag_uid], session, page.limit, page.cursor, fields=fields
+    )
+
+    # Only an empty first page needs telling a missing tag from an unused one
+    if not books and not page.cursor:
+        if not await tag_service.tag_exists(tag_uid, session):
+            raise TagNotFound()
 
-    return tags
+    content = {"items": books, "next_cursor": next_cursor}
+    return fields.response(content)
+
+
+@tags_router.get("/book-tags/export", dependencies=[admin_role_checker])
+async def export_book_tags(
+    export_format: ExportFormat = Query(default="ndjson", alias="format"),
+):
+    """Streams every link between a book and a tag as NDJSON or CSV."""
+    statement = tag_service.get_book_tags_export_statement()
+    return export_response(statement, export_format, "book_tags")
 
 
 @tags_router.post(
@@ -65,6 +156,20 @@ async def add_tags_to_book(
     return book_with_tag
 
 
+@tags_router.post(
+    "/books/bulk", response_model=TagBulkResultModel, dependencies=[user_role_checker]
+)
+async def bulk_tag_books(
+    bulk_data: TagBulkModel, session: AsyncSession = Depends(get_session)
+):
+    """Adds and removes tags across many books at once.
+
+    Every book gets its own result, with the tags actually added and removed.
+    Missing books are reported as not found, without failing the others.
+    """
+    return await tag_service.bulk_tag_books(bulk_data, session)
+
+
 @tags_router.put(
     "/{tag_uid}", response_model=TagModel, dependencies=[user_role_checker]
 )
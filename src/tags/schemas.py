@@ -6,7 +6,9 @@ import uuid
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+from src.config import Config
 
 
 class TagModel(BaseModel):
@@ -21,3 +23,42 @@ class TagCreateModel(BaseModel):
 
 class TagAddModel(BaseModel):
     tags: List[TagCreateModel]
+
+
+class TagSuggestionModel(BaseModel):
+    uid: uuid.UUID
+    name: str
+    book_count: int
+
+
+class TagBulkModel(BaseModel):
+    book_uids: List[uuid.UUID] = Field(
+        min_length=1, max_length=Config.TAG_BULK_BOOKS_MAX
+    )
+    add: List[TagCreateModel] = Field(default=[], max_length=Config.TAG_BULK_TAGS_MAX)
+    remove: List[TagCreateModel] = Field(
+        default=[], max_length=Config.TAG_BULK_TAGS_MAX
+    )
+
+    @model_validator(mode="after")
+    def check_tags(self):
+        """At least one tag must change, and none can be both added and removed."""
+        if not self.add and not self.remove:
+            raise ValueError("No tags to add or remove.")
+
+        both = {tag.name for tag in self.add} & {tag.name for tag in self.remove}
+        if both:
+            raise ValueError(f"Tags both added and removed: {', '.join(sorted(both))}")
+
+        return self
+
+
+class TagBulkBookResultModel(BaseModel):
+    book_uid: uuid.UUID
+    found: bool
+    added: List[str] = Field(description="Tags that were not on the book yet.")
+    removed: List[str] = Field(description="Tags that were on the book.")
+
+
+class TagBulkResultModel(BaseModel):
+    books: List[TagBulkBookResultModel]
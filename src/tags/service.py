@@ -2,18 +2,30 @@
 Service for tags CRUD.
 """
 
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Optional
+import uuid
+
 from fastapi import status
 from fastapi.exceptions import HTTPException
-from sqlmodel import desc, select
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import delete, desc, func, select, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-
-from .schemas import TagAddModel, TagCreateModel
-from src.books.service import BookService
-from src.db.models import Tag
+from sqlmodel.sql.expression import Select
+
+from .cache import tag_uid_cache
+from .suggest import tag_suggestions
+from .schemas import TagAddModel, TagBulkModel, TagCreateModel, TagModel
+from src.books.schemas import Book as BookSchema
+from src.books.cache import book_cache
+from src.db.models import Book, Tag, BookTag
+from src.db.projections import lean
+from src.fieldsets import FieldSet
 from src.errors import BookNotFound, TagNotFound, TagAlreadyExists
 
-book_service = BookService()
-
 
 server_error = HTTPException(
     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -23,41 +35,251 @@ server_error = HTTPException(
 
 class TagService:
 
-    async def get_tags(self, session: AsyncSession):
+    async def get_tags(self, session: AsyncSession, fields: Optional[FieldSet] = None):
         """Get all tags."""
 
-        statement = select(Tag).order_by(desc(Tag.created_at))
+        statement = (
+            select(Tag)
+            .options(*lean(Tag, TagModel, fields))
+            .order_by(desc(Tag.created_at))
+        )
 
         result = await session.exec(statement)
 
         return result.all()
 
+    def get_book_tags_export_statement(self) -> Select:
+        """Query for the export of the links between books and tags."""
+
+        return select(BookTag.book_uid, BookTag.tag_uid)
+
     async def add_tags_to_book(
         self, book_uid: str, tag_data: TagAddModel, session: AsyncSession
     ):
-        """Add tags to a book."""
+        """Add tags to a book.
 
-        book = await book_service.get_book(book_uid=book_uid, session=session)
+        Tag uids are taken from the in-process cache when possible, the other
+        tags are resolved with a single upsert. The links are then inserted in
+        one statement, which skips the pairs that already exist.
+        """
+
+        result = await session.exec(
+            select(Book).where(Book.uid == book_uid).options(*lean(Book, BookSchema))
+        )
+        book = result.first()
 
         if not book:
             raise BookNotFound()
 
-        for tag_item in tag_data.tags:
-            result = await session.exec(select(Tag).where(Tag.name == tag_item.name))
-
-            tag = result.one_or_none()
-            if not tag:
-                tag = Tag(name=tag_item.name)
+        names = {tag_item.name for tag_item in tag_data.tags}
+        tag_uids = tag_uid_cache.get_many(names)
+        tag_uids.update(await self.get_or_create_tags(names - tag_uids.keys(), session))
 
-            book.tags.append(tag)
+        matched, linked = await self._link_tags(book.uid, tag_uids, session)
+        stale = tag_uids.keys() - matched
 
-        session.add(book)
+        if stale:
+            # Cached tags renamed or deleted by another worker are resolved again
+            tag_uid_cache.discard(*stale)
+            resolved = await self.get_or_create_tags(stale, session)
+            _, relinked = await self._link_tags(book.uid, resolved, session)
+            tag_uids.update(resolved)
+            linked |= relinked
 
         await session.commit()
-        await session.refresh(book)
+
+        tag_uid_cache.set_many(tag_uids)
+        await book_cache.invalidate(book_uid)
+        await tag_suggestions.tags_used((tag_uids[name], name, 1) for name in linked)
 
         return book
 
+    async def bulk_tag_books(self, bulk_data: TagBulkModel, session: AsyncSession):
+        """Adds and removes tags across many books in one transaction.
+
+        The tags to add are resolved with a single upsert. The links are then
+        inserted and deleted in data-modifying CTEs of one statement, which
+        also reports the changes of every requested book that exists.
+        """
+
+        book_uids = list(dict.fromkeys(bulk_data.book_uids))
+        remove_names = {tag_item.name for tag_item in bulk_data.remove}
+        tag_uids = await self.get_or_create_tags(
+            {tag_item.name for tag_item in bulk_data.add}, session
+        )
+        tag_names = {tag_uid: name for name, tag_uid in tag_uids.items()}
+
+        books = (
+            select(Book.uid, Book.created_at)
+            .where(Book.uid.in_(book_uids))
+            .cte("books_found")
+        )
+        added = (
+            pg_insert(BookTag)
+            .from_select(
+                ["book_uid", "tag_uid", "book_created_at"],
+                select(books.c.uid, Tag.uid, books.c.created_at).join(
+                    Tag, Tag.uid.in_(tag_names)
+                )
+                # Concurrent bulk changes lock the links in the same order
+                .order_by(books.c.uid, Tag.uid),
+            )
+            .on_conflict_do_nothing()
+            .returning(BookTag.book_uid, BookTag.tag_uid)
+            .cte("added")
+        )
+        removed = (
+            delete(BookTag)
+            .where(
+                BookTag.book_uid.in_(select(books.c.uid)),
+                BookTag.tag_uid == Tag.uid,
+                Tag.name.in_(remove_names),
+            )
+            .returning(BookTag.book_uid, BookTag.tag_uid, Tag.name)
+            .cte("removed")
+        )
+        added_by_book = (
+            select(added.c.book_uid, func.array_agg(added.c.tag_uid).label("tags"))
+            .group_by(added.c.book_uid)
+            .subquery()
+        )
+        removed_by_book = (
+            select(
+                removed.c.book_uid,
+                func.json_agg(
+                    func.json_build_array(removed.c.tag_uid, removed.c.name)
+                ).label("tags"),
+            )
+            .group_by(removed.c.book_uid)
+            .subquery()
+        )
+        statement = (
+            select(books.c.uid, added_by_book.c.tags, removed_by_book.c.tags)
+            .outerjoin(added_by_book, added_by_book.c.book_uid == books.c.uid)
+            .outerjoin(removed_by_book, removed_by_book.c.book_uid == books.c.uid)
+        )
+
+        result = await session.exec(statement)
+        changes = {book_uid: (added, removed) for book_uid, added, removed in result}
+
+        await session.commit()
+
+        usage = Counter()
+        results = []
+
+        for book_uid in book_uids:
+            added, removed = changes.get(book_uid, (None, None))
+            added = [(tag_uid, tag_names[tag_uid]) for tag_uid in added or []]
+            removed = [tuple(tag) for tag in removed or []]
+            usage.update((tag_uid, name, 1) for tag_uid, name in added)
+            usage.update((tag_uid, name, -1) for tag_uid, name in removed)
+            results.append(
+                {
+                    "book_uid": book_uid,
+                    "found": book_uid in changes,
+                    "added": sorted(name for _, name in added),
+                    "removed": sorted(name for _, name in removed),
+                }
+            )
+
+        tag_uid_cache.set_many(tag_uids)
+        changed = [
+            book_uid
+            for book_uid, (added, removed) in changes.items()
+            if added or removed
+        ]
+        if changed:
+            await book_cache.invalidate(*changed)
+        await tag_suggestions.tags_used(
+            (tag_uid, name, delta * count)
+            for (tag_uid, name, delta), count in usage.items()
+        )
+
+        return {"books": results}
+
+    async def _link_tags(
+        self, book_uid: uuid.UUID, tag_uids: dict[str, uuid.UUID], session: AsyncSession
+    ) -> tuple[set[str], set[str]]:
+        """Links tags to a book.
+
+        Returns the names that still match their uids, and the names of the
+        tags that were not linked to the book yet.
+        """
+
+        if not tag_uids:
+            return set(), set()
+
+        cached_tags = (
+            select(Tag.uid, Tag.name)
+            .where(
+                tuple_(Tag.uid, Tag.name).in_(
+                    [(tag_uid, name) for name, tag_uid in tag_uids.items()]
+                )
+            )
+            .cte("cached_tags")
+        )
+        links = (
+            pg_insert(BookTag)
+            .from_select(
+                ["book_uid", "tag_uid", "book_created_at"],
+                select(Book.uid, cached_tags.c.uid, Book.created_at).join(
+                    cached_tags, Book.uid == book_uid
+                ),
+            )
+            .on_conflict_do_nothing()
+            .returning(BookTag.tag_uid)
+            .cte("links")
+        )
+        statement = select(
+            cached_tags.c.name, cached_tags.c.uid.in_(select(links.c.tag_uid))
+        )
+
+        result = await session.exec(statement)
+        rows = result.all()
+
+        return {name for name, _ in rows}, {name for name, linked in rows if linked}
+
+    async def get_or_create_tags(
+        self, names: Iterable[str], session: AsyncSession
+    ) -> dict[str, uuid.UUID]:
+        """Get the uids for many tag names, creating the missing tags at once.
+
+        The tags are inserted with 'ON CONFLICT DO NOTHING', so concurrent
+        requests creating the same tag end up sharing it, and the ones that
+        already existed are then read in a single lookup.
+        """
+
+        names = set(names)
+
+        if not names:
+            return {}
+
+        now = datetime.now()
+        statement = (
+            pg_insert(Tag)
+            .values(
+                [
+                    {"uid": uuid.uuid4(), "created_at": now, "name": name}
+                    for name in names
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag.name, Tag.uid)
+        )
+
+        result = await session.exec(statement)
+        tag_uids = dict(result.all())
+
+        existing = names - tag_uids.keys()
+
+        if existing:
+            result = await session.exec(
+                select(Tag.name, Tag.uid).where(Tag.name.in_(existing))
+            )
+            tag_uids.update(result.all())
+
+        return tag_uids
+
     async def get_tag_by_uid(self, tag_uid: str, session: AsyncSession):
         """Get tag by uid."""
 
@@ -67,55 +289,104 @@ class TagService:
 
         return result.first()
 
+    async def tag_exists(self, tag_uid: uuid.UUID, session: AsyncSession) -> bool:
+        """Checks a tag exists, without loading it or its books."""
+
+        result = await session.exec(select(Tag.uid).where(Tag.uid == tag_uid))
+
+        return result.first() is not None
+
     async def add_tag(self, tag_data: TagCreateModel, session: AsyncSession):
         """Create a new tag."""
 
-        statement = select(Tag).where(Tag.name == tag_data.name)
+        statement = (
+            pg_insert(Tag)
+            .values(uid=uuid.uuid4(), created_at=datetime.now(), name=tag_data.name)
+            .on_conflict_do_nothing(index_elements=[Tag.name])
+            .returning(Tag.uid, Tag.created_at, Tag.name)
+        )
 
         result = await session.exec(statement)
+        new_tag = result.first()
 
-        tag = result.first()
+        await session.commit()
 
-        if tag:
+        if not new_tag:
             raise TagAlreadyExists()
 
-        new_tag = Tag(name=tag_data.name)
-
-        session.add(new_tag)
-
-        await session.commit()
+        await tag_suggestions.tags_used([(new_tag.uid, new_tag.name, 0)])
 
         return new_tag
 
     async def update_tag(
         self, tag_uid, tag_update_data: TagCreateModel, session: AsyncSession
     ):
-        """Update a tag."""
+        """Update a tag in a single 'UPDATE ... RETURNING' statement.
+
+        The statement also returns the tagged books, whose cached details are
+        then dropped. Renaming to the name of another tag breaks 'tags_name_key'.
+        """
+
+        updated_tag = (
+            update(Tag)
+            .where(Tag.uid == tag_uid)
+            .values(**tag_update_data.model_dump())
+            .returning(Tag.uid, Tag.created_at, Tag.name)
+            .cte("updated_tag")
+        )
+        book_uids = (
+            select(func.array_agg(BookTag.book_uid))
+            .where(BookTag.tag_uid == updated_tag.c.uid)
+            .scalar_subquery()
+        )
+        statement = select(*updated_tag.c, book_uids.label("book_uids"))
+
+        try:
+            result = await session.exec(statement)
+        except IntegrityError:
+            await session.rollback()
+            raise TagAlreadyExists()
 
-        tag = await self.get_tag_by_uid(tag_uid, session)
+        tag = result.first()
+
+        await session.commit()
 
         if not tag:
             raise TagNotFound()
 
-        update_data_dict = tag_update_data.model_dump()
-
-        for k, v in update_data_dict.items():
-            setattr(tag, k, v)
-
-            await session.commit()
+        tag_uid_cache.discard_uids(tag.uid)
+        await tag_suggestions.tag_renamed(tag.uid, tag.name)
 
-            await session.refresh(tag)
+        if tag.book_uids:
+            await book_cache.invalidate(*tag.book_uids)
 
         return tag
 
     async def delete_tag(self, tag_uid: str, session: AsyncSession):
-        """Delete a tag."""
+        """Delete a tag and its book links in a single statement."""
+
+        deleted_links = (
+            delete(BookTag)
+            .where(BookTag.tag_uid == tag_uid)
+            .returning(BookTag.book_uid)
+            .cte("deleted_links")
+        )
+        deleted_tag = (
+            delete(Tag).where(Tag.uid == tag_uid).returning(Tag.uid).cte("deleted_tag")
+        )
+        book_uids = select(func.array_agg(deleted_links.c.book_uid)).scalar_subquery()
+        statement = select(deleted_tag.c.uid, book_uids.label("book_uids"))
 
-        tag = await self.get_tag_by_uid(tag_uid, session)
+        result = await session.exec(statement)
+        tag = result.first()
+
+        await session.commit()
 
         if not tag:
             raise TagNotFound()
 
-        await session.delete(tag)
+        tag_uid_cache.discard_uids(tag.uid)
+        await tag_suggestions.tags_deleted(tag.uid)
 
-        await session.commit()
+        if tag.book_uids:
+            await book_cache.invalidate(*tag.book_uids)
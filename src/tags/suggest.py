@@ -0,0 +1,270 @@
+"""
+In-process index of the tag names for prefix suggestions, ranked by usage.
+"""
+
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Iterable, Optional
+import asyncio
+import heapq
+import json
+import logging
+import time
+import uuid
+
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+from sqlmodel import func, select
+
+from src.config import Config
+from src.db.main import async_session_maker
+from src.db.models import BookTag, Tag
+from src.db.redis import cache_client
+
+CHANNEL = "tag_suggestions"
+
+# Prefixes up to this length keep their ranking between requests
+SHORT_PREFIX = 3
+
+# Most recently used short prefixes whose ranking is kept
+MAX_RANKINGS = 1000
+
+# Sorts after any character, to find the end of the names with a prefix
+MAX_CHAR = "\U0010ffff"
+
+
+class TagSuggestions:
+    """Suggests the tags whose names start with a prefix, most used first.
+
+    Every worker keeps all the tag names in memory, sorted case-insensitively
+    for bisect lookups, with how many books use each tag. The ranking of the
+    short prefixes, which match the most names, is kept between requests and
+    updated in place as usage grows, for the MAX_RANKINGS most recently used.
+
+    Changes are applied locally and published on a Redis channel, which the
+    other workers listen to. The index is also reloaded from the database
+    every TAG_SUGGEST_RELOAD seconds, in case messages were missed.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.origin = uuid.uuid4().hex
+        self._keys: list[tuple[str, str]] = []
+        self._tags: dict[str, tuple[str, int]] = {}
+        self._top: OrderedDict[str, list[str]] = OrderedDict()
+        self._loaded_at = 0.0
+        self._listener: Optional[asyncio.Task] = None
+
+    def _rank(self, tag_uid: str) -> tuple:
+        name, book_count = self._tags[tag_uid]
+        return -book_count, name.casefold(), tag_uid
+
+    def _match(self, key: str, limit: int) -> list[str]:
+        start = bisect_left(self._keys, (key,))
+        end = bisect_left(self._keys, (key + MAX_CHAR,))
+
+        return heapq.nsmallest(
+            limit, (tag_uid for _, tag_uid in self._keys[start:end]), key=self._rank
+        )
+
+    def suggest(self, prefix: str, limit: int) -> list[dict]:
+        """Returns the most used tags whose names start with the prefix."""
+        key = prefix.casefold()
+
+        if len(key) > SHORT_PREFIX:
+            tag_uids = self._match(key, limit)
+        else:
+            ranking = self._top.get(key)
+
+            if ranking is None:
+                ranking = self._top[key] = self._match(key, self.limit)
+                if len(self._top) > MAX_RANKINGS:
+                    self._top.popitem(last=False)
+            else:
+                self._top.move_to_end(key)
+
+            tag_uids = ranking[:limit]
+
+        suggestions = []
+
+        for tag_uid in tag_uids:
+            name, book_count = self._tags[tag_uid]
+            suggestions.append({"uid": tag_uid, "name": name, "book_count": book_count})
+
+        return suggestions
+
+    def _forget_prefixes(self, key: str) -> None:
+        for length in range(SHORT_PREFIX + 1):
+            self._top.pop(key[:length], None)
+
+    def _add(self, tag_uid: str, name: str, book_count: int) -> None:
+        self._tags[tag_uid] = (name, book_count)
+        insort(self._keys, (name.casefold(), tag_uid))
+        self._forget_prefixes(name.casefold())
+
+    def _remove(self, tag_uid: str) -> None:
+        name, _ = self._tags.pop(tag_uid)
+        key = (name.casefold(), tag_uid)
+        index = bisect_left(self._keys, key)
+
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+
+        self._forget_prefixes(name.casefold())
+
+    def _use(self, tag_uid: str, name: str, delta: int) -> None:
+        if tag_uid not in self._tags:
+            self._add(tag_uid, name, max(delta, 0))
+            return
+
+        current_name, book_count = self._tags[tag_uid]
+        self._tags[tag_uid] = (current_name, max(book_count + delta, 0))
+        key = current_name.casefold()
+
+        if delta < 0:
+            # A tag may drop out of a ranking, which is then rebuilt when read
+            self._forget_prefixes(key)
+            return
+
+        for length in range(SHORT_PREFIX + 1):
+            ranking = self._top.get(key[:length])
+
+            if ranking is None:
+                continue
+
+            if tag_uid not in ranking:
+                ranking.append(tag_uid)
+
+            ranking.sort(key=self._rank)
+            del ranking[self.limit :]
+
+    def apply(self, event: dict) -> None:
+        """Applies a change to the index, made by this worker or another one."""
+        if event["type"] == "used":
+            for tag_uid, name, delta in event["tags"]:
+                self._use(tag_uid, name, delta)
+
+        elif event["type"] == "renamed":
+            tag_uid = event["uid"]
+            _, book_count = self._tags.get(tag_uid, (None, 0))
+
+            if tag_uid in self._tags:
+                self._remove(tag_uid)
+
+            self._add(tag_uid, event["name"], book_count)
+
+        elif event["type"] == "deleted":
+            for tag_uid in event["uids"]:
+                if tag_uid in self._tags:
+                    self._remove(tag_uid)
+
+    async def _publish(self, event: dict) -> None:
+        self.apply(event)
+
+        try:
+            await cache_client.publish(
+                CHANNEL, json.dumps({**event, "origin": self.origin})
+            )
+        except RedisError as e:
+            logging.exception(e)
+
+    async def tags_used(self, usage: Iterable[tuple[uuid.UUID, str, int]]) -> None:
+        """Records that tags were added to (or removed from) some books.
+
+        Usage is a list of (tag uid, tag name, change in the number of books).
+        Tags that are not indexed yet are added.
+        """
+        tags = [[str(tag_uid), name, delta] for tag_uid, name, delta in usage]
+
+        if tags:
+            await self._publish({"type": "used", "tags": tags})
+
+    async def tag_renamed(self, tag_uid: uuid.UUID, name: str) -> None:
+        await self._publish({"type": "renamed", "uid": str(tag_uid), "name": name})
+
+    async def tags_deleted(self, *tag_uids: uuid.UUID) -> None:
+        uids = [str(tag_uid) for tag_uid in tag_uids]
+
+        if uids:
+            await self._publish({"type": "deleted", "uids": uids})
+
+    def replace(self, tags: Iterable[tuple[uuid.UUID, str, int]]) -> None:
+        """Replaces the whole index with (tag uid, tag name, book count) rows."""
+        self._tags = {str(tag_uid): (name, count) for tag_uid, name, count in tags}
+        self._keys = sorted(
+            (name.casefold(), tag_uid) for tag_uid, (name, _) in self._tags.items()
+        )
+        self._top = OrderedDict()
+
+    async def load(self) -> None:
+        """Loads every tag with its number of books from the database."""
+        statement = (
+            select(Tag.uid, Tag.name, func.count(BookTag.book_uid))
+            .outerjoin(BookTag, BookTag.tag_uid == Tag.uid)
+            .group_by(Tag.uid)
+        )
+
+        async with async_session_maker() as session:
+            result = await session.exec(statement)
+            self.replace(result.all())
+
+        self._loaded_at = time.monotonic()
+
+    async def _subscribe(self) -> PubSub:
+        """Subscribes to the changes of the other workers, then loads the index."""
+        pubsub = cache_client.pubsub(ignore_subscribe_messages=True)
+
+        # Subscribing before loading, no change is missed in between
+        await pubsub.subscribe(CHANNEL)
+        await self.load()
+
+        return pubsub
+
+    async def _listen(self, pubsub: Optional[PubSub]) -> None:
+        """Applies the changes published by the other workers, reloading at times."""
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = await self._subscribe()
+
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+
+                    if message is not None:
+                        event = json.loads(message["data"])
+                        if event["origin"] != self.origin:
+                            self.apply(event)
+
+                    if time.monotonic() - self._loaded_at > Config.TAG_SUGGEST_RELOAD:
+                        await self.load()
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                logging.exception(e)
+                await asyncio.sleep(1)
+
+            finally:
+                if pubsub is not None:
+                    await pubsub.aclose()
+                    pubsub = None
+
+    async def start(self) -> None:
+        """Loads the index and starts following the changes of the other workers."""
+        try:
+            pubsub = await self._subscribe()
+        except RedisError as e:
+            # The listener subscribes again, until Redis is back
+            logging.exception(e)
+            pubsub = None
+            await self.load()
+
+        self._listener = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+
+
+tag_suggestions = TagSuggestions(Config.TAG_SUGGEST_LIMIT)
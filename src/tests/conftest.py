@@ -1,11 +1,25 @@
 """Configurations for testing."""
 
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
 from unittest.mock import Mock
+import asyncio
+import random
+import uuid
+
 import pytest
 from fastapi.testclient import TestClient
-
-from src import app
-from src.db.main import get_session
+from httpx import ASGITransport, AsyncClient
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src import VERSION, app
+from src.auth.utils import create_access_token
+import src.books.leaderboards as leaderboards_module
+from src.db.main import async_engine, get_session
+from src.db.models import User, Book, Review, Tag, BookTag
+from src.db.redis import cache_client, token_blocklist
 from src.auth.dependencies import AccessTokenBearer, RoleChecker, RefreshTokenBearer
 
 mock_session = Mock()
@@ -28,6 +42,102 @@ app.dependency_overrides[access_token_bearer] = Mock()
 app.dependency_overrides[refresh_token_bearer] = Mock()
 
 
+@asynccontextmanager
+async def rollback_session():
+    """Yields a session whose work, commits included, is discarded at the end."""
+    async with async_engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+async def seed(
+    session: AsyncSession,
+    books: int = 1000,
+    reviews_per_book: int = 10,
+    tags_per_book: int = 3,
+    tags: int = 50,
+) -> User:
+    """Inserts a user with a catalog of reviewed and tagged books."""
+    user = User(
+        username="bench",
+        email=f"bench-{uuid.uuid4().hex[:8]}@bookly.test",
+        first_name="Bench",
+        last_name="Mark",
+        role="admin",
+        is_verified=True,
+        password_hash="",
+    )
+    session.add(user)
+    await session.flush()
+
+    now = datetime.now()
+    book_rows = [
+        {
+            "uid": uuid.uuid4(),
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now - timedelta(minutes=i),
+            "title": f"Book {i}",
+            "author": f"Author {i % 200}",
+            "publisher": f"Publisher {i % 20}",
+            "published_date": date(1950, 1, 1) + timedelta(days=i % 25000),
+            "page_count": 50 + i % 900,
+            "language": random.choice(["English", "Portuguese", "Spanish", "French"]),
+            "user_uid": user.uid,
+        }
+        for i in range(books)
+    ]
+    # Tag names are unique, so concurrent seeds must not share them
+    run = uuid.uuid4().hex[:8]
+    tag_rows = [
+        {"uid": uuid.uuid4(), "created_at": now, "name": f"bench-tag-{run}-{i}"}
+        for i in range(tags)
+    ]
+    review_rows = [
+        {
+            "uid": uuid.uuid4(),
+            "created_at": now - timedelta(minutes=j),
+            "updated_at": now - timedelta(minutes=j),
+            "rating": random.randint(1, 5),
+            "review_text": "A benchmark review.",
+            "user_uid": user.uid,
+            "book_uid": book["uid"],
+        }
+        for book in book_rows
+        for j in range(reviews_per_book)
+    ]
+    link_rows = [
+        {
+            "book_uid": book["uid"],
+            "tag_uid": tag["uid"],
+            "book_created_at": book["created_at"],
+        }
+        for book in book_rows
+        for tag in random.sample(tag_rows, min(tags_per_book, len(tag_rows)))
+    ]
+
+    for model, rows in (
+        (Book, book_rows),
+        (Tag, tag_rows),
+        (Review, review_rows),
+        (BookTag, link_rows),
+    ):
+        for start in range(0, len(rows), 5000):
+            await session.execute(insert(model), rows[start : start + 5000])
+
+    await session.flush()
+
+    return user
+
+
 @pytest.fixture
 def fake_session():
     return mock_session
@@ -46,3 +156,82 @@ def fake_book_service():
 @pytest.fixture
 def test_client():
     return TestClient(app)
+
+
+@pytest.fixture
+def run():
+    """Runs a coroutine against the configured database and Redis.
+
+    The test is skipped when they can't be reached.
+    """
+
+    async def main(coroutine):
+        try:
+            return await coroutine
+        except (OSError, ConnectionError, RedisConnectionError) as e:
+            pytest.skip(f"Database or Redis not available: {e}")
+        finally:
+            # Each test runs in its own event loop, which the connections belong to
+            await async_engine.dispose()
+            await cache_client.aclose()
+            await token_blocklist.aclose()
+
+    def run_coroutine(coroutine):
+        return asyncio.run(main(coroutine))
+
+    return run_coroutine
+
+
+@pytest.fixture
+def leaderboard_keys(monkeypatch):
+    """Points the leaderboards at keys of their own, deleted after the test."""
+    prefix = f"test:{uuid.uuid4().hex}"
+    keys = {
+        name: f"{prefix}:{name.lower()}"
+        for name in ("TOP_RATED_KEY", "MOST_REVIEWED_KEY", "EPOCH_KEY")
+    }
+
+    for name, key in keys.items():
+        monkeypatch.setattr(leaderboards_module, name, key)
+
+    yield keys
+
+    async def cleanup():
+        await cache_client.delete(*keys.values())
+        await cache_client.aclose()
+
+    try:
+        asyncio.run(cleanup())
+    except (OSError, RedisConnectionError):
+        pass
+
+
+@pytest.fixture
+def api_client(monkeypatch):
+    """Opens a client for the app, signed in as a user, that uses a given session.
+
+    Requests run on the test's session, so their changes are rolled back with it.
+    """
+
+    @asynccontextmanager
+    async def open_client(session, user):
+        async def get_test_session():
+            yield session
+
+        monkeypatch.setitem(app.dependency_overrides, get_session, get_test_session)
+        token = create_access_token(
+            user_data={
+                "email": user.email,
+                "user_uid": str(user.uid),
+                "role": user.role,
+            }
+        )
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app),
+            base_url=f"http://localhost/api/{VERSION}",
+            headers={"Authorization": f"Bearer {token}"},
+        ) as client:
+            yield client
+
+    return open_client
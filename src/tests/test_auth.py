@@ -1,7 +1,13 @@
 """Tests for the authentication module."""
 
+from datetime import datetime
+import asyncio
+import uuid
+
 from src import VERSION
-from src.auth.schemas import UserCreateModel
+from src.auth.cache import UserCache
+from src.auth.dependencies import RoleChecker, get_current_principal
+from src.auth.schemas import UserCreateModel, UserRecordModel
 
 auth_prefix = f"/api/{VERSION}/auth"
 
@@ -31,3 +37,71 @@ def test_user_creation(fake_session, fake_user_service, test_client):
     )
     assert fake_user_service.create_user_called_once()
     assert fake_user_service.create_user_called_once_with(user_data, fake_session)
+
+
+def test_principal_from_token_claims():
+    """Tests that the role in the token is trusted, without querying the user."""
+
+    token_details = {
+        "user": {
+            "email": "johndoe123@domain.com",
+            "user_uid": str(uuid.uuid4()),
+            "role": "admin",
+        }
+    }
+
+    principal = asyncio.run(get_current_principal(token_details, session=None))
+
+    assert principal.email == "johndoe123@domain.com"
+    assert principal.role == "admin"
+    assert RoleChecker(["admin"])(principal)
+
+
+def test_user_cache():
+    """Tests the eviction, expiry and invalidation of the cached users."""
+
+    cache = UserCache(size=2, ttl=60)
+    users = [
+        UserRecordModel(
+            uid=uuid.uuid4(),
+            created_at=datetime.now(),
+            updated_at=datetime.now(),
+            username=f"user{i}",
+            email=f"user{i}@domain.com",
+            first_name="John",
+            last_name="Doe",
+            role="user",
+            is_verified=True,
+        )
+        for i in range(3)
+    ]
+
+    for user in users[:2]:
+        cache.set(user, cache.version)
+    assert cache.get(users[0].uid) == users[0]
+
+    # The least recently used user is evicted
+    cache.set(users[2], cache.version)
+    assert cache.get_by_email(users[1].email) is None
+    assert cache.get_by_email(users[2].email) == users[2]
+
+    # A user read before an invalidation is not cached
+    version = cache.version
+    cache.apply({"uids": [str(users[0].uid)], "emails": []})
+    cache.set(users[0], version)
+    assert cache.get(users[0].uid) is None
+
+    cache.ttl = 0
+    cache.set(users[1], cache.version)
+    assert cache.get(users[1].uid) is None
+
+    assert cache.stats() == {
+        "size": 1,
+        "max_size": 2,
+        "hits": 2,
+        "misses": 3,
+        "hit_ratio": 0.4,
+        "evictions": 1,
+        "expirations": 1,
+        "invalidations": 1,
+    }
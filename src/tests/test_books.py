@@ -1,6 +1,25 @@
 """Tests for the books module."""
 
+from datetime import datetime
+from types import SimpleNamespace
+import asyncio
+import json
+import uuid
+
+import pytest
+from sqlmodel import func, select
+
+from src.tests.conftest import rollback_session, seed
 from src import VERSION
+from src.books.cache import book_cache
+from src.books.filters import BookFilters
+from src.books.schemas import Book as BookSchema
+from src.db.models import Book, BookTag
+from src.errors import InvalidCursor, InvalidFields
+from src.etags import make_etag, etag_matches
+from src.fieldsets import fields_query
+from src.pagination import encode_cursor, decode_cursor, page_of
+from src.streaming import CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE, iter_records
 
 books_prefix = f"/api/{VERSION}/books"
 
@@ -13,3 +32,151 @@ def test_get_all_books(fake_session, fake_book_service, test_client):
 
     assert fake_book_service.get_all_books_called_once()
     assert fake_book_service.get_all_books_called_once_with(fake_session)
+
+
+def test_books_page_cursor():
+    """Tests building the next page cursor from the last book of a page."""
+
+    books = [(datetime(2024, 11, day), uuid.uuid4()) for day in range(3, 0, -1)]
+
+    page, next_cursor = page_of(books, 2, key=lambda book: book)
+
+    assert page == books[:2]
+    assert decode_cursor(next_cursor, datetime.fromisoformat, uuid.UUID) == books[1]
+    assert page_of(books, 3, key=lambda book: book) == (books, None)
+
+
+def test_books_invalid_cursor():
+    """Tests that a tampered cursor is rejected."""
+
+    cursor = encode_cursor(datetime(2024, 11, 1), uuid.uuid4())
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor[:-4], datetime.fromisoformat, uuid.UUID)
+
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, datetime.fromisoformat)
+
+
+def test_books_import_records():
+    """Tests reading import rows from bodies split at arbitrary points."""
+
+    async def read(body: bytes, media_type: str) -> list:
+        async def stream():
+            for start in range(0, len(body), 7):
+                yield body[start : start + 7]
+
+        return [record async for record in iter_records(stream(), media_type)]
+
+    csv_body = 'title,author,tags\r\nDune,Herbert,sci-fi|classic\r\n\r\n"Emma, A Novel",Austen,\n'
+    ndjson_body = '{"title": "Dune"}\n\n{"title": "Emma"}'
+
+    assert asyncio.run(read(csv_body.encode(), CSV_MEDIA_TYPE)) == [
+        (1, {"title": "Dune", "author": "Herbert", "tags": "sci-fi|classic"}),
+        (2, {"title": "Emma, A Novel", "author": "Austen", "tags": ""}),
+    ]
+    assert asyncio.run(read(ndjson_body.encode(), NDJSON_MEDIA_TYPE)) == [
+        (1, '{"title": "Dune"}'),
+        (2, '{"title": "Emma"}'),
+    ]
+
+
+def test_book_etag_matching():
+    """Tests matching a book ETag against If-None-Match headers."""
+
+    etag = make_etag(uuid.uuid4(), datetime(2024, 11, 1), 3)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag, f'"other", W/{etag}')
+    assert etag_matches(etag, "*")
+    assert not etag_matches(etag, None)
+    assert not etag_matches(etag, '"other"')
+
+
+def test_book_filters_cache_key():
+    """Tests that facet counts are cached per filtered set, whatever the order."""
+
+    def filters(**kwargs) -> BookFilters:
+        params = dict(
+            language=[],
+            publisher=[],
+            author=[],
+            published_from=None,
+            published_to=None,
+            min_pages=None,
+            max_pages=None,
+            sort="created_at",
+            order="desc",
+        )
+        return BookFilters(**{**params, **kwargs})
+
+    english = filters(language=["English", "French"], min_pages=100)
+
+    assert len(english.conditions()) == 2
+    assert english.cache_key() == (
+        filters(language=["French", "English"], min_pages=100, sort="title").cache_key()
+    )
+    assert english.cache_key() != filters(language=["English"]).cache_key()
+
+
+def test_book_sparse_fields():
+    """Tests rendering only the requested book fields."""
+
+    fields = fields_query(BookSchema)(fields="title, uid")
+    book = SimpleNamespace(uid=uuid.uuid4(), title="Dune", author="Frank Herbert")
+
+    assert json.loads(fields.response(book).body) == {
+        "uid": str(book.uid),
+        "title": "Dune",
+    }
+    assert not fields_query(BookSchema)(fields=None)
+
+    with pytest.raises(InvalidFields):
+        fields_query(BookSchema)(fields="title,password_hash")
+
+
+def test_update_and_delete_book(run, api_client, leaderboard_keys):
+    """Tests updating and deleting a book, its tags and cache included."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=1, reviews_per_book=2, tags_per_book=2)
+            book_uid = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).one()
+            missing = uuid.uuid4()
+            changes = {
+                "title": "Updated",
+                "author": "Author",
+                "publisher": "Publisher",
+                "page_count": 10,
+                "language": "English",
+            }
+
+            async with api_client(session, user) as client:
+                assert (await client.get(f"/books/{book_uid}")).status_code == 200
+                assert await book_cache.get(book_uid)
+
+                response = await client.patch(f"/books/{book_uid}", json=changes)
+                assert response.status_code == 200
+                assert response.json()["title"] == "Updated"
+                assert await book_cache.get(book_uid) is None
+
+                response = await client.patch(f"/books/{missing}", json=changes)
+                assert response.status_code == 404
+
+                await client.get(f"/books/{book_uid}")
+                response = await client.delete(f"/books/{book_uid}")
+                assert response.status_code == 204
+                assert await book_cache.get(book_uid) is None
+
+                links = await session.exec(
+                    select(func.count()).where(BookTag.book_uid == book_uid)
+                )
+                assert links.one() == 0
+
+                assert (await client.get(f"/books/{book_uid}")).status_code == 404
+                assert (await client.delete(f"/books/{book_uid}")).status_code == 404
+
+    run(main())
@@ -0,0 +1,167 @@
+"""Tests for the book leaderboards, against the configured Redis and database."""
+
+from datetime import datetime, timedelta
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from src.tests.conftest import rollback_session, seed
+from src.books.leaderboards import leaderboards
+from src.books.service import BookService
+from src.config import Config
+from src.db.models import Book
+from src.db.redis import cache_client
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import ReviewService
+
+book_service = BookService()
+review_service = ReviewService()
+
+
+def test_top_rated_decay(run, leaderboard_keys):
+    """Tests that older reviews weigh less, halving every half life."""
+
+    async def main():
+        now = datetime.now()
+        half_life = timedelta(seconds=Config.LEADERBOARD_HALF_LIFE)
+        await leaderboards.add_reviews(
+            [
+                ("fresh", 4, now),
+                ("older", 5, now - 2 * half_life),
+                ("disliked", 1, now),
+            ],
+            {"fresh": 1, "older": 1, "disliked": 1},
+        )
+        top_rated = await leaderboards.top_rated(10)
+
+        # Lost epochs leave the scores unreadable until the next reconciliation
+        await cache_client.delete(leaderboard_keys["EPOCH_KEY"])
+        without_epoch = await leaderboards.top_rated(10)
+
+        await leaderboards.add_reviews([("new", 5, datetime.now())], {"new": 1})
+
+        return top_rated, without_epoch, await leaderboards.top_rated(10)
+
+    top_rated, without_epoch, restarted = run(main())
+
+    assert [book_uid for book_uid, _ in top_rated] == ["fresh", "older"]
+    assert top_rated[0][1] == pytest.approx(1, rel=0.01)
+    assert top_rated[1][1] == pytest.approx(0.5, rel=0.01)
+    assert without_epoch == []
+    assert [book_uid for book_uid, _ in restarted] == ["new"]
+
+
+def test_reconcile_matches_incremental_updates(run, leaderboard_keys, monkeypatch):
+    """Tests that rebuilding from Postgres gives the scores kept as reviews came."""
+
+    monkeypatch.setattr(Config, "LEADERBOARD_SIZE", 1000000)
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=2, reviews_per_book=0, tags=0)
+            result = await session.exec(
+                select(Book.uid).where(Book.user_uid == user.uid)
+            )
+            liked, disliked = result.all()
+
+            for book_uid, rating in ((liked, 5), (liked, 4), (disliked, 2)):
+                await review_service.add_review_to_book(
+                    user.uid,
+                    book_uid,
+                    ReviewCreateModel(rating=rating, review_text="A review."),
+                    session,
+                )
+
+            book_uids = {str(liked), str(disliked)}
+            incremental = await leaderboards.top_rated(1000000)
+            incremental_counts = await leaderboards.most_reviewed(1000000)
+
+            await leaderboards.reconcile(session)
+            rebuilt = await leaderboards.top_rated(1000000)
+            rebuilt_counts = await leaderboards.most_reviewed(1000000)
+
+        def ours(entries):
+            return {uid: score for uid, score in entries if uid in book_uids}
+
+        return (
+            str(liked),
+            ours(incremental),
+            ours(rebuilt),
+            ours(incremental_counts),
+            ours(rebuilt_counts),
+        )
+
+    liked, incremental, rebuilt, incremental_counts, rebuilt_counts = run(main())
+
+    assert list(incremental) == [liked]
+    assert rebuilt == pytest.approx(incremental, rel=0.01)
+    assert rebuilt_counts == incremental_counts
+    assert sorted(rebuilt_counts.values()) == [1, 2]
+
+
+def test_leaderboard_skips_and_removes_deleted_books(run, leaderboard_keys):
+    """Tests that deleted books are replaced by the next ones, then removed."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=3, reviews_per_book=0, tags=0)
+            result = await session.exec(
+                select(Book.uid).where(Book.user_uid == user.uid)
+            )
+            book_uids = [str(book_uid) for book_uid in result.all()]
+            deleted = [str(uuid.uuid4()) for _ in range(3)]
+
+            # The deleted books rank first, filling the whole first page
+            await cache_client.zadd(
+                leaderboard_keys["MOST_REVIEWED_KEY"],
+                {
+                    **{book_uid: 10 for book_uid in deleted},
+                    **{book_uid: i for i, book_uid in enumerate(book_uids, 1)},
+                },
+            )
+            entries = await book_service.get_leaderboard(
+                leaderboards.most_reviewed, 3, session
+            )
+            left = await leaderboards.most_reviewed(10)
+
+        return book_uids, entries, left
+
+    book_uids, entries, left = run(main())
+
+    assert [str(entry["book"].uid) for entry in entries] == book_uids[::-1]
+    assert [entry["score"] for entry in entries] == [3, 2, 1]
+    assert [book_uid for book_uid, _ in left] == book_uids[::-1]
+
+
+def test_most_reviewed_sets_whole_review_counts(run, leaderboard_keys):
+    """Tests that a book missing from the leaderboard enters it with all its reviews."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=1, reviews_per_book=0, tags=0)
+            book_uid = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).one()
+
+            # Reviewed before, then cut from the leaderboard
+            await book_service.update_rating_aggregates(
+                book_uid, session, added=[4, 4, 5]
+            )
+            review = await review_service.add_review_to_book(
+                user.uid,
+                book_uid,
+                ReviewCreateModel(rating=5, review_text="A review."),
+                session,
+            )
+            added = await leaderboards.most_reviewed(10)
+
+            await review_service.delete_review_from_book(review.uid, user.uid, session)
+            removed = await leaderboards.most_reviewed(10)
+
+        return str(book_uid), added, removed
+
+    book_uid, added, removed = run(main())
+
+    assert added == [(book_uid, 4)]
+    assert removed == [(book_uid, 3)]
@@ -0,0 +1,298 @@
+"""Query plan regression tests for the hot service queries.
+
+Each service call runs against a seeded database, inside a transaction that
+is rolled back, and every statement it sends is explained afterwards. Seq
+scans are disabled for the transaction, so the planner only falls back to one
+when no index can serve the query. It may also walk a whole index by a column
+other than its first one, which is reported as well. The tests are skipped
+when the configured database can't be reached.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+import asyncio
+import json
+import re
+
+import pytest
+from sqlalchemy import event, select, text
+
+from src.tests.conftest import rollback_session, seed
+from src.auth.service import UserService
+from src.books.filters import BookFilters
+from src.books.service import BookService
+from src.db.main import async_engine
+from src.db.redis import cache_client
+from src.db.models import Book, Review, Tag
+from src.reviews.filters import ReviewFilters
+from src.reviews.schemas import ReviewCreateModel
+from src.reviews.service import ReviewService
+from src.tags.schemas import TagAddModel, TagBulkModel, TagCreateModel
+from src.tags.service import TagService
+
+# Tables that should never be read in full on a hot path
+HOT_TABLES = {"users", "books", "reviews", "tags", "booktag"}
+
+user_service = UserService()
+book_service = BookService()
+review_service = ReviewService()
+tag_service = TagService()
+
+
+async def second_page(data, session):
+    _, cursor = await book_service.get_all_books(session, 10)
+    await book_service.get_all_books(session, 10, cursor)
+
+
+async def book_reviews_second_page(data, session, sort="created_at"):
+    _, cursor = await review_service.get_book_reviews(
+        data.book_uid, session, 2, sort=sort
+    )
+    await review_service.get_book_reviews(data.book_uid, session, 2, cursor, sort)
+
+
+async def rating_sorted_page(data, session):
+    filters = BookFilters(
+        language=["English"],
+        publisher=[],
+        author=[],
+        published_from=None,
+        published_to=None,
+        min_pages=None,
+        max_pages=None,
+        sort="rating",
+        order="desc",
+    )
+    _, cursor = await book_service.get_all_books(session, 10, filters=filters)
+    await book_service.get_all_books(session, 10, cursor, filters)
+
+
+async def all_reviews_second_page(data, session, **filters):
+    filters = ReviewFilters(
+        **{
+            "rating": [],
+            "user_uid": None,
+            "book_uid": None,
+            "created_from": None,
+            "created_to": None,
+            "order": "desc",
+            **filters,
+        }
+    )
+    _, cursor = await review_service.get_all_reviews(session, 2, filters=filters)
+    await review_service.get_all_reviews(session, 2, cursor, filters)
+
+
+HOT_PATHS = {
+    "get_user_by_email": lambda data, session: user_service.get_user_by_email(
+        data.user.email, session
+    ),
+    "get_user_profile": lambda data, session: user_service.get_user_profile(
+        data.user.uid, session
+    ),
+    "get_all_books": second_page,
+    "get_all_books_filtered": rating_sorted_page,
+    "get_user_books": lambda data, session: book_service.get_user_books(
+        data.user.uid, session, 10
+    ),
+    "search_books": lambda data, session: book_service.search_books(
+        "Book", session, 10
+    ),
+    "get_book": lambda data, session: book_service.get_book(data.book_uid, session),
+    "get_book_version": lambda data, session: book_service.get_book_version(
+        data.book_uid, session
+    ),
+    "get_books_batch": lambda data, session: book_service.get_books_batch(
+        [data.book_uid], session, detail=True
+    ),
+    "get_tagged_books": lambda data, session: book_service.get_tagged_books(
+        [data.tag_uid], session, 10
+    ),
+    "get_tagged_books_all": lambda data, session: book_service.get_tagged_books(
+        [data.tag_uid, data.other_tag_uid], session, 10, match="all"
+    ),
+    "get_tagged_books_any": lambda data, session: book_service.get_tagged_books(
+        [data.tag_uid, data.other_tag_uid], session, 10, match="any"
+    ),
+    "update_rating_aggregates": lambda data, session: (
+        book_service.update_rating_aggregates(data.book_uid, session, added=[5])
+    ),
+    "add_review_to_book": lambda data, session: review_service.add_review_to_book(
+        data.user.uid,
+        data.book_uid,
+        ReviewCreateModel(rating=4, review_text="A review."),
+        session,
+    ),
+    "add_ratings_to_aggregates": lambda data, session: (
+        book_service.add_ratings_to_aggregates({data.book_uid: [4, 5]}, session)
+    ),
+    "get_review": lambda data, session: review_service.get_review(
+        data.review_uid, session
+    ),
+    "get_book_reviews": book_reviews_second_page,
+    "get_book_reviews_by_rating": lambda data, session: book_reviews_second_page(
+        data, session, "rating"
+    ),
+    "get_all_reviews": all_reviews_second_page,
+    "get_all_reviews_by_rating": lambda data, session: all_reviews_second_page(
+        data,
+        session,
+        rating=[4, 5],
+        created_from=datetime(2000, 1, 1),
+        created_to=datetime(2100, 1, 1),
+    ),
+    "get_all_reviews_by_user": lambda data, session: all_reviews_second_page(
+        data, session, user_uid=data.user.uid
+    ),
+    "get_all_reviews_by_book": lambda data, session: all_reviews_second_page(
+        data, session, book_uid=data.book_uid
+    ),
+    "get_or_create_tags": lambda data, session: tag_service.get_or_create_tags(
+        [data.tag_name], session
+    ),
+    "add_tags_to_book": lambda data, session: tag_service.add_tags_to_book(
+        data.book_uid,
+        TagAddModel(tags=[TagCreateModel(name=data.tag_name)] * 2),
+        session,
+    ),
+    "bulk_tag_books": lambda data, session: tag_service.bulk_tag_books(
+        TagBulkModel(
+            book_uids=[data.book_uid],
+            add=[TagCreateModel(name=data.tag_name)],
+            remove=[TagCreateModel(name="bulk-removed")],
+        ),
+        session,
+    ),
+    "update_tag": lambda data, session: tag_service.update_tag(
+        data.tag_uid, TagCreateModel(name=f"{data.tag_name}-renamed"), session
+    ),
+    "delete_tag": lambda data, session: tag_service.delete_tag(data.tag_uid, session),
+}
+
+
+@contextmanager
+def capture_statements():
+    """Collects the statements sent to the database, with their parameters."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    event.listen(
+        async_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+    )
+    try:
+        yield statements
+    finally:
+        event.remove(
+            async_engine.sync_engine, "before_cursor_execute", before_cursor_execute
+        )
+
+
+LEADING_COLUMNS = text(
+    """
+    SELECT index_class.relname, attribute.attname
+    FROM pg_index
+    JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+    JOIN pg_attribute AS attribute
+        ON attribute.attrelid = pg_index.indrelid
+        AND attribute.attnum = pg_index.indkey[0]
+    """
+)
+
+
+def full_scans(plan: dict, leading_columns: dict) -> list[str]:
+    """Describes the whole-table and whole-index reads of hot tables in a plan."""
+    scans = []
+    node_type = plan["Node Type"]
+
+    if node_type == "Seq Scan" and plan["Relation Name"] in HOT_TABLES:
+        scans.append(f"seq scan on {plan['Relation Name']}")
+
+    elif node_type in ("Index Scan", "Index Only Scan", "Bitmap Index Scan"):
+        column = leading_columns.get(plan["Index Name"])
+        condition = plan.get("Index Cond")
+
+        if column and condition and not re.search(rf"\b{column}\b", condition):
+            scans.append(f"full scan of {plan['Index Name']} for {condition}")
+
+    for child in plan.get("Plans", []):
+        scans.extend(full_scans(child, leading_columns))
+
+    return scans
+
+
+async def explain_hot_path(name: str) -> list[tuple[str, list[str]]]:
+    """Runs a hot path on seeded data, returning its statements with full scans."""
+    try:
+        async with rollback_session() as session:
+            user = await seed(session, books=200, reviews_per_book=5)
+            await session.exec(text("SET LOCAL enable_seqscan = off"))
+
+            row = (
+                await session.exec(
+                    select(Book.uid, Review.uid)
+                    .join(Review, Review.book_uid == Book.uid)
+                    .where(Book.user_uid == user.uid)
+                    .limit(1)
+                )
+            ).one()
+            tags = (
+                await session.exec(
+                    select(Tag.uid, Tag.name)
+                    .where(Tag.name.startswith("bench-tag-"))
+                    .limit(2)
+                )
+            ).all()
+            data = SimpleNamespace(
+                user=user,
+                book_uid=row[0],
+                review_uid=row[1],
+                tag_uid=tags[0][0],
+                tag_name=tags[0][1],
+                other_tag_uid=tags[1][0],
+            )
+
+            with capture_statements() as statements:
+                await HOT_PATHS[name](data, session)
+
+            connection = await session.connection()
+            leading_columns = dict((await connection.execute(LEADING_COLUMNS)).all())
+            failures = []
+
+            for statement, parameters in statements:
+                if statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE")):
+                    continue
+
+                result = await connection.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+
+                scans = full_scans(plan[0]["Plan"], leading_columns)
+                if scans:
+                    failures.append((statement, scans))
+
+            return failures
+
+    except (OSError, ConnectionError) as e:
+        pytest.skip(f"Database not available: {e}")
+
+    finally:
+        # Each test runs in its own event loop, which the connections belong to
+        await async_engine.dispose()
+        await cache_client.aclose()
+
+
+@pytest.mark.parametrize("name", HOT_PATHS)
+def test_hot_path_uses_indexes(name):
+    """Tests that no hot service query reads a whole table or index."""
+
+    failures = asyncio.run(explain_hot_path(name))
+
+    assert not failures, "\n\n".join(
+        f"{'; '.join(scans)}:\n{statement}" for statement, scans in failures
+    )
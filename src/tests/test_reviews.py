@@ -0,0 +1,150 @@
+"""Tests for the reviews module, against the configured database and Redis."""
+
+import json
+import uuid
+
+from sqlmodel import select
+
+from src.tests.conftest import rollback_session, seed
+from src.config import Config
+from src.db.models import Book
+from src.reviews.importer import ReviewImporter
+
+review_importer = ReviewImporter()
+
+
+def test_review_import_reports_failed_rows(run, leaderboard_keys):
+    """Tests importing reviews, with the rows that failed reported in order."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=1, reviews_per_book=0, tags=0)
+            book_uid = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).one()
+
+            review = {
+                "book_uid": str(book_uid),
+                "user_uid": str(user.uid),
+                "rating": 4,
+                "review_text": "An imported review.",
+            }
+            lines = [
+                json.dumps(review),
+                json.dumps({**review, "book_uid": str(uuid.uuid4())}),
+                json.dumps({**review, "rating": 6}),
+                "{not json",
+                json.dumps({**review, "user_uid": str(uuid.uuid4())}),
+                json.dumps({**review, "rating": 2}),
+            ]
+
+            async def records():
+                for row, line in enumerate(lines, start=1):
+                    yield row, line
+
+            report = await review_importer.import_reviews(records(), session)
+            book = await session.get(Book, book_uid)
+
+            return report, book.review_count, book.rating_sum
+
+    report, review_count, rating_sum = run(main())
+
+    assert (report.inserted, report.failed) == (2, 4)
+    assert [error.row for error in report.errors] == [2, 3, 4, 5]
+    assert report.errors[0].message == "book_uid: Book not found"
+    assert report.errors[1].message.startswith("rating:")
+    assert report.errors[3].message == "user_uid: User not found"
+    assert (review_count, rating_sum) == (2, 6)
+
+
+def test_review_import_reports_batch_of_deleted_book(
+    run, leaderboard_keys, monkeypatch
+):
+    """Tests that a book deleted during an import fails its batch, not the import."""
+
+    monkeypatch.setattr(Config, "IMPORT_BATCH_SIZE", 2)
+
+    async def everything_exists(model, uids, session):
+        # As if the book was deleted between the check and the insert
+        return uids
+
+    monkeypatch.setattr(review_importer, "_existing", everything_exists)
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=1, reviews_per_book=0, tags=0)
+            book_uid = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).one()
+
+            review = {
+                "book_uid": str(book_uid),
+                "user_uid": str(user.uid),
+                "rating": 4,
+                "review_text": "An imported review.",
+            }
+            lines = [
+                json.dumps(review),
+                json.dumps(review),
+                json.dumps(review),
+                json.dumps({**review, "book_uid": str(uuid.uuid4())}),
+            ]
+
+            async def records():
+                for row, line in enumerate(lines, start=1):
+                    yield row, line
+
+            report = await review_importer.import_reviews(records(), session)
+            book = await session.get(Book, book_uid)
+
+            return report, book.review_count
+
+    report, review_count = run(main())
+
+    assert (report.inserted, report.failed) == (2, 2)
+    assert [error.row for error in report.errors] == [3, 4]
+    assert report.errors[0].message == "Book or user deleted during the import"
+    assert review_count == 2
+
+
+def test_delete_review(run, api_client, leaderboard_keys):
+    """Tests that deleting a review removes it and its rating from the book."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=1, reviews_per_book=0, tags=0)
+            book_uid = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).one()
+
+            async with api_client(session, user) as client:
+                review_uids = []
+                for rating in (5, 2):
+                    response = await client.post(
+                        f"/reviews/book/{book_uid}",
+                        json={"rating": rating, "review_text": "A review."},
+                    )
+                    assert response.status_code == 201
+                    review_uids.append(response.json()["uid"])
+
+                response = await client.delete(f"/reviews/{review_uids[0]}")
+                assert response.status_code == 204
+
+                # Deleted reviews can't be read or deleted again
+                response = await client.get(f"/reviews/{review_uids[0]}")
+                assert response.status_code == 404
+                response = await client.delete(f"/reviews/{review_uids[0]}")
+                assert response.status_code == 403
+
+                response = await client.get(f"/reviews/{review_uids[1]}")
+                assert response.status_code == 200
+
+            book = await session.get(Book, book_uid)
+            await session.refresh(book)
+
+            return book.review_count, book.rating_sum, book.rating_histogram
+
+    review_count, rating_sum, rating_histogram = run(main())
+
+    assert (review_count, rating_sum) == (1, 2)
+    assert rating_histogram == [0, 1, 0, 0, 0]
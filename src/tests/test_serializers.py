@@ -0,0 +1,58 @@
+"""Tests for the fast response path, against the configured database."""
+
+from sqlmodel import select
+
+from src.tests.conftest import rollback_session, seed
+from src.books.schemas import Book as BookSchema, BookDetailModel
+from src.books.service import BookService
+from src.config import Config
+from src.db.models import Book
+from src.fieldsets import FieldSet
+from src.reviews.schemas import ReviewModel
+from src.reviews.service import ReviewService
+from src.tags.schemas import TagModel
+
+book_service = BookService()
+review_service = ReviewService()
+
+
+def test_fast_responses_match_validated_responses(run, monkeypatch):
+    """Tests that the orjson serializers render what the schemas validate."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(session, books=3, reviews_per_book=3, tags_per_book=2)
+            book_uid = (
+                await session.exec(
+                    select(Book.uid).where(Book.user_uid == user.uid).limit(1)
+                )
+            ).one()
+
+            books, next_cursor = await book_service.get_user_books(user.uid, session, 2)
+            book = await book_service.get_book(book_uid, session)
+            reviews, _ = await review_service.get_book_reviews(book_uid, session, 10)
+
+            cases = [
+                (BookSchema, None, {"items": books, "next_cursor": next_cursor}),
+                (BookSchema, frozenset({"uid", "title"}), books),
+                (BookDetailModel, None, book),
+                (BookDetailModel, frozenset({"uid", "reviews", "tags"}), book),
+                (ReviewModel, None, reviews),
+                (TagModel, None, book.tags),
+            ]
+            bodies = []
+
+            for schema, names, content in cases:
+                fields = FieldSet(schema, names)
+                rendered = []
+
+                for fast in (False, True):
+                    monkeypatch.setattr(Config, "FAST_RESPONSES", fast)
+                    rendered.append(fields.response(content).body)
+
+                bodies.append((schema.__name__, *rendered))
+
+        return bodies
+
+    for name, validated, fast in run(main()):
+        assert fast == validated, name
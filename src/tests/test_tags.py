@@ -0,0 +1,123 @@
+"""Tests for the tags module."""
+
+import uuid
+
+from sqlmodel import func, select
+
+from src.tests.conftest import rollback_session, seed
+from src.books.cache import book_cache
+from src.db.models import Book, BookTag, Tag
+from src.tags import suggest
+from src.tags.suggest import TagSuggestions
+
+
+def test_tag_suggestions():
+    """Tests ranking tag suggestions by usage, as tags are used and renamed."""
+
+    index = TagSuggestions(limit=5)
+    fantasy, fairy, fiction, poetry = (str(uuid.uuid4()) for _ in range(4))
+    index.replace(
+        [
+            (fantasy, "Fantasy", 3),
+            (fairy, "fairy tales", 1),
+            (fiction, "Fiction", 5),
+            (poetry, "Poetry", 2),
+        ]
+    )
+
+    def names(prefix):
+        return [tag["name"] for tag in index.suggest(prefix, 5)]
+
+    assert names("f") == ["Fiction", "Fantasy", "fairy tales"]
+    assert names("FA") == ["Fantasy", "fairy tales"]
+    assert names("fairy t") == ["fairy tales"]
+    assert names("x") == []
+
+    index.apply({"type": "used", "tags": [[fairy, "fairy tales", 4]]})
+    assert names("f") == ["fairy tales", "Fiction", "Fantasy"]
+
+    index.apply({"type": "renamed", "uid": fiction, "name": "Sci-fi"})
+    assert names("f") == ["fairy tales", "Fantasy"]
+    assert index.suggest("sci", 5) == [
+        {"uid": fiction, "name": "Sci-fi", "book_count": 5}
+    ]
+
+    index.apply({"type": "deleted", "uids": [fairy, poetry]})
+    assert names("f") == ["Fantasy"]
+    assert names("p") == []
+
+
+def test_tag_suggestions_keep_few_rankings(monkeypatch):
+    """Tests that only the most recently used short prefixes keep a ranking."""
+
+    monkeypatch.setattr(suggest, "MAX_RANKINGS", 2)
+    index = TagSuggestions(limit=5)
+    index.replace([(uuid.uuid4(), name, 1) for name in ("ab", "ac", "bc", "cd")])
+
+    for prefix in ("a", "b", "a", "c"):
+        index.suggest(prefix, 5)
+
+    assert list(index._top) == ["a", "c"]
+    assert [tag["name"] for tag in index.suggest("a", 5)] == ["ab", "ac"]
+
+
+def test_update_and_delete_tag(run, api_client):
+    """Tests renaming and deleting a tag, with the details of its books dropped."""
+
+    async def main():
+        async with rollback_session() as session:
+            user = await seed(
+                session, books=2, reviews_per_book=0, tags_per_book=2, tags=2
+            )
+            book_uids = (
+                await session.exec(select(Book.uid).where(Book.user_uid == user.uid))
+            ).all()
+            (tag_uid, _), (other_tag_uid, other_name) = (
+                await session.exec(
+                    select(Tag.uid, Tag.name)
+                    .join(BookTag, BookTag.tag_uid == Tag.uid)
+                    .where(BookTag.book_uid == book_uids[0])
+                    .order_by(Tag.name)
+                )
+            ).all()
+
+            async def cached_books():
+                return [bool(await book_cache.get(uid)) for uid in book_uids]
+
+            async with api_client(session, user) as client:
+                for book_uid in book_uids:
+                    await client.get(f"/books/{book_uid}")
+                assert await cached_books() == [True, True]
+
+                new_name = f"renamed-{uuid.uuid4().hex}"
+                response = await client.put(f"/tags/{tag_uid}", json={"name": new_name})
+                assert response.status_code == 200
+                assert response.json()["name"] == new_name
+                assert await cached_books() == [False, False]
+
+                response = await client.put(
+                    f"/tags/{tag_uid}", json={"name": other_name}
+                )
+                assert response.status_code == 403
+                assert response.json()["error_code"] == "tag_exists"
+
+                response = await client.put(
+                    f"/tags/{uuid.uuid4()}", json={"name": new_name}
+                )
+                assert response.status_code == 404
+
+                for book_uid in book_uids:
+                    await client.get(f"/books/{book_uid}")
+                response = await client.delete(f"/tags/{other_tag_uid}")
+                assert response.status_code == 204
+                assert await cached_books() == [False, False]
+
+                links = await session.exec(
+                    select(func.count()).where(BookTag.tag_uid == other_tag_uid)
+                )
+                assert links.one() == 0
+                assert (
+                    await client.delete(f"/tags/{other_tag_uid}")
+                ).status_code == 404
+
+    run(main())